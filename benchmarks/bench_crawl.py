@@ -0,0 +1,218 @@
+"""
+    Пропускная способность обхода на локальном синтетическом сайте (benchmarks/synthetic_site.py)
+    Сайт запускается в отдельном процессе, обход - через ParserService.parse_site с записью в заглушку БД
+    Замеряются:
+        - pages/sec - записанных страниц в секунду от старта до записи последней страницы
+        - p50/p99 задержки ответа (до получения заголовков, aiohttp TraceConfig)
+        - peak RSS процесса обхода
+        - задержка event loop'а (p50/p99/max опоздания таймера)
+    Запуск из корневой директории:
+        python benchmarks/bench_crawl.py [--fanout 10] [--depth 3] [--concurrent 20] [--executor process] [--json results.jsonl]
+    С --json результат дописывается строкой JSON (commit, параметры, замеры) для сравнения между коммитами
+"""
+import sys
+import json
+import time
+import asyncio
+import resource
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+import multiprocessing
+from pathlib import Path
+from dataclasses import asdict
+from types import SimpleNamespace
+import aiohttp
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "parser"))
+
+from models import SiteModel
+from models import ParserStateModel
+from modules import Parser
+from modules import SpillQueue
+from modules import create_executor
+from services.database import Database
+from services.http_service import HttpService
+from services.parser_service import ParserService
+from synthetic_site import SiteParams
+from synthetic_site import serve
+from synthetic_site import add_arguments
+from synthetic_site import params_from
+
+
+class SinkDatabase(Database):
+    """ Заглушка БД: страницы только подсчитываются (как tests/parser/services/mocked_db.py) """
+    pages: int = 0
+    html_bytes: int = 0
+
+    async def _put_batch(self, sites: list[SiteModel]) -> None:
+        self.pages += len(sites)
+        self.html_bytes += sum(len(site.html) for site in sites)
+
+
+def percentile(values: list[float], percent: int) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0
+    return statistics.quantiles(values, n=100, method="inclusive")[percent - 1]
+
+
+def latency_trace(latencies: list[float]) -> aiohttp.TraceConfig:
+    """ Время от начала запроса до получения заголовков ответа """
+    async def on_request_start(session, context: SimpleNamespace, params) -> None:
+        context.started = time.perf_counter()
+
+    async def on_request_end(session, context: SimpleNamespace, params) -> None:
+        latencies.append(time.perf_counter() - context.started)
+
+    trace: aiohttp.TraceConfig = aiohttp.TraceConfig()
+    trace.on_request_start.append(on_request_start)
+    trace.on_request_end.append(on_request_end)
+    return trace
+
+
+async def measure_loop_lag(lags: list[float], interval_sec: float = 0.01) -> None:
+    """ Опоздание таймера event loop'а: время, на которое loop был занят другой работой """
+    loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+    while True:
+        started: float = loop.time()
+        await asyncio.sleep(interval_sec)
+        lags.append(max(0.0, loop.time() - started - interval_sec))
+
+
+async def crawl(args: argparse.Namespace, site: SiteParams, port: int, spill_dir: str) -> dict:
+    latencies: list[float] = []
+    lags: list[float] = []
+    queue: SpillQueue = SpillQueue(maxsize=args.queue_size, spill_dir=spill_dir)
+    database: SinkDatabase = SinkDatabase(
+        host="localhost", port=None, database="", username="", password="",
+        queue=queue, batch_size=args.batch_size,
+    )
+    parser_service: ParserService = ParserService(
+        queue=queue,
+        limit_concurrent_processes=1,
+        http=HttpService(
+            limit=args.pool_limit,
+            limit_per_host=args.pool_limit,
+            dns_cache_ttl_sec=300,
+            keepalive_timeout_sec=30,
+            trace_configs=[latency_trace(latencies)],
+        ),
+        executor=create_executor(kind=args.executor, workers=args.workers),
+        extractor=args.extractor,
+        visited_kind=args.visited,
+    )
+    listener: asyncio.Task = asyncio.create_task(database.start_listener())
+    lag_probe: asyncio.Task = asyncio.create_task(measure_loop_lag(lags))
+    start_url: str = f"http://127.0.0.1:{port}/p/0"
+    rss_before: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    started: float = time.perf_counter()
+    if not await parser_service.parse_site(
+        start_url=start_url,
+        max_depth=site.depth,
+        max_concurrent=args.concurrent,
+        default_timeout_sec=args.timeout,
+        seed_sitemaps=args.sitemaps,
+    ):
+        raise RuntimeError(f"Synthetic site is unavailable: {start_url}")
+    parser: Parser = parser_service._status_store[start_url]
+    while parser_service.is_url_processing(start_url):
+        await asyncio.sleep(0.01)
+    crawled_sec: float = time.perf_counter() - started
+    # Обход завершён, все страницы - в очереди результатов: ожидание записи
+    while not queue.empty() or database._batch:
+        await asyncio.sleep(0.01)
+    elapsed_sec: float = time.perf_counter() - started
+
+    lag_probe.cancel()
+    database.close()
+    listener.cancel()
+    await parser_service.close()
+    state: ParserStateModel = parser.state()
+    return {
+        "pages": database.pages,
+        "pages_expected": site.pages,
+        "fetched": state.pages_fetched,
+        "failed": state.pages_failed,
+        "duplicates_skipped": state.duplicates_skipped,
+        "seeded_urls": state.seeded_urls,
+        "skipped_content_type": state.skipped_content_type,
+        "elapsed_sec": round(elapsed_sec, 3),
+        "crawl_sec": round(crawled_sec, 3),
+        "pages_per_sec": round(database.pages / elapsed_sec, 1),
+        "mb_per_sec": round(database.html_bytes / elapsed_sec / 2 ** 20, 2),
+        "latency_p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "latency_p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        # ru_maxrss в Linux - КБ
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "rss_growth_mb": round((resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before) / 1024, 1),
+        "loop_lag_p50_ms": round(percentile(lags, 50) * 1000, 2),
+        "loop_lag_p99_ms": round(percentile(lags, 99) * 1000, 2),
+        "loop_lag_max_ms": round(max(lags, default=0) * 1000, 2),
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(args: argparse.Namespace) -> None:
+    site: SiteParams = params_from(args)
+    ready = multiprocessing.Event()
+    server: multiprocessing.Process = multiprocessing.Process(
+        target=serve, kwargs={"params": site, "port": args.port, "ready": ready}, daemon=True,
+    )
+    server.start()
+    try:
+        if not ready.wait(timeout=10):
+            raise RuntimeError("Synthetic site did not start")
+        with tempfile.TemporaryDirectory() as spill_dir:
+            results: dict = asyncio.run(crawl(args=args, site=site, port=args.port, spill_dir=spill_dir))
+    finally:
+        server.terminate()
+        server.join()
+
+    record: dict = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "site": asdict(site),
+        "crawler": {
+            "concurrent": args.concurrent,
+            "executor": args.executor,
+            "workers": args.workers,
+            "extractor": args.extractor,
+            "visited": args.visited,
+            "sitemaps": args.sitemaps,
+        },
+        "results": results,
+    }
+    for name, value in results.items():
+        print(f"{name:<20}{value:>12}")
+    if args.json:
+        with open(args.json, "a") as file:
+            file.write(json.dumps(record) + "\n")
+
+
+if __name__ == "__main__":
+    arguments: argparse.ArgumentParser = argparse.ArgumentParser(description=__doc__)
+    add_arguments(arguments)
+    arguments.add_argument("--port", type=int, default=18080, help="порт синтетического сайта")
+    arguments.add_argument("--concurrent", type=int, default=20, help="воркеров обхода (max_concurrent)")
+    arguments.add_argument("--timeout", type=int, default=10, help="таймаут ответа, с")
+    arguments.add_argument("--executor", default="process", choices=["process", "thread", "inline"])
+    arguments.add_argument("--workers", type=int, default=0, help="размер пула разбора, 0 - по числу ядер")
+    arguments.add_argument("--extractor", default="bs4")
+    arguments.add_argument("--visited", default="exact")
+    arguments.add_argument("--pool-limit", type=int, default=100, help="размер пула HTTP-соединений")
+    arguments.add_argument("--queue-size", type=int, default=1000, help="размер очереди результатов")
+    arguments.add_argument("--batch-size", type=int, default=200, help="размер пачки записи")
+    arguments.add_argument("--sitemaps", action="store_true", help="заполнение границы из /sitemap.xml")
+    arguments.add_argument("--json", help="файл для результатов (JSON Lines)")
+    main(arguments.parse_args())
@@ -0,0 +1,117 @@
+"""
+    Сравнение реализаций извлечения ссылок (modules.extractors)
+    Для каждой реализации в отдельном процессе замеряются:
+        - pages/sec - скорость разбора корпуса
+        - peak RSS - прирост пикового потребления памяти процессом
+    Запуск из корневой директории:
+        python benchmarks/bench_extractors.py [--corpus DIR] [--pages N] [--rounds N]
+    Без --corpus используется синтетический корпус страниц "реального" размера
+"""
+import os
+import sys
+import time
+import random
+import resource
+import argparse
+import multiprocessing
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "parser"))
+
+from modules.extractors import EXTRACTORS
+from modules.extractors import get_extractor
+
+WORDS: list[str] = "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor".split()
+
+
+def make_page(rnd: random.Random, size_kb: int) -> str:
+    """ Страница с типичной структурой: head со скриптами/стилями, вложенные блоки, ссылки """
+    head: str = (
+        "<head><meta charset='utf-8'><title>Synthetic page %d</title>" % rnd.randint(0, 10 ** 6)
+        + "".join("<meta name='m%d' content='%s'>" % (i, " ".join(rnd.choices(WORDS, k=8))) for i in range(20))
+        + "<style>" + "".join(
+            ".c%d{color:#%06x}" % (i, rnd.randint(0, 0xffffff)) for i in range(200)
+        ) + "</style>"
+        + "<script>var data = %s;</script>" % ("[" + ",".join(str(rnd.random()) for _ in range(300)) + "]")
+        + "</head>"
+    )
+    blocks: list[str] = []
+    size: int = len(head)
+    while size < size_kb * 1024:
+        links: str = "".join(
+            "<li><a class='c%d' href='%s'>%s</a></li>" % (
+                rnd.randint(0, 199),
+                rnd.choice([
+                    "/section/%d/article-%d" % (rnd.randint(0, 50), rnd.randint(0, 10 ** 5)),
+                    "https://example.com/page/%d?utm_source=x&ref=%d" % (rnd.randint(0, 10 ** 4), rnd.randint(0, 9)),
+                    "../relative/%d.html" % rnd.randint(0, 1000),
+                    "#anchor-%d" % rnd.randint(0, 100),
+                ]),
+                " ".join(rnd.choices(WORDS, k=3)),
+            )
+            for _ in range(rnd.randint(5, 25))
+        )
+        text: str = "<p>%s &amp; <b>%s</b></p>" % (" ".join(rnd.choices(WORDS, k=60)), rnd.choice(WORDS))
+        block: str = "<div class='c%d'><div><ul>%s</ul>%s</div></div>" % (rnd.randint(0, 199), links, text)
+        blocks.append(block)
+        size += len(block)
+    return "<!DOCTYPE html><html>%s<body>%s</body></html>" % (head, "".join(blocks))
+
+
+def load_corpus(corpus_dir: str | None, pages: int) -> list[str]:
+    if corpus_dir:
+        return [path.read_text(errors="replace") for path in sorted(Path(corpus_dir).glob("*.htm*"))][:pages]
+    rnd: random.Random = random.Random(42)
+    # Размеры страниц: от небольших статей до "тяжёлых" порталов
+    return [make_page(rnd, size_kb=rnd.choice([30, 80, 150, 300, 600, 1200])) for _ in range(pages)]
+
+
+def run_backend(name: str, corpus: list[str], rounds: int, results: dict) -> None:
+    """ Замер в отдельном процессе, чтобы пиковое RSS относилось только к этой реализации """
+    extractor = get_extractor(name)
+    extractor.extract(corpus[0])  # прогрев (импорт зависимостей)
+    rss_before: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    links_count: int = 0
+    started: float = time.perf_counter()
+    for _ in range(rounds):
+        for html in corpus:
+            links: list[str] = extractor.extract(html).links
+            links_count += len(links)
+    elapsed: float = time.perf_counter() - started
+    rss_after: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    results[name] = {
+        "pages_per_sec": len(corpus) * rounds / elapsed,
+        "peak_rss_delta_mb": (rss_after - rss_before) / 1024,
+        "links": links_count // rounds,
+    }
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--corpus", help="директория с *.html страницами")
+    arg_parser.add_argument("--pages", type=int, default=60)
+    arg_parser.add_argument("--rounds", type=int, default=3)
+    arg_parser.add_argument("--backends", nargs="*", default=list(EXTRACTORS))
+    args = arg_parser.parse_args()
+
+    corpus: list[str] = load_corpus(args.corpus, args.pages)
+    total_mb: float = sum(len(html) for html in corpus) / 1024 / 1024
+    print(f"Corpus: {len(corpus)} pages, {total_mb:.1f} MB, rounds: {args.rounds}")
+
+    context = multiprocessing.get_context("fork")
+    results = context.Manager().dict()
+    print(f"{'backend':<12} {'pages/sec':>10} {'MB/sec':>8} {'peak RSS +MB':>13} {'links':>8}")
+    for name in args.backends:
+        process = context.Process(target=run_backend, args=(name, corpus, args.rounds, results))
+        process.start()
+        process.join()
+        result: dict = results[name]
+        print(
+            f"{name:<12} {result['pages_per_sec']:>10.1f} "
+            f"{result['pages_per_sec'] * total_mb / len(corpus):>8.1f} "
+            f"{result['peak_rss_delta_mb']:>13.1f} {result['links']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
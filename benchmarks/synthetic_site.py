@@ -0,0 +1,155 @@
+"""
+    Локальный синтетический сайт для бенчмарков обхода (aiohttp)
+    Граф страниц - дерево: у страницы n дочерние страницы n * fanout + 1 ... n * fanout + fanout,
+    плюс ссылки на уже известные страницы (duplicate_ratio) - нагрузка на множество посещённых адресов
+    Содержимое, задержка и ошибки страницы определяются seed'ом и номером: прогоны воспроизводимы
+    Отдельный запуск (для ручной проверки parser-app):
+        python benchmarks/synthetic_site.py [--port 8080] [--fanout 10] [--depth 3] ...
+"""
+import math
+import random
+import asyncio
+import argparse
+from dataclasses import dataclass
+from dataclasses import asdict
+from aiohttp import web
+
+WORDS: list[str] = "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor".split()
+
+
+@dataclass(frozen=True)
+class SiteParams():
+    """ Параметры синтетического сайта """
+    fanout: int = 10
+    depth: int = 3
+    page_kb: int = 30
+    latency_ms: float = 20  # медиана задержки ответа
+    latency_sigma: float = 0.5  # разброс (логнормальное распределение)
+    error_rate: float = 0.01  # доля ответов 500
+    duplicate_ratio: float = 0.5  # ссылок на уже известные страницы на одну новую
+    capacity: int = 0  # одновременных запросов, сверх - ответ 503 (0 - без ограничения)
+    binary_ratio: float = 0  # ссылок на не-HTML файлы (application/pdf) на одну новую страницу
+    binary_kb: int = 1024
+    seed: int = 0
+
+    @property
+    def pages(self) -> int:
+        """ Количество страниц до глубины depth включительно """
+        return sum(self.fanout ** level for level in range(self.depth + 1))
+
+    def depth_of(self, page: int) -> int:
+        level: int = 0
+        while page > 0:
+            page = (page - 1) // self.fanout
+            level += 1
+        return level
+
+
+def make_page(params: SiteParams, page: int, rnd: random.Random) -> str:
+    """ Страница: ссылки на дочерние и уже известные страницы, текст до page_kb """
+    links: list[int] = []
+    if params.depth_of(page) < params.depth:
+        links.extend(page * params.fanout + child for child in range(1, params.fanout + 1))
+    duplicates: int = round(params.fanout * params.duplicate_ratio)
+    links.extend(rnd.randint(0, page) for _ in range(duplicates))
+    body: list[str] = [f"<title>Page {page}</title>"]
+    body.extend(f"<a href='/p/{link}'>{' '.join(rnd.choices(WORDS, k=3))}</a>" for link in links)
+    binaries: int = round(params.fanout * params.binary_ratio)
+    body.extend(f"<a href='/f/{page}-{number}.pdf'>file</a>" for number in range(binaries))
+    size: int = sum(len(part) for part in body)
+    while size < params.page_kb * 1024:
+        text: str = f"<p>{' '.join(rnd.choices(WORDS, k=60))}</p>"
+        body.append(text)
+        size += len(text)
+    return f"<!DOCTYPE html><html><body>{''.join(body)}</body></html>"
+
+
+def create_app(params: SiteParams) -> web.Application:
+    """ Приложение сайта: /p/{n} - страница n, / - перенаправление на корневую страницу, /sitemap.xml - все страницы """
+    in_flight: list[int] = [0]
+
+    async def index(request: web.Request) -> web.Response:
+        raise web.HTTPFound("/p/0")
+
+    async def page(request: web.Request) -> web.Response:
+        number: int = int(request.match_info["number"])
+        if number >= params.pages:
+            raise web.HTTPNotFound()
+        if params.capacity and in_flight[0] >= params.capacity:
+            raise web.HTTPServiceUnavailable()
+        rnd: random.Random = random.Random(f"{params.seed}:{number}")
+        in_flight[0] += 1
+        try:
+            await asyncio.sleep(rnd.lognormvariate(math.log(params.latency_ms / 1000), params.latency_sigma))
+        finally:
+            in_flight[0] -= 1
+        if number and rnd.random() < params.error_rate:
+            raise web.HTTPInternalServerError()
+        return web.Response(text=make_page(params=params, page=number, rnd=rnd), content_type="text/html")
+
+    async def robots(request: web.Request) -> web.Response:
+        return web.Response(text=f"User-agent: *\nSitemap: {request.scheme}://{request.host}/sitemap.xml\n")
+
+    async def sitemap(request: web.Request) -> web.Response:
+        """ Все страницы сайта (sitemaps.org) """
+        origin: str = f"{request.scheme}://{request.host}"
+        urls: str = "".join(f"<url><loc>{origin}/p/{page}</loc></url>" for page in range(params.pages))
+        return web.Response(
+            text=f'<?xml version="1.0"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{urls}</urlset>',
+            content_type="application/xml",
+        )
+
+    async def binary(request: web.Request) -> web.Response:
+        return web.Response(body=b"%PDF-1.4\n" + b"\0" * params.binary_kb * 1024, content_type="application/pdf")
+
+    app: web.Application = web.Application()
+    app.add_routes([
+        web.get("/", index),
+        web.get(r"/p/{number:\d+}", page),
+        web.get(r"/f/{name}", binary),
+        web.get("/robots.txt", robots),
+        web.get("/sitemap.xml", sitemap),
+    ])
+    return app
+
+
+def serve(params: SiteParams, port: int, ready=None) -> None:
+    """ Запуск сервера (в отдельном процессе бенчмарка); ready - multiprocessing.Event готовности """
+    async def run() -> None:
+        runner: web.AppRunner = web.AppRunner(create_app(params), access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, host="127.0.0.1", port=port).start()
+        if ready is not None:
+            ready.set()
+        await asyncio.Event().wait()
+
+    asyncio.run(run())
+
+
+def add_arguments(arguments: argparse.ArgumentParser) -> None:
+    defaults: SiteParams = SiteParams()
+    arguments.add_argument("--fanout", type=int, default=defaults.fanout, help="новых ссылок на странице")
+    arguments.add_argument("--depth", type=int, default=defaults.depth, help="глубина сайта")
+    arguments.add_argument("--page-kb", type=int, default=defaults.page_kb, help="размер страницы, КБ")
+    arguments.add_argument("--latency-ms", type=float, default=defaults.latency_ms, help="медиана задержки ответа")
+    arguments.add_argument("--latency-sigma", type=float, default=defaults.latency_sigma, help="разброс задержки")
+    arguments.add_argument("--error-rate", type=float, default=defaults.error_rate, help="доля ответов 500")
+    arguments.add_argument("--duplicate-ratio", type=float, default=defaults.duplicate_ratio, help="повторных ссылок на новую")
+    arguments.add_argument("--capacity", type=int, default=defaults.capacity, help="одновременных запросов до ответов 503")
+    arguments.add_argument("--binary-ratio", type=float, default=defaults.binary_ratio, help="ссылок на PDF на новую страницу")
+    arguments.add_argument("--binary-kb", type=int, default=defaults.binary_kb, help="размер PDF, КБ")
+    arguments.add_argument("--seed", type=int, default=defaults.seed)
+
+
+def params_from(args: argparse.Namespace) -> SiteParams:
+    return SiteParams(**{name: getattr(args, name) for name in asdict(SiteParams())})
+
+
+if __name__ == "__main__":
+    arguments: argparse.ArgumentParser = argparse.ArgumentParser(description=__doc__)
+    arguments.add_argument("--port", type=int, default=8080)
+    add_arguments(arguments)
+    args: argparse.Namespace = arguments.parse_args()
+    site: SiteParams = params_from(args)
+    print(f"{site.pages} pages: http://127.0.0.1:{args.port}/p/0")
+    serve(params=site, port=args.port)
@@ -1,19 +1,34 @@
+import json
+import asyncio
 import logging
 from fastapi.encoders import jsonable_encoder
 import uvicorn
 from typing import List
 from typing import Dict
 from typing import AnyStr
+from typing import AsyncIterator
 from fastapi import status
 from fastapi import FastAPI
 from fastapi import Query
-from fastapi import status
+from fastapi import Header
+from fastapi.responses import Response
 from fastapi.responses import HTMLResponse
 from fastapi.responses import JSONResponse
+from fastapi.responses import StreamingResponse
 
 from modules import Config
+from modules.html_codec import decompress
+from modules.html_codec import accepts_encoding
+from modules.html_codec import decompressor
+from modules.http_range import parse_range
+from modules.http_range import RangeNotSatisfiable
+from modules import PageCache
+from modules.page_cache import make_etag
+from modules.page_cache import etag_matches
 from services import Database
 from models import ListElementModel
+from models import SiteContentModel
+from models import SiteMetaModel
 
 
 config: Config = Config()
@@ -32,6 +47,10 @@ database: Database = Database(
     username=config.DB_USERNAME,
     password=config.DB_PASSWORD,
 )
+page_cache: PageCache = PageCache(
+    max_bytes=int(config.PAGE_CACHE_MAX_BYTES),
+    ttl_sec=float(config.PAGE_CACHE_TTL_SEC),
+)
 logger: logging.Logger = logging.getLogger("main.py")
 
 
@@ -43,29 +62,113 @@ logger: logging.Logger = logging.getLogger("main.py")
     summary="Состояние сервиса",
 )
 async def health_check():
-    return {"status": "ok"}
+    return {"status": "ok", "page_cache": page_cache.stats}
+
+
+async def decompress_stream(chunks: AsyncIterator[bytes], codec: str) -> AsyncIterator[bytes]:
+    """ Потоковая распаковка фрагментов вне event loop'а """
+    decompress_chunk = decompressor(codec)
+    async for chunk in chunks:
+        yield await asyncio.to_thread(decompress_chunk, chunk)
 
 
 @app.get(path="/site", response_class=HTMLResponse,
     responses={
         status.HTTP_200_OK: {"description": "Страница найдена", "model": AnyStr},
+        status.HTTP_206_PARTIAL_CONTENT: {"description": "Запрошенный диапазон страницы (Range)"},
+        status.HTTP_304_NOT_MODIFIED: {"description": "Страница не изменилась (If-None-Match)"},
         status.HTTP_404_NOT_FOUND: {"description": "Страница не найдена", "model": AnyStr},
+        status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE: {"description": "Диапазон за пределами страницы"},
     },
     summary="Запрос содержимого страницы",
-    description="Поиск в БД собранных данных страницы по её URL"
+    description=(
+        "Поиск в БД собранных данных страницы по её URL. "
+        "Сжатые страницы отдаются без распаковки, если клиент допускает их Content-Encoding. "
+        "Часто запрашиваемые страницы отдаются из кэша, ETag - хэш содержимого. "
+        "Большие страницы читаются из БД и отдаются по частям, поддерживается Range"
+    ),
 )
 async def get_site_html(
     url: str = Query(
         description="Адрес страницы",
         default="https://habr.com/ru/post/420129/",
     ),
+    accept_encoding: str = Header(default=""),
+    if_none_match: str = Header(default=""),
+    range: str = Header(default=""),
+    if_range: str = Header(default=""),
 ):
-    """ Поиск в базе данных содержимого сайта """
-    site_html: str = await database.get_site_html(url=url)
-    if site_html:
-        return HTMLResponse(status_code=200, content=site_html)
-    else:
-        return HTMLResponse(status_code=404, content="")
+    """
+        Поиск содержимого сайта в кэше, затем в базе данных
+        Страницы больше допустимого для кэша размера не загружаются целиком:
+        тело читается окнами по SITE_CHUNK_BYTES и передаётся по мере чтения
+    """
+    content: SiteContentModel | None = page_cache.get(url)
+    meta: SiteMetaModel | None = None
+    if content is None:
+        meta = await database.get_site_meta(url=url)
+        if not meta:
+            return HTMLResponse(status_code=404, content="")
+        if meta.size <= page_cache.max_item_bytes:
+            content = await database.get_site_content(url=url)
+            if not content:
+                return HTMLResponse(status_code=404, content="")
+            page_cache.put(url, content)
+    codec: str = content.codec if content else meta.codec
+    content_hash: str | None = content.content_hash if content else meta.content_hash
+    is_encoded: bool = codec != "identity" and accepts_encoding(accept_encoding, codec)
+    headers: dict[str, str] = {"Vary": "Accept-Encoding"}
+    # У страниц, сохранённых до появления content_hash и не попавших в кэш, ETag нет
+    etag: str | None = make_etag(content_hash, codec if is_encoded else "identity") if content_hash else None
+    if etag:
+        headers["ETag"] = etag
+        if if_none_match and etag_matches(if_none_match, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    if codec != "identity" and not is_encoded:
+        # Распаковка на лету: размер заранее неизвестен, Range не поддерживается (отдаётся целиком)
+        if content:
+            html: bytes = await asyncio.to_thread(decompress, content.body, codec)
+            return HTMLResponse(status_code=200, content=html, headers=headers)
+        return StreamingResponse(
+            decompress_stream(database.read_site_chunks(meta, 0, meta.size - 1, int(config.SITE_CHUNK_BYTES)), codec),
+            media_type="text/html; charset=utf-8",
+            headers=headers,
+        )
+
+    # Тело отдаётся в формате хранения: диапазоны считаются по нему
+    if is_encoded:
+        headers["Content-Encoding"] = codec
+    headers["Accept-Ranges"] = "bytes"
+    size: int = len(content.body) if content else meta.size
+    byte_range: tuple[int, int] | None = None
+    # If-Range: диапазон действителен только для той же версии страницы
+    if range and (not if_range or if_range == etag):
+        try:
+            byte_range = parse_range(range, size)
+        except RangeNotSatisfiable:
+            return Response(
+                status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                headers={**headers, "Content-Range": f"bytes */{size}"},
+            )
+    start, end = byte_range or (0, size - 1)
+    status_code: int = status.HTTP_206_PARTIAL_CONTENT if byte_range else status.HTTP_200_OK
+    if byte_range:
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    if content:
+        return Response(
+            status_code=status_code,
+            content=content.body[start:end + 1],
+            media_type="text/html; charset=utf-8",
+            headers=headers,
+        )
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        database.read_site_chunks(meta, start, end, int(config.SITE_CHUNK_BYTES)),
+        status_code=status_code,
+        media_type="text/html; charset=utf-8",
+        headers=headers,
+    )
 
 
 @app.get(path="/ulrs_list",
@@ -95,22 +198,32 @@ async def get_urls_list(
         default="Паттерны корутин",
         max_length=250,
     ),
+    after_id: int | None = Query(
+        description="Продолжение списка: id последнего полученного элемента (заголовок X-Next-After-Id)",
+        default=None,
+        ge=0,
+    ),
 ):
     """
         **Регистронезависимый** поиск в базе данных списка загруженных URL'ов
         limit: ограничение величины списка
         url_contains: часть содержимого URL
         title_contains: часть содержимого title
+        after_id: курсор следующей страницы списка
     """
     urls_list: list[ListElementModel] = await database.get_urls_list(
         limit=limit,
         url_contains=url_contains,
         title_contains=title_contains,
+        after_id=after_id,
     )
     if len(urls_list):
+        # Полная страница - возможно, есть продолжение
+        headers: dict[str, str] = {"X-Next-After-Id": str(urls_list[-1].id)} if len(urls_list) == limit else {}
         return JSONResponse(
             status_code=status.HTTP_200_OK,
             content=jsonable_encoder(urls_list),
+            headers=headers,
         )
     else:
         return JSONResponse(
@@ -119,6 +232,52 @@ async def get_urls_list(
         )
 
 
+
+@app.get(path="/ulrs_export",
+    responses={
+        status.HTTP_200_OK: {
+            "description": "Список в формате NDJSON (одна JSON-запись ListElementModel на строку)",
+            "content": {"application/x-ndjson": {}},
+        },
+    },
+    summary="Выгрузка списка загруженных URL'ов",
+    description="**Регистронезависимый** поиск с потоковой выгрузкой всех найденных записей",
+)
+async def export_urls_list(
+    url_contains: str = Query(
+        description="Регистронезависимый фильтр для поиска по URL",
+        default="",
+        max_length=250,
+    ),
+    title_contains: str = Query(
+        description="Регистронезависимый фильтр для поиска по title страницы",
+        default="",
+        max_length=250,
+    ),
+    after_id: int | None = Query(
+        description="Продолжение прерванной выгрузки: id последней полученной записи",
+        default=None,
+        ge=0,
+    ),
+) -> StreamingResponse:
+    """
+        Выгрузка читается серверным курсором и отдаётся по мере чтения:
+        память не зависит от количества записей
+    """
+    async def ndjson() -> AsyncIterator[bytes]:
+        async for rows in database.stream_urls(
+            url_contains=url_contains,
+            title_contains=title_contains,
+            after_id=after_id,
+        ):
+            yield "".join(
+                json.dumps({"id": row.id, "url": row.url, "title": row.title}, ensure_ascii=False) + "\n"
+                for row in rows
+            ).encode()
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+
 if __name__ == '__main__':
     uvicorn.run("main:app",
                 host='0.0.0.0',
@@ -1 +1,3 @@
 from .list_element_model import ListElementModel
+from .site_content_model import SiteContentModel
+from .site_meta_model import SiteMetaModel
@@ -3,5 +3,6 @@ from pydantic import BaseModel
 
 
 class ListElementModel(BaseModel):
+    id: int = Field(example=420129)
     url: str = Field(example="https://habr.com/ru/post/420129/")
     title: str = Field(example="Паттерны корутин asyncio: за пределами await / Хабр")
@@ -0,0 +1,8 @@
+from pydantic import Field
+from pydantic import BaseModel
+
+
+class SiteContentModel(BaseModel):
+    body: bytes = Field(example=b"<html><body></body></html>")
+    codec: str = Field(example="gzip")
+    content_hash: str = Field(example="9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08")
@@ -0,0 +1,9 @@
+from pydantic import Field
+from pydantic import BaseModel
+
+
+class SiteMetaModel(BaseModel):
+    id: int = Field(example=420129)
+    codec: str = Field(example="gzip")
+    size: int = Field(example=183412)
+    content_hash: str | None = Field(example="9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08")
@@ -1 +1,2 @@
 from .config import Config
+from .page_cache import PageCache
@@ -16,6 +16,10 @@ class Config():
     DB_USERNAME = "spectrum"
     DB_PASSWORD = "spectrum"
 
+    PAGE_CACHE_MAX_BYTES = 64 * 1024 * 1024  # 0 - кэш отключён
+    PAGE_CACHE_TTL_SEC = 60
+    SITE_CHUNK_BYTES = 256 * 1024  # окно чтения страниц, не помещающихся в кэш
+
     DEBUG = 0
 
     def __init__(self):
@@ -0,0 +1,68 @@
+import gzip
+import zlib
+from typing import Callable
+
+# Кодеки хранения HTML; имена совпадают со значениями Content-Encoding
+CODECS: tuple[str, ...] = ("identity", "gzip", "zstd")
+
+
+def compress(data: bytes, codec: str) -> bytes:
+    """ Сжатие содержимого страницы для хранения в БД """
+    match codec:
+        case "identity":
+            return data
+        case "gzip":
+            return gzip.compress(data, compresslevel=6)
+        case "zstd":
+            import zstandard
+            return zstandard.ZstdCompressor(level=3).compress(data)
+        case _:
+            raise ValueError(f"Unknown html codec: {codec}")
+
+
+def decompress(data: bytes, codec: str) -> bytes:
+    """ Восстановление содержимого страницы """
+    match codec:
+        case "identity":
+            return data
+        case "gzip":
+            return gzip.decompress(data)
+        case "zstd":
+            import zstandard
+            return zstandard.ZstdDecompressor().decompress(data)
+        case _:
+            raise ValueError(f"Unknown html codec: {codec}")
+
+
+def decompressor(codec: str) -> Callable[[bytes], bytes]:
+    """ Потоковая распаковка: функция принимает очередной фрагмент и возвращает готовую часть содержимого """
+    match codec:
+        case "identity":
+            return lambda chunk: chunk
+        case "gzip":
+            return zlib.decompressobj(wbits=16 + zlib.MAX_WBITS).decompress
+        case "zstd":
+            import zstandard
+            return zstandard.ZstdDecompressor().decompressobj().decompress
+        case _:
+            raise ValueError(f"Unknown html codec: {codec}")
+
+
+def accepts_encoding(accept_encoding: str, codec: str) -> bool:
+    """
+        Проверка заголовка Accept-Encoding: допускает ли клиент указанное сжатие
+        Запись с именем сжатия важнее "*" независимо от порядка (RFC 9110 12.5.3), q=0 - запрет
+    """
+    qualities: dict[str, str] = {}
+    for item in accept_encoding.split(","):
+        name, *params = [part.strip() for part in item.split(";")]
+        value: str = next((param[2:] for param in params if param.lower().startswith("q=")), "1")
+        qualities.setdefault(name.lower(), value)
+    quality: str | None = qualities.get(codec, qualities.get("*"))
+    if quality is None:
+        return False
+    try:
+        return float(quality) > 0
+    except ValueError:
+        return False
+    return False
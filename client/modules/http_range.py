@@ -0,0 +1,33 @@
+class RangeNotSatisfiable(Exception):
+    """ Диапазон за пределами содержимого (416) """
+
+
+def parse_range(header: str, size: int) -> tuple[int, int] | None:
+    """
+        Заголовок Range (RFC 9110 14.2): единственный диапазон байт
+        Возвращает (начало, конец включительно) или None - отдать содержимое целиком
+        (заголовок отсутствует, другие единицы или несколько диапазонов)
+    """
+    unit, _, ranges = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in ranges:
+        return None
+    first, separator, last = ranges.strip().partition("-")
+    if not separator:
+        return None
+    try:
+        if not first:
+            # Суффикс: последние N байт
+            length: int = int(last)
+            # Пустое содержимое не содержит ни одного байта суффикса
+            if length <= 0 or size == 0:
+                raise RangeNotSatisfiable(header)
+            return max(size - length, 0), size - 1
+        start: int = int(first)
+        end: int = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable(header)
+    if start > end:
+        return None
+    return start, min(end, size - 1)
@@ -0,0 +1,110 @@
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+from models import SiteContentModel
+
+
+class CachedPage(NamedTuple):
+    content: SiteContentModel
+    expires_at: float
+
+
+class PageCache():
+    """
+        LRU-кэш содержимого страниц в памяти процесса
+            - ограничен суммарным размером тел (max_bytes), вытесняются давно запрошенные страницы
+            - запись устаревает через ttl_sec (страница могла быть перезаписана повторным обходом)
+            - страницы больше max_item_bytes не кэшируются, чтобы одна страница не вытесняла все остальные
+    """
+    _max_bytes: int
+    _max_item_bytes: int
+    _ttl_sec: float
+    _pages: OrderedDict[str, CachedPage]
+    size_bytes: int
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+
+    def __init__(self, max_bytes: int, ttl_sec: float, max_item_bytes: int | None = None) -> None:
+        """
+            max_bytes: бюджет памяти на тела страниц (0 - кэш отключён)
+            ttl_sec: время жизни записи
+            max_item_bytes: максимальный размер кэшируемой страницы, по умолчанию - max_bytes / 8
+        """
+        self._max_bytes = max_bytes
+        self._max_item_bytes = max_bytes // 8 if max_item_bytes is None else max_item_bytes
+        self._ttl_sec = ttl_sec
+        self._pages = OrderedDict()
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+    @property
+    def max_item_bytes(self) -> int:
+        return self._max_item_bytes if self._max_bytes else 0
+
+    def _remove(self, url: str) -> None:
+        page: CachedPage = self._pages.pop(url)
+        self.size_bytes -= len(page.content.body)
+
+    def get(self, url: str) -> SiteContentModel | None:
+        page: CachedPage | None = self._pages.get(url)
+        if page is not None and page.expires_at <= time.monotonic():
+            self._remove(url)
+            self.expirations += 1
+            page = None
+        if page is None:
+            self.misses += 1
+            return None
+        self._pages.move_to_end(url)
+        self.hits += 1
+        return page.content
+
+    def put(self, url: str, content: SiteContentModel) -> None:
+        size: int = len(content.body)
+        if not self._max_bytes or size > self._max_item_bytes:
+            return
+        if url in self._pages:
+            self._remove(url)
+        while self._pages and self.size_bytes + size > self._max_bytes:
+            self._remove(next(iter(self._pages)))
+            self.evictions += 1
+        self._pages[url] = CachedPage(content=content, expires_at=time.monotonic() + self._ttl_sec)
+        self.size_bytes += size
+
+    @property
+    def stats(self) -> dict:
+        """ Счётчики для подбора размера кэша и TTL """
+        requests: int = self.hits + self.misses
+        return {
+            "entries": len(self._pages),
+            "size_bytes": self.size_bytes,
+            "max_bytes": self._max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / requests if requests else 0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+def make_etag(content_hash: str, encoding: str) -> str:
+    """
+        Сильный ETag представления: хэш содержимого и Content-Encoding ответа
+        (сжатое и распакованное тело - разные последовательности байт)
+    """
+    return f'"{content_hash}"' if encoding == "identity" else f'"{content_hash}-{encoding}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """ Проверка If-None-Match (слабое сравнение, RFC 9110 13.1.2) """
+    if if_none_match.strip() == "*":
+        return True
+    return any(item.strip().removeprefix("W/") == etag for item in if_none_match.split(","))
@@ -1 +1,2 @@
 from .site_schema import Site
+from .page_content_schema import PageContent
@@ -0,0 +1,16 @@
+from sqlalchemy import Column
+from sqlalchemy import Integer
+from sqlalchemy import String
+from sqlalchemy import LargeBinary
+
+from .site_schema import Base
+
+
+class PageContent(Base):
+    __tablename__ = "page_content"
+
+    content_hash: Column[str] = Column(String, primary_key=True)
+    html: Column[str] = Column(String)
+    html_data: Column[bytes] = Column(LargeBinary)
+    html_codec: Column[str] = Column(String)
+    size: Column[int] = Column(Integer)
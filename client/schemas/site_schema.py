@@ -1,6 +1,7 @@
 from sqlalchemy import Column
 from sqlalchemy import Integer
 from sqlalchemy import String
+from sqlalchemy import LargeBinary
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
@@ -13,3 +14,6 @@ class Site(Base):
     url: Column[str] = Column(String, unique=True, index=True)
     title: Column[str] = Column(String, unique=True)
     html: Column[str] = Column(String)
+    html_data: Column[bytes] = Column(LargeBinary)
+    html_codec: Column[str] = Column(String)
+    content_hash: Column[str] = Column(String)
@@ -1,14 +1,43 @@
-from typing import cast
+import hashlib
+from sqlalchemy import case
 from sqlalchemy import func
+from sqlalchemy import true
 from sqlalchemy import select
+from sqlalchemy import Column
+from sqlalchemy.sql.elements import BinaryExpression
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.sql.selectable import CTE
 from sqlalchemy.sql.selectable import Select
+from sqlalchemy.sql.selectable import TableValuedAlias
 from sqlalchemy.engine.cursor import CursorResult
 from sqlalchemy.engine.row import Row
+from typing import AsyncIterator
 from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.ext.asyncio.engine import AsyncEngine
+from sqlalchemy.ext.asyncio import AsyncResult
 
 from schemas import Site
+from schemas import PageContent
 from models import ListElementModel
+from models import SiteContentModel
+from models import SiteMetaModel
+
+
+def contains_ignore_case(column: Column, value: str) -> BinaryExpression:
+    """
+        column ilike '%value%': условие поддерживается триграммным GIN-индексом (pg_trgm)
+        * lower(column) индексом gin_trgm_ops не покрывается, символы % и _ в value экранируются
+    """
+    escaped: str = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return column.ilike(f"%{escaped}%", escape="\\")
+
+
+def stored(content_column: Column, site_column: Column) -> ColumnElement:
+    """
+        Колонка тела страницы: из page_content по content_hash,
+        для строк, записанных до page_content, - из sites_info
+    """
+    return case((PageContent.content_hash.is_not(None), content_column), else_=site_column)
 
 
 class Database():
@@ -26,34 +55,143 @@ class Database():
         _dsn = f"postgresql+asyncpg://{username}:{password}@{_host}/{database}"
         self._engine = create_async_engine(_dsn, echo=True)
 
-    async def get_site_html(self, url: str) -> str:
-        """ Поиск содержимого страницы по её URL """
+    async def get_site_content(self, url: str) -> SiteContentModel | None:
+        """
+            Поиск содержимого страницы по её URL в формате хранения
+            Строки без html_codec (сохранённые до сжатия) отдаются как identity
+            Строки без content_hash (сохранённые до инкрементального обхода) получают хэш хранимого тела
+        """
         async with self._engine.connect() as connection:
-            query: Select = select(Site).where(Site.url == url)
+            query: Select = select(
+                stored(PageContent.html, Site.html).label("html"),
+                stored(PageContent.html_data, Site.html_data).label("html_data"),
+                stored(PageContent.html_codec, Site.html_codec).label("html_codec"),
+                Site.content_hash,
+            ).select_from(Site).outerjoin(
+                PageContent, PageContent.content_hash == Site.content_hash,
+            ).where(Site.url == url)
             result: CursorResult = await connection.execute(query)
             finded_site: Row | None = result.fetchone()
             if not finded_site:
-                return ""
-            site: Site = cast(Site, finded_site)
+                return None
+
+        if finded_site.html_codec:
+            body: bytes = finded_site.html_data
+            codec: str = finded_site.html_codec
+        else:
+            body = str(finded_site.html).encode()
+            codec = "identity"
+        content_hash: str = finded_site.content_hash or hashlib.sha256(body).hexdigest()
+        return SiteContentModel(body=body, codec=codec, content_hash=content_hash)
+
+    async def get_site_meta(self, url: str) -> SiteMetaModel | None:
+        """ Формат хранения и размер тела страницы в байтах, без чтения самого тела """
+        async with self._engine.connect() as connection:
+            html_data: ColumnElement = stored(PageContent.html_data, Site.html_data)
+            html: ColumnElement = stored(PageContent.html, Site.html)
+            query: Select = select(
+                Site.id,
+                stored(PageContent.html_codec, Site.html_codec).label("html_codec"),
+                func.coalesce(func.octet_length(html_data), func.octet_length(html), 0).label("size"),
+                Site.content_hash,
+            ).select_from(Site).outerjoin(
+                PageContent, PageContent.content_hash == Site.content_hash,
+            ).where(Site.url == url)
+            result: CursorResult = await connection.execute(query)
+            finded_site: Row | None = result.fetchone()
+        if not finded_site:
+            return None
+        return SiteMetaModel(
+            id=finded_site.id,
+            codec=finded_site.html_codec or "identity",
+            size=finded_site.size,
+            content_hash=finded_site.content_hash,
+        )
+
+    async def read_site_chunks(
+        self,
+        meta: SiteMetaModel,
+        start: int,
+        end: int,
+        chunk_size: int,
+    ) -> AsyncIterator[bytes]:
+        """
+            Тело страницы окнами substring по chunk_size байт одним запросом (курсор на стороне сервера)
+            start, end: диапазон байт хранимого тела (end включительно)
+            Тело читается из TOAST и перекодируется (html text) один раз - в материализованном CTE,
+            окна нарезаются из него: отдельный запрос на окно разворачивал бы всё тело заново
+            Если страница перезаписана до чтения (изменился content_hash), окон нет
+        """
+        body: CTE = select(stored(
+            func.coalesce(PageContent.html_data, func.convert_to(PageContent.html, "UTF8")),
+            func.coalesce(Site.html_data, func.convert_to(Site.html, "UTF8")),
+        ).label("body")).select_from(Site).outerjoin(
+            PageContent, PageContent.content_hash == Site.content_hash,
+        ).where(
+            Site.id == meta.id,
+            Site.content_hash.is_not_distinct_from(meta.content_hash),
+        ).cte("body").prefix_with("MATERIALIZED")
+        # lateral: смещения зависят от тела - тело вычисляется до них, а не повторно для каждого смещения
+        offsets: TableValuedAlias = func.generate_series(
+            start, func.least(end, func.octet_length(body.c.body) - 1), chunk_size,
+        ).table_valued("offset").render_derived(name="offsets").lateral()
+        query: Select = select(
+            func.substring(body.c.body, offsets.c.offset + 1, func.least(chunk_size, end + 1 - offsets.c.offset)),
+        ).select_from(body).join(offsets, true()).order_by(offsets.c.offset)
+        async with self._engine.connect() as connection:
+            result: AsyncResult = await connection.stream(query)
+            async for chunk, in result:
+                if not chunk:
+                    return
+                yield chunk
 
-        return str(site.html)
+    @staticmethod
+    def _urls_query(url_contains: str, title_contains: str, after_id: int | None) -> Select:
+        """
+            Только нужные колонки (html не читается), порядок по id - курсор для следующей страницы
+            after_id: id последней полученной записи (keyset-пагинация, без offset)
+        """
+        query: Select = select(Site.id, Site.url, Site.title).order_by(Site.id)
+        if url_contains and len(url_contains.strip()):
+            query = query.filter(contains_ignore_case(Site.url, url_contains))
+        if title_contains and len(title_contains.strip()):
+            query = query.filter(contains_ignore_case(Site.title, title_contains))
+        if after_id is not None:
+            query = query.filter(Site.id > after_id)
+        return query
 
-    async def get_urls_list(self, limit: int, url_contains: str, title_contains: str) -> list[ListElementModel]:
+    async def get_urls_list(
+        self,
+        limit: int,
+        url_contains: str,
+        title_contains: str,
+        after_id: int | None = None,
+    ) -> list[ListElementModel]:
         """
             Регистронезависимый поиск списка страниц по URL и/или title страницы
             limit: ограничение величины списка
             url_contains: часть содержимого URL
             title_contains: часть содержимого title
+            after_id: продолжение списка после записи с этим id
         """
+        query: Select = self._urls_query(url_contains=url_contains, title_contains=title_contains, after_id=after_id)
         async with self._engine.connect() as connection:
-            query: Select = select(Site)
-            if url_contains and len(url_contains.strip()):
-                query = query.filter(func.lower(Site.url).contains(url_contains))
-            if title_contains and len(title_contains.strip()):
-                query = query.filter(func.lower(Site.title).contains(title_contains))
             result: CursorResult = await connection.execute(query.limit(limit))
-            urls_list: list[ListElementModel] = []
-            for site in result:
-                urls_list.append(ListElementModel(url=site.url, title=site.title))
+            return [ListElementModel(id=site.id, url=site.url, title=site.title) for site in result]
 
-        return urls_list
+    async def stream_urls(
+        self,
+        url_contains: str,
+        title_contains: str,
+        after_id: int | None = None,
+        chunk_size: int = 1000,
+    ) -> AsyncIterator[list[Row]]:
+        """
+            Выгрузка всего списка серверным курсором: в памяти не больше chunk_size строк
+            Строки отдаются пачками, чтобы не переключаться на каждую запись
+        """
+        query: Select = self._urls_query(url_contains=url_contains, title_contains=title_contains, after_id=after_id)
+        async with self._engine.connect() as connection:
+            result = await connection.stream(query.execution_options(yield_per=chunk_size))
+            async for rows in result.partitions(chunk_size):
+                yield rows
@@ -2,7 +2,62 @@ create table sites_info(
     id bigserial,
     url varchar(1000),
     html text,
-    title varchar(1000)
+    title varchar(1000),
+    -- Сжатый HTML (html = null), html_codec - значение Content-Encoding (gzip | zstd)
+    html_data bytea,
+    html_codec varchar(16),
+    -- Валидаторы для повторного обхода (If-None-Match / If-Modified-Since)
+    etag varchar(1000),
+    last_modified varchar(100),
+    -- sha256 HTML страницы, ссылки страницы (обход глубже без загрузки при 304)
+    content_hash varchar(64),
+    fetched_at timestamptz,
+    links text[]
+);
+
+-- Тела страниц по sha256 (content_hash): одинаковые страницы хранят одно тело
+-- sites_info.html/html_data заполнены только у строк, записанных до появления page_content
+create table page_content(
+    content_hash varchar(64) primary key,
+    html text,
+    -- Сжатый HTML (html = null), html_codec - значение Content-Encoding (gzip | zstd)
+    html_data bytea,
+    html_codec varchar(16),
+    -- Размер исходного HTML, байт
+    size int not null,
+    created_at timestamptz not null default now()
 );
 
 create unique index i_sites_info_url on sites_info(url);
+-- Порядок и курсор (after_id) списков client-app
+create unique index i_sites_info_id on sites_info(id);
+
+-- Регистронезависимый поиск подстроки (ilike '%...%') в /ulrs_list
+create extension if not exists pg_trgm;
+create index i_sites_info_url_trgm on sites_info using gin (url gin_trgm_ops);
+create index i_sites_info_title_trgm on sites_info using gin (title gin_trgm_ops);
+
+-- Распределённый обход: общая граница для нескольких реплик parser-app
+create table crawl_jobs(
+    id bigserial primary key,
+    start_url varchar(1000) not null unique,
+    max_depth int not null,
+    max_concurrent int not null,
+    default_timeout_sec int not null,
+    incremental boolean not null default false,
+    options jsonb not null default '{}'::jsonb,
+    created_at timestamptz not null default now()
+);
+
+-- state: 0 - в очереди, 1 - забран репликой (claimed_by, claimed_at), 2 - обработан
+create table crawl_frontier(
+    job_id bigint not null references crawl_jobs(id) on delete cascade,
+    url varchar(1000) not null,
+    depth int not null,
+    state smallint not null default 0,
+    claimed_by varchar(255),
+    claimed_at timestamptz,
+    primary key (job_id, url)
+);
+
+create index i_crawl_frontier_open on crawl_frontier(job_id, depth) where state < 2;
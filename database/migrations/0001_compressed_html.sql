@@ -0,0 +1,5 @@
+-- Хранение сжатого HTML (HTML_CODEC=gzip|zstd)
+-- Существующие строки остаются в колонке html (html_codec = null) и отдаются как есть,
+-- при необходимости сжимаются скриптом compress_existing.py
+alter table sites_info add column if not exists html_data bytea;
+alter table sites_info add column if not exists html_codec varchar(16);
@@ -0,0 +1,8 @@
+-- Инкрементальный повторный обход (incremental=true в /init_parse_in_background)
+-- Для существующих строк валидаторы отсутствуют: при первом повторном обходе
+-- страница загружается полностью и состояние заполняется
+alter table sites_info add column if not exists etag varchar(1000);
+alter table sites_info add column if not exists last_modified varchar(100);
+alter table sites_info add column if not exists content_hash varchar(64);
+alter table sites_info add column if not exists fetched_at timestamptz;
+alter table sites_info add column if not exists links text[];
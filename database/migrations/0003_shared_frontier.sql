@@ -0,0 +1,23 @@
+-- Распределённый обход (PUT /init_parse_in_background?distributed=true, PUT /join)
+create table if not exists crawl_jobs(
+    id bigserial primary key,
+    start_url varchar(1000) not null unique,
+    max_depth int not null,
+    max_concurrent int not null,
+    default_timeout_sec int not null,
+    incremental boolean not null default false,
+    created_at timestamptz not null default now()
+);
+
+-- state: 0 - в очереди, 1 - забран репликой (claimed_by, claimed_at), 2 - обработан
+create table if not exists crawl_frontier(
+    job_id bigint not null references crawl_jobs(id) on delete cascade,
+    url varchar(1000) not null,
+    depth int not null,
+    state smallint not null default 0,
+    claimed_by varchar(255),
+    claimed_at timestamptz,
+    primary key (job_id, url)
+);
+
+create index if not exists i_crawl_frontier_open on crawl_frontier(job_id, depth) where state < 2;
@@ -0,0 +1,5 @@
+-- Триграммные индексы для поиска подстроки по url и title (client-app /ulrs_list)
+-- concurrently: таблица не блокируется на запись во время построения (вне транзакции, psql -f)
+create extension if not exists pg_trgm;
+create index concurrently if not exists i_sites_info_url_trgm on sites_info using gin (url gin_trgm_ops);
+create index concurrently if not exists i_sites_info_title_trgm on sites_info using gin (title gin_trgm_ops);
@@ -0,0 +1,2 @@
+-- Индекс по id: порядок и keyset-пагинация (after_id) в /ulrs_list и /ulrs_export
+create unique index concurrently if not exists i_sites_info_id on sites_info(id);
@@ -0,0 +1,18 @@
+-- Хранение тел страниц по хэшу содержимого (page_content): одинаковые страницы хранят одно тело
+-- Существующие строки sites_info продолжают хранить тело в html/html_data и читаются client-app как раньше;
+-- перенос выполняется по желанию (медленный, переписывает таблицу):
+--     update sites_info set content_hash = encode(sha256(convert_to(html, 'UTF8')), 'hex')
+--         where content_hash is null and html is not null;
+--     insert into page_content(content_hash, html, size)
+--         select distinct on (content_hash) content_hash, html, octet_length(convert_to(html, 'UTF8'))
+--         from sites_info where html is not null on conflict do nothing;
+--     update sites_info set html = null where html is not null
+--         and content_hash in (select content_hash from page_content);
+create table if not exists page_content(
+    content_hash varchar(64) primary key,
+    html text,
+    html_data bytea,
+    html_codec varchar(16),
+    size int not null,
+    created_at timestamptz not null default now()
+);
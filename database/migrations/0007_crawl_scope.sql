@@ -0,0 +1,2 @@
+-- Область обхода и бюджет распределённой задачи ({"scope": {...}, "budget": {...}}), общие для реплик (/join)
+alter table crawl_jobs add column if not exists options jsonb not null default '{}'::jsonb;
@@ -1,7 +1,6 @@
 import logging
 import uvicorn
 import asyncio
-from typing import Dict
 from fastapi import status
 from fastapi import FastAPI
 from fastapi import Depends
@@ -10,13 +9,22 @@ from fastapi import HTTPException
 from fastapi.security import HTTPBasic
 from fastapi.security import HTTPBasicCredentials
 from fastapi.responses import JSONResponse
+from fastapi.responses import Response
 
 from models import StartSuccessModel
 from models import StartLimitedModel
+from models import StartQueuedModel
 from models import StartFailedModel
 from models import CancelSuccessModel
 from models import CancelFailedModel
+from models import ResumeFailedModel
+from models import JoinFailedModel
+from models import HealthCheckModel
+from models import QueueStateModel
 from modules import Config
+from modules import metrics
+from modules import CrawlScope
+from modules import CrawlBudget
 from services import Services
 
 
@@ -36,16 +44,41 @@ logger: logging.Logger = logging.getLogger("main.py")
 
 @app.get(path="/",
     responses={
-        status.HTTP_200_OK: {"description": "Сервис доступен", "model": Dict[str, str]},
+        status.HTTP_200_OK: {"description": "Сервис доступен", "model": HealthCheckModel},
     },
     status_code=status.HTTP_200_OK,
     summary="Состояние сервиса и запущенных процессов",
 )
-async def health_check():
-    return {
-        "status": "ok",
-        "parsers": services.parser_service._status_store,
-    }
+async def health_check() -> HealthCheckModel:
+    """ Ход запущенных обходов (страницы по уровням, скорость, оценка времени), запись в БД и очередь результатов """
+    return HealthCheckModel(
+        status="ok",
+        parsers={url: parser.state() for url, parser in services.parser_service._status_store.items()},
+        checkpoints=services.parser_service.list_checkpoints(),
+        queued=services.parser_service.queued(),
+        writer=services.database.stats,
+        queue=QueueStateModel(
+            size=services.queue.qsize(),
+            spilled=services.queue.spilled,
+            spilled_total=services.queue.spilled_total,
+            replayed_total=services.queue.replayed_total,
+        ),
+    )
+
+
+@app.get(path="/metrics",
+    responses={
+        status.HTTP_200_OK: {"description": "Метрики в текстовом формате Prometheus"},
+    },
+    status_code=status.HTTP_200_OK,
+    summary="Метрики сервиса (Prometheus)",
+)
+async def get_metrics() -> Response:
+    """
+        Счётчики и гистограммы загрузки, разбора и записи страниц
+        Скорость (страниц в секунду и т.п.) вычисляется на стороне Prometheus: rate(parser_pages_fetched_total[1m])
+    """
+    return Response(content=metrics.REGISTRY.render(), media_type=metrics.Registry.CONTENT_TYPE)
 
 
 def basic_auth(credentials: HTTPBasicCredentials = Depends(security)):
@@ -66,16 +99,20 @@ def basic_auth(credentials: HTTPBasicCredentials = Depends(security)):
             "description": "Запуск процесса произведен успешно",
             "model": StartSuccessModel,
         },
+        status.HTTP_202_ACCEPTED: {
+            "description": "Достигнут предел одновременных задач, процесс поставлен в очередь",
+            "model": StartQueuedModel,
+        },
         status.HTTP_400_BAD_REQUEST: {
-            "description": "Указанный URL недоступен",
+            "description": "Указанный URL недоступен или уже обрабатывается",
             "model": StartFailedModel,
         },
         status.HTTP_409_CONFLICT: {
-            "description": "Достигнут предел одновременных задач",
+            "description": "Очередь задач заполнена",
             "model": StartLimitedModel,
         },
         status.HTTP_422_UNPROCESSABLE_ENTITY: {
-            "description": "Переданы неправильные аргументы",
+            "description": "Переданы неправильные аргументы (в т.ч. некорректный шаблон allow / deny)",
         },
     },
     summary="Запуск процесса фоновой задачей",
@@ -105,24 +142,109 @@ async def init_parse_in_background(
         gt=0.1,  # Минимальное значение
         lt=60,  # Маскимальное значение
     ),
+    incremental: bool = Query(
+        description="Повторный обход: условные запросы (ETag / Last-Modified), обновляются только изменённые страницы",
+        default=False,
+    ),
+    distributed: bool = Query(
+        description="Граница обхода в Postgres: другие реплики подключаются через /join",
+        default=False,
+    ),
+    scope: str = Query(
+        description="Область обхода: host - хост стартового адреса, domain - домен с поддоменами, any - любые хосты",
+        default="host",
+        regex="^(host|domain|any)$",
+    ),
+    allow: list[str] | None = Query(
+        description="Шаблоны (регулярные выражения) адресов, которые обходятся; пусто - все адреса области",
+        default=None,
+    ),
+    deny: list[str] | None = Query(
+        description="Шаблоны (регулярные выражения) адресов, которые не обходятся",
+        default=None,
+    ),
+    max_pages: int = Query(
+        description="Максимальное количество запросов, 0 - без ограничения",
+        default=0,
+        ge=0,
+    ),
+    max_bytes: int = Query(
+        description="Максимальный объём загруженных страниц, байт, 0 - без ограничения",
+        default=0,
+        ge=0,
+    ),
+    max_duration_sec: int = Query(
+        description="Максимальное время обхода, 0 - без ограничения",
+        default=0,
+        ge=0,
+    ),
+    robots: bool = Query(
+        description="Соблюдать robots.txt: адреса, запрещённые Disallow, не обходятся",
+        default=False,
+    ),
+    sitemaps: bool = Query(
+        description="До загрузки страниц заполнить границу адресами из sitemap (robots.txt Sitemap: или /sitemap.xml)",
+        default=False,
+    ),
+    priority: int = Query(
+        description="Приоритет в очереди задач: больший запускается раньше",
+        default=0,
+        ge=0,
+        le=100,
+    ),
+    weight: int = Query(
+        description="Доля в общих местах загрузки относительно других запущенных процессов",
+        default=1,
+        ge=1,
+        le=10,
+    ),
 ):
     """
         Инициация процесса сбора информации по ссылкам в указанную глубину.
         Сбор производится асинхронно. Состояние запущенных процессов доступно
         [по ссылке /](/)
+        По исчерпании бюджета (max_pages, max_bytes, max_duration_sec) обход завершает начатые запросы
+        и сохраняет контрольную точку: оставшиеся адреса обходятся через /resume
+        При достижении предела одновременных задач процесс ставится в очередь (по priority)
+        и запускается при освобождении места; позиция и время ожидания - [в состоянии сервиса /](/)
     """
-    if services.parser_service.is_busy():
+    try:
+        crawl_scope: CrawlScope = CrawlScope(start_url=start_url, mode=scope, allow=allow, deny=deny)
+    except ValueError as error:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(error))
+
+    if services.parser_service.is_url_processing(start_url) or services.parser_service.is_url_queued(start_url):
         return JSONResponse(
-            status_code=status.HTTP_409_CONFLICT,
-            content=StartLimitedModel().dict(),
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content=StartFailedModel().dict(),
+        )
+
+    options: dict = {
+        "max_depth": max_depth,
+        "max_concurrent": max_concurrent,
+        "default_timeout_sec": default_timeout_sec,
+        "incremental": incremental,
+        "distributed": distributed,
+        "scope": crawl_scope,
+        "budget": CrawlBudget(max_pages=max_pages, max_bytes=max_bytes, max_duration_sec=max_duration_sec),
+        "respect_robots": robots,
+        "seed_sitemaps": sitemaps,
+        "weight": weight,
+    }
+    # Ожидающие задачи запускаются раньше новых
+    if services.parser_service.is_busy() or services.parser_service.has_queued():
+        position: int | None = services.parser_service.enqueue(start_url=start_url, priority=priority, **options)
+        if position is None:
+            return JSONResponse(
+                status_code=status.HTTP_409_CONFLICT,
+                content=StartLimitedModel().dict(),
+            )
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content=StartQueuedModel(position=position).dict(),
         )
 
-    if await services.parser_service.parse_site(
-        start_url=start_url,
-        max_depth=max_depth,
-        max_concurrent=max_concurrent,
-        default_timeout_sec=default_timeout_sec,
-    ):
+    if await services.parser_service.parse_site(start_url=start_url, **options):
         return JSONResponse(
             status_code=status.HTTP_200_OK,
             content=StartSuccessModel().dict(),
@@ -155,20 +277,118 @@ async def cancel_parse_process(
         max_length=250,  # Ограничение количества знаков
     ),
 ) -> JSONResponse:
-    """ Останов запущенного процесса путём указания стартового URL """
+    """ Останов запущенного процесса путём указания стартового URL (ожидающий в очереди процесс удаляется из неё) """
+    if services.parser_service.dequeue(start_url):
+        return JSONResponse(
+            status_code=status.HTTP_200_OK,
+            content=CancelSuccessModel().dict()
+        )
     if not services.parser_service.is_url_processing(start_url):
         return JSONResponse(
             status_code=status.HTTP_400_BAD_REQUEST,
             content=CancelFailedModel().dict()
         )
 
-    services.parser_service.cancel_by_url(start_url=start_url)
+    await services.parser_service.cancel_by_url(start_url=start_url)
     return JSONResponse(
         status_code=status.HTTP_200_OK,
         content=CancelSuccessModel().dict()
     )
 
 
+@app.put(path="/resume",
+    responses={
+        status.HTTP_200_OK: {
+            "description": "Процесс продолжен с контрольной точки",
+            "model": StartSuccessModel,
+        },
+        status.HTTP_400_BAD_REQUEST: {
+            "description": "Контрольная точка не найдена, процесс уже запущен или URL недоступен",
+            "model": ResumeFailedModel,
+        },
+        status.HTTP_409_CONFLICT: {
+            "description": "Достигнут предел одновременных задач",
+            "model": StartLimitedModel,
+        },
+    },
+    summary="Продолжение прерванного процесса",
+    dependencies=[Depends(basic_auth)],
+)
+async def resume_parse_process(
+    start_url: str = Query(
+        description="Стартовый адрес",
+        default="https://habr.com/ru/post/420129/",
+        max_length=250,  # Ограничение количества знаков
+    ),
+) -> JSONResponse:
+    """
+        Продолжение остановленного (/cancel) или прерванного перезапуском процесса
+        с последней контрольной точки: параметры обхода, граница и посещённые адреса
+        восстанавливаются, повторно загружаются только адреса, бывшие в обработке
+    """
+    if services.parser_service.is_busy():
+        return JSONResponse(
+            status_code=status.HTTP_409_CONFLICT,
+            content=StartLimitedModel().dict(),
+        )
+
+    if await services.parser_service.resume(start_url=start_url):
+        return JSONResponse(
+            status_code=status.HTTP_200_OK,
+            content=StartSuccessModel().dict(),
+        )
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        content=ResumeFailedModel().dict(),
+    )
+
+
+@app.put(path="/join",
+    responses={
+        status.HTTP_200_OK: {
+            "description": "Реплика подключена к обходу",
+            "model": StartSuccessModel,
+        },
+        status.HTTP_400_BAD_REQUEST: {
+            "description": "Распределённый обход не найден, уже обрабатывается или URL недоступен",
+            "model": JoinFailedModel,
+        },
+        status.HTTP_409_CONFLICT: {
+            "description": "Достигнут предел одновременных задач",
+            "model": StartLimitedModel,
+        },
+    },
+    summary="Подключение к распределённому процессу",
+    dependencies=[Depends(basic_auth)],
+)
+async def join_parse_process(
+    start_url: str = Query(
+        description="Стартовый адрес",
+        default="https://habr.com/ru/post/420129/",
+        max_length=250,  # Ограничение количества знаков
+    ),
+) -> JSONResponse:
+    """
+        Подключение реплики к обходу, запущенному с distributed=true:
+        адреса забираются из общей границы в Postgres пачками, параметры обхода - из задачи
+    """
+    if services.parser_service.is_busy():
+        return JSONResponse(
+            status_code=status.HTTP_409_CONFLICT,
+            content=StartLimitedModel().dict(),
+        )
+
+    if await services.parser_service.join(start_url=start_url):
+        return JSONResponse(
+            status_code=status.HTTP_200_OK,
+            content=StartSuccessModel().dict(),
+        )
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        content=JoinFailedModel().dict(),
+    )
+
+
 @app.on_event("startup")
 async def startup():
     asyncio.create_task(services.database.start_listener())
@@ -176,6 +396,7 @@ async def startup():
 
 @app.on_event("shutdown")
 async def shutdown():
+    await services.parser_service.close()
     services.database.close()
 
 if __name__ == '__main__':
@@ -1,7 +1,16 @@
 from .site_model import SiteModel
+from .page_state_model import PageStateModel
 from .start_success_model import StartSuccessModel
 from .start_limited_model import StartLimitedModel
+from .start_queued_model import StartQueuedModel
 from .start_failed_model import StartFailedModel
 from .cancel_success_model import CancelSuccessModel
 from .cancel_failed_model import CancelFailedModel
+from .resume_failed_model import ResumeFailedModel
+from .join_failed_model import JoinFailedModel
+from .writer_stats_model import WriterStatsModel
 from .parser_state_model import ParserStateModel
+from .depth_progress_model import DepthProgressModel
+from .queue_state_model import QueueStateModel
+from .queued_job_model import QueuedJobModel
+from .health_check_model import HealthCheckModel
@@ -0,0 +1,9 @@
+from pydantic import Field
+from pydantic import BaseModel
+
+
+class DepthProgressModel(BaseModel):
+    """ Обработанные адреса одного уровня глубины """
+    fetched: int = Field(default=0, example=120)
+    failed: int = Field(default=0, example=3)
+    skipped: int = Field(default=0, example=5)
@@ -1,11 +1,21 @@
 from pydantic import Field
 from pydantic import BaseModel
+
 from .parser_state_model import ParserStateModel
+from .queue_state_model import QueueStateModel
+from .queued_job_model import QueuedJobModel
+from .writer_stats_model import WriterStatsModel
 
 
 class HealthCheckModel(BaseModel):
+    """ Состояние сервиса и запущенных обходов (GET /) """
     status: str = Field(example="ok")
-    parsers: dict[str, ParserStateModel] = Field(example="https://docs.python.org/3/library/typing.html")
+    parsers: dict[str, ParserStateModel] = Field(example={"https://docs.python.org/3/library/typing.html": {}})
+    checkpoints: list[str] = Field(default=[], example=["https://docs.python.org/3/"])
+    # Обходы, ожидающие запуска, в порядке очереди
+    queued: list[QueuedJobModel] = Field(default=[])
+    writer: WriterStatsModel
+    queue: QueueStateModel
 
     def __repr__(self) -> str:
         return str(self.__dict__)
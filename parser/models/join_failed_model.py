@@ -0,0 +1,6 @@
+from pydantic import BaseModel
+
+
+class JoinFailedModel(BaseModel):
+    status: bool = False
+    message: str = "Распределённый процесс не найден, уже запущен или URL недоступен"
@@ -0,0 +1,10 @@
+from pydantic import Field
+from pydantic import BaseModel
+
+
+class PageStateModel(BaseModel):
+    """ Сохранённое состояние страницы для повторного обхода (conditional GET) """
+    etag: str | None = Field(default=None, example='"5f1b-3a2c"')
+    last_modified: str | None = Field(default=None, example="Wed, 21 Oct 2015 07:28:00 GMT")
+    content_hash: str | None = Field(default=None, example="9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08")
+    links: list[str] = Field(default=[], example=["https://docs.python.org/3/library/asyncio.html"])
@@ -1,14 +1,52 @@
 from pydantic import Field
 from pydantic import BaseModel
 
-from modules import Parser
+from .depth_progress_model import DepthProgressModel
 
 
 class ParserStateModel(BaseModel):
+    """ Параметры и ход запущенного обхода """
+    status: str = Field(default="Processing...", example="Processing...")
     max_depth: int = Field(example=2)
     max_concurrent: int = Field(example=10)
     default_timeout_sec: int = Field(example=10)
-    task: Parser = Field(example="<html><body></body></html>")
-
-    class Config:
-        arbitrary_types_allowed = True
+    incremental: bool = Field(default=False, example=False)
+    distributed: bool = Field(default=False, example=False)
+    elapsed_sec: float = Field(default=0, example=42.5)
+    pages_fetched: int = Field(default=0, example=1200)
+    pages_failed: int = Field(default=0, example=12)
+    pages_skipped: int = Field(default=0, example=30)
+    depths: dict[int, DepthProgressModel] = Field(default={}, example={0: {"fetched": 1, "failed": 0, "skipped": 0}})
+    frontier_size: int = Field(default=0, example=850)
+    in_progress: int = Field(default=0, example=10)
+    bytes_downloaded: int = Field(default=0, example=104857600)
+    # Ответы не-HTML типов (тело не загружалось) и страницы, усечённые до max_page_bytes
+    skipped_content_type: int = Field(default=0, example=25)
+    truncated: int = Field(default=0, example=1)
+    pages_per_sec: float = Field(default=0, example=28.4)
+    # Оценка по известной границе: страницы следующих уровней ещё не найдены
+    eta_sec: float | None = Field(default=None, example=30.1)
+    duplicates_skipped: int = Field(default=0, example=4000)
+    visited_size: int = Field(default=0, example=2050)
+    visited_memory_bytes: int = Field(default=0, example=262144)
+    visited_false_positive_rate: float = Field(default=0, example=0.001)
+    not_modified: int = Field(default=0, example=0)
+    unchanged: int = Field(default=0, example=0)
+    # Текущее окно одновременных запросов к хостам (наиболее запрашиваемым)
+    host_limits: dict[str, float] = Field(default={}, example={"habr.com": 6.5})
+    # Область обхода (host | domain | any) и ссылки, отброшенные как внешние
+    scope: str = Field(default="host", example="host")
+    links_out_of_scope: int = Field(default=0, example=1500)
+    # robots.txt: ссылки, запрещённые Disallow, соблюдаемый Crawl-delay; адреса, загруженные в границу из sitemap
+    links_disallowed: int = Field(default=0, example=40)
+    crawl_delay_sec: float = Field(default=0, example=0)
+    seeded_urls: int = Field(default=0, example=25000)
+    # Бюджет запуска (0 - без ограничения) и исчерпанное ограничение: обход завершает начатые запросы
+    max_pages: int = Field(default=0, example=10000)
+    max_bytes: int = Field(default=0, example=0)
+    max_duration_sec: float = Field(default=0, example=3600)
+    stop_reason: str | None = Field(default=None, example=None)
+    # Доля в общих местах загрузки (вес), занятые места и ожидание в очереди обходов до запуска
+    weight: int = Field(default=1, example=1)
+    fetch_slots: int = Field(default=0, example=8)
+    queue_wait_sec: float = Field(default=0, example=12.5)
@@ -0,0 +1,10 @@
+from pydantic import Field
+from pydantic import BaseModel
+
+
+class QueueStateModel(BaseModel):
+    """ Очередь результатов (страницы, ожидающие записи в БД) """
+    size: int = Field(example=150)
+    spilled: int = Field(example=0)
+    spilled_total: int = Field(example=0)
+    replayed_total: int = Field(example=0)
@@ -0,0 +1,10 @@
+from pydantic import Field
+from pydantic import BaseModel
+
+
+class QueuedJobModel(BaseModel):
+    """ Обход, ожидающий запуска в очереди """
+    start_url: str = Field(example="https://docs.python.org/3/")
+    priority: int = Field(default=0, example=10)
+    position: int = Field(example=1)
+    wait_sec: float = Field(default=0, example=35.2)
@@ -0,0 +1,6 @@
+from pydantic import BaseModel
+
+
+class ResumeFailedModel(BaseModel):
+    status: bool = False
+    message: str = "Контрольная точка не найдена, процесс уже запущен или URL недоступен"
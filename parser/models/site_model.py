@@ -1,6 +1,4 @@
-from __future__ import annotations
-
-from bs4 import BeautifulSoup
+from datetime import datetime
 from pydantic import Field
 from pydantic import BaseModel
 
@@ -9,12 +7,13 @@ class SiteModel(BaseModel):
     html: str = Field(example="<html><body></body></html>")
     url: str = Field(example="https://docs.python.org/3/library/typing.html")
     title: str = Field(example="typing — Support for type hints")
+    etag: str | None = Field(default=None, example='"5f1b-3a2c"')
+    last_modified: str | None = Field(default=None, example="Wed, 21 Oct 2015 07:28:00 GMT")
+    content_hash: str | None = Field(default=None, example="9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08")
+    fetched_at: datetime | None = Field(default=None, example="2022-10-01T12:00:00+00:00")
+    links: list[str] = Field(default=[], example=["https://docs.python.org/3/library/asyncio.html"])
+    # Повторный обход: заменить сохранённую страницу, если содержимое изменилось
+    refresh: bool = Field(default=False, example=False)
 
     def __repr__(self) -> str:
         return str(self.__dict__)
-
-    @staticmethod
-    def from_soup(url: str, soup: BeautifulSoup) -> SiteModel:
-        html: str = str(soup)
-        title: str = soup.title.text if soup.title else ""
-        return SiteModel(html=html, url=url, title=title)
@@ -4,6 +4,6 @@ from pydantic import BaseModel
 class StartLimitedModel(BaseModel):
     status: bool = False
     message: str = (
-        "Достигнуто ограничение количества одновременных запусков. "
+        "Достигнуто ограничение количества одновременных запусков и очередь заполнена. "
         "Дождитесь завершения выполнения одной из запущщеых задач."
     )
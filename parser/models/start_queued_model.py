@@ -0,0 +1,8 @@
+from pydantic import Field
+from pydantic import BaseModel
+
+
+class StartQueuedModel(BaseModel):
+    status: bool = True
+    message: str = "Процесс поставлен в очередь и будет запущен при освобождении места"
+    position: int = Field(example=1)
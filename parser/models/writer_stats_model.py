@@ -0,0 +1,53 @@
+from pydantic import Field
+from pydantic import BaseModel
+
+
+class WriterStatsModel(BaseModel):
+    """ Показатели пропускной способности записи в БД """
+    batches: int = Field(default=0, example=120)
+    rows: int = Field(default=0, example=24000)
+    errors: int = Field(default=0, example=0)
+    failed_rows: int = Field(default=0, example=0)
+    dropped_rows: int = Field(default=0, example=0)
+    last_batch_size: int = Field(default=0, example=200)
+    last_batch_ms: float = Field(default=0, example=35.2)
+    avg_batch_size: float = Field(default=0, example=200)
+    rows_per_sec: float = Field(default=0, example=5700.5)
+    write_time_sec: float = Field(default=0, example=4.21)
+    html_bytes: int = Field(default=0, example=52428800)
+    stored_bytes: int = Field(default=0, example=10485760)
+    content_rows: int = Field(default=0, example=18000)
+    deduplicated_rows: int = Field(default=0, example=6000)
+    dedup_ratio: float = Field(default=0, example=0.25)
+
+    def record(self, written: int, failed: int, dropped: int, elapsed_sec: float) -> None:
+        """
+            Учёт обработанной пачки
+            written: записано строк
+            failed: не записано (включая отброшенные)
+            dropped: отброшено из-за ошибок в данных (повтора не будет)
+        """
+        self.batches += 1
+        self.rows += written
+        self.failed_rows += failed
+        self.dropped_rows += dropped
+        self.last_batch_size = written
+        self.last_batch_ms = round(elapsed_sec * 1000, 2)
+        self.write_time_sec += elapsed_sec
+        self.avg_batch_size = round(self.rows / self.batches, 2)
+        self.rows_per_sec = round(self.rows / self.write_time_sec, 2) if self.write_time_sec else 0
+
+    def record_contents(self, written: int, deduplicated: int, html_bytes: int, stored_bytes: int) -> None:
+        """
+            Учёт тел страниц записанной пачки
+            written: записано новых тел (page_content)
+            deduplicated: страниц, сославшихся на уже сохранённое тело
+            html_bytes: исходный размер HTML всех страниц пачки
+            stored_bytes: записано байт тел (после сжатия)
+        """
+        self.content_rows += written
+        self.deduplicated_rows += deduplicated
+        self.html_bytes += html_bytes
+        self.stored_bytes += stored_bytes
+        pages: int = self.content_rows + self.deduplicated_rows
+        self.dedup_ratio = round(self.deduplicated_rows / pages, 4) if pages else 0
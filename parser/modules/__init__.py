@@ -1,2 +1,12 @@
 from .config import Config
 from .parser import Parser
+from .page_parser import create_executor
+from .spill_queue import SpillQueue
+from .checkpoint import CheckpointStore
+from .pg_frontier import PostgresFrontier
+from .host_limiter import HostLimiter
+from .scope import CrawlScope
+from .budget import CrawlBudget
+from .fair_share import FairShare
+from .job_queue import JobQueue
+from . import metrics
@@ -0,0 +1,32 @@
+class CrawlBudget():
+    """
+        Ограничения ресурсов одного запуска обхода (0 - без ограничения)
+            - max_pages: отправленных запросов (точно: проверяется до запроса)
+            - max_bytes: загруженных байт (проверяется после ответа: превышение - не больше загружаемых страниц)
+            - max_duration_sec: время работы
+        По исчерпании новые адреса не выдаются, начатые запросы завершаются
+    """
+    max_pages: int
+    max_bytes: int
+    max_duration_sec: float
+
+    def __init__(self, max_pages: int = 0, max_bytes: int = 0, max_duration_sec: float = 0) -> None:
+        self.max_pages = max_pages
+        self.max_bytes = max_bytes
+        self.max_duration_sec = max_duration_sec
+
+    def exhausted(self, pages: int, bytes_downloaded: int) -> str | None:
+        """ Исчерпанное ограничение (max_pages | max_bytes), None - ресурсы есть; время - таймером обхода """
+        if self.max_pages and pages >= self.max_pages:
+            return "max_pages"
+        if self.max_bytes and bytes_downloaded >= self.max_bytes:
+            return "max_bytes"
+        return None
+
+    def remaining_pages(self, pages: int) -> int | None:
+        """ Оставшиеся запросы, None - без ограничения """
+        return max(0, self.max_pages - pages) if self.max_pages else None
+
+    def to_dict(self) -> dict:
+        """ Параметры для контрольной точки и задачи распределённого обхода: CrawlBudget(**to_dict()) """
+        return {"max_pages": self.max_pages, "max_bytes": self.max_bytes, "max_duration_sec": self.max_duration_sec}
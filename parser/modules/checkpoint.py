@@ -0,0 +1,60 @@
+import os
+import json
+import struct
+import hashlib
+from pathlib import Path
+
+
+class CheckpointStore():
+    """
+        Контрольные точки обходов в локальных файлах, один файл на стартовый URL:
+            - длина заголовка (4 байта), заголовок (json: параметры и граница обхода),
+            - множество занятых адресов (modules.visited.dump_visited)
+        Файл пишется во временный и заменяется целиком: прерванная запись не портит точку
+    """
+    HEADER: struct.Struct = struct.Struct("<I")
+
+    _directory: Path
+
+    def __init__(self, directory: str) -> None:
+        """ directory: каталог контрольных точек (создаётся при необходимости) """
+        self._directory = Path(directory)
+        self._directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, start_url: str) -> Path:
+        return self._directory / f"{hashlib.sha1(start_url.encode()).hexdigest()}.checkpoint"
+
+    def save(self, start_url: str, state: dict, visited: bytes) -> None:
+        """ Атомарная запись контрольной точки (вызывается из отдельного потока) """
+        header: bytes = json.dumps({**state, "start_url": start_url}).encode()
+        path: Path = self._path(start_url)
+        temp_path: Path = path.with_suffix(".tmp")
+        with temp_path.open("wb") as file:
+            file.write(self.HEADER.pack(len(header)))
+            file.write(header)
+            file.write(visited)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+
+    def load(self, start_url: str) -> tuple[dict, bytes] | None:
+        """ Состояние и множество занятых адресов, None - контрольной точки нет """
+        path: Path = self._path(start_url)
+        if not path.exists():
+            return None
+        data: bytes = path.read_bytes()
+        (header_size,) = self.HEADER.unpack_from(data)
+        header_end: int = self.HEADER.size + header_size
+        return json.loads(data[self.HEADER.size:header_end]), data[header_end:]
+
+    def remove(self, start_url: str) -> None:
+        self._path(start_url).unlink(missing_ok=True)
+
+    def list(self) -> list[str]:
+        """ Стартовые URL'ы обходов, которые можно продолжить """
+        urls: list[str] = []
+        for path in sorted(self._directory.glob("*.checkpoint")):
+            with path.open("rb") as file:
+                (header_size,) = self.HEADER.unpack(file.read(self.HEADER.size))
+                urls.append(json.loads(file.read(header_size))["start_url"])
+        return urls
@@ -11,6 +11,29 @@ class Config():
     LOG_FORMAT = "%(asctime)s [%(name)s:%(lineno)s] [%(levelname)s]: %(message)s"
 
     MAX_CONCURRENT_PROCESSES = 2
+    JOB_QUEUE_SIZE = 100  # обходов, ожидающих запуска; сверх - ответ 409
+    # Одновременных запросов всех обходов, делятся между обходами по весам: больше max_concurrent одного обхода (< 30) -
+    # одиночный обход не ограничивается, меньше суммы max_concurrent запущенных обходов - веса действуют
+    FETCH_SLOTS = 32
+
+    HTTP_POOL_LIMIT = 100
+    HTTP_POOL_LIMIT_PER_HOST = 10
+    HTTP_DNS_CACHE_TTL_SEC = 300
+    HTTP_KEEPALIVE_TIMEOUT_SEC = 30
+    # Адаптивное окно запросов к хосту (AIMD), верхняя граница - max_concurrent обхода и HTTP_POOL_LIMIT_PER_HOST
+    HOST_LATENCY_TOLERANCE = 2.0
+    HOST_BACKOFF_FACTOR = 0.5
+    MAX_PAGE_BYTES = 5 * 2 ** 20  # больше - страница усекается, соединение разрывается
+    SITEMAP_MAX_URLS = 1_000_000  # адресов из sitemap на обход (sitemaps=true)
+    MAX_CRAWL_DELAY_SEC = 30  # больший Crawl-delay из robots.txt сокращается до этого значения
+
+    PARSE_EXECUTOR = "process"  # process | thread | inline
+    PARSE_WORKERS = 0  # 0 - по количеству ядер
+    LINK_EXTRACTOR = "bs4"  # bs4 | lxml | stream | lxml_stream
+
+    VISITED_SET = "exact"  # exact | fingerprint64 | fingerprint128 | bloom
+    BLOOM_CAPACITY = 10_000_000
+    BLOOM_ERROR_RATE = 0.001
 
     AUTH_USERNAME = "admin"
     AUTH_PASSWORD = "pwd"
@@ -20,6 +43,22 @@ class Config():
     DB_DATABASE = "spectrum"
     DB_USERNAME = "spectrum"
     DB_PASSWORD = "spectrum"
+    DB_WRITE_MODE = "copy"  # copy | executemany
+    DB_BATCH_SIZE = 200
+    DB_FLUSH_INTERVAL_MS = 500
+    HTML_CODEC = "identity"  # identity | gzip | zstd
+
+    RESULT_QUEUE_SIZE = 200
+    SPILL_DIR = "./spill"
+    SPILL_SEGMENT_ITEMS = 500
+    SPILL_AFTER_MS = 1000
+
+    CHECKPOINT_DIR = "./checkpoints"
+    CHECKPOINT_INTERVAL_SEC = 30
+
+    FRONTIER_BATCH_SIZE = 20
+    FRONTIER_LEASE_SEC = 120
+    FRONTIER_POLL_MS = 500
 
     DEBUG = 0
 
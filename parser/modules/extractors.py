@@ -0,0 +1,165 @@
+import re
+from typing import NamedTuple
+from html.parser import HTMLParser
+from bs4 import BeautifulSoup
+from bs4.element import ResultSet
+
+
+class ExtractedPage(NamedTuple):
+    """ Результат разбора: ссылки (href как есть), title и значение <base href> """
+    links: list[str]
+    title: str
+    base: str = ""
+
+
+class LinkExtractor():
+    """ Интерфейс извлечения ссылок, title и <base href> из документа """
+    name: str
+
+    def extract(self, html: str) -> ExtractedPage:
+        raise NotImplementedError
+
+
+class Bs4Extractor(LinkExtractor):
+    """ BeautifulSoup + html.parser: полное дерево на чистом Python """
+    name = "bs4"
+
+    def extract(self, html: str) -> ExtractedPage:
+        soup: BeautifulSoup = BeautifulSoup(html, 'html.parser')
+        all_links: ResultSet = soup.find_all('a')
+        links: list[str] = [link for next_link in all_links if (link := next_link.get('href'))]
+        title: str = soup.title.text if soup.title else ""
+        base_tag = soup.find('base', href=True)
+        return ExtractedPage(links, title, base_tag.get('href') if base_tag else "")
+
+
+class LxmlExtractor(LinkExtractor):
+    """ lxml (libxml2): дерево строится в C """
+    name = "lxml"
+    # lxml не принимает str с объявлением кодировки (XHTML), текст уже декодирован
+    XML_DECLARATION: re.Pattern = re.compile(r"^\s*<\?xml[^>]*\?>")
+
+    def extract(self, html: str) -> ExtractedPage:
+        import lxml.html
+        from lxml.etree import ParserError
+
+        try:
+            document = lxml.html.document_fromstring(self.XML_DECLARATION.sub("", html, count=1))
+        except ParserError:
+            # Пустой документ
+            return ExtractedPage([], "")
+        links: list[str] = [link for link in document.xpath('//a/@href') if link]
+        title: str = document.findtext('.//title') or ""
+        bases: list[str] = document.xpath('//base/@href')
+        return ExtractedPage(links, title, bases[0] if bases else "")
+
+
+class _EventCollector():
+    """ Общее состояние потоковых разборщиков: только ссылки, title и <base href> """
+    links: list[str]
+    title: str
+    base: str
+    _in_title: bool
+    _title_done: bool
+
+    def _reset(self) -> None:
+        self.links = []
+        self.title = ""
+        self.base = ""
+        self._in_title = False
+        self._title_done = False
+
+    def _on_start(self, tag: str, href: str | None) -> None:
+        if tag == 'a':
+            if href:
+                self.links.append(href)
+        elif tag == 'title' and not self._title_done:
+            self._in_title = True
+        elif tag == 'base' and href and not self.base:
+            self.base = href
+
+    def _on_end(self, tag: str) -> None:
+        if tag == 'title' and self._in_title:
+            self._in_title = False
+            self._title_done = True
+
+    def _on_data(self, data: str) -> None:
+        if self._in_title:
+            self.title += data
+
+    def _result(self) -> ExtractedPage:
+        return ExtractedPage(self.links, self.title, self.base)
+
+
+class _TokenCollector(_EventCollector, HTMLParser):
+    """ Потоковый разбор html.parser """
+
+    def __init__(self) -> None:
+        HTMLParser.__init__(self, convert_charrefs=True)
+        self._reset()
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        self._on_start(tag, next((value for name, value in attrs if name == 'href'), None))
+
+    def handle_endtag(self, tag: str) -> None:
+        self._on_end(tag)
+
+    def handle_data(self, data: str) -> None:
+        self._on_data(data)
+
+
+class StreamExtractor(LinkExtractor):
+    """ Потоковый токенизатор html.parser без построения дерева """
+    name = "stream"
+
+    def extract(self, html: str) -> ExtractedPage:
+        collector: _TokenCollector = _TokenCollector()
+        collector.feed(html)
+        collector.close()
+        return collector._result()
+
+
+class _LxmlTarget(_EventCollector):
+    """ Приёмник событий lxml: дерево не создаётся """
+
+    def __init__(self) -> None:
+        self._reset()
+
+    def start(self, tag: str, attrib: dict) -> None:
+        self._on_start(tag, attrib.get('href'))
+
+    def end(self, tag: str) -> None:
+        self._on_end(tag)
+
+    def data(self, data: str) -> None:
+        self._on_data(data)
+
+    def close(self) -> ExtractedPage:
+        return self._result()
+
+
+class LxmlStreamExtractor(LinkExtractor):
+    """ Токенизатор libxml2 с событийным приёмником (SAX-подобно), без дерева """
+    name = "lxml_stream"
+
+    def extract(self, html: str) -> ExtractedPage:
+        from lxml import etree
+
+        if not html:
+            return ExtractedPage([], "")
+        parser = etree.HTMLParser(target=_LxmlTarget())
+        parser.feed(html)
+        return parser.close()
+
+
+EXTRACTORS: dict[str, type[LinkExtractor]] = {
+    extractor.name: extractor
+    for extractor in (Bs4Extractor, LxmlExtractor, StreamExtractor, LxmlStreamExtractor)
+}
+
+
+def get_extractor(name: str) -> LinkExtractor:
+    """ Экземпляр извлекателя по имени из конфигурации """
+    if name not in EXTRACTORS:
+        raise ValueError(f"Unknown link extractor: {name}")
+    return EXTRACTORS[name]()
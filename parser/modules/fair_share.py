@@ -0,0 +1,111 @@
+import asyncio
+from collections import deque
+from types import TracebackType
+
+
+class FairSlot():
+    """ Место загрузки обхода (async with) """
+    _share: "FairShare"
+    _key: str
+
+    def __init__(self, share: "FairShare", key: str) -> None:
+        self._share = share
+        self._key = key
+
+    async def __aenter__(self) -> "FairSlot":
+        await self._share._acquire(self._key)
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self._share._release(self._key)
+
+
+class FairShare():
+    """
+        Общие места загрузки (одновременные запросы всех обходов) с распределением по весам
+        Пока мест хватает, они выдаются сразу; при нехватке освободившееся место передаётся обходу,
+        выбранному плавным взвешенным циклическим алгоритмом (smooth weighted round-robin):
+        ожидающие обходы получают места пропорционально весам, большой обход не вытесняет малые
+    """
+    _capacity: int
+    _in_use: int
+    _weights: dict[str, int]
+    _current: dict[str, int]
+    _in_use_by: dict[str, int]
+    _waiters: dict[str, deque[asyncio.Future]]
+
+    def __init__(self, capacity: int) -> None:
+        """ capacity: количество мест (одновременных запросов всех обходов) """
+        self._capacity = capacity
+        self._in_use = 0
+        self._weights = {}
+        self._current = {}
+        self._in_use_by = {}
+        self._waiters = {}
+
+    def register(self, key: str, weight: int = 1) -> None:
+        """ Обход, получающий места (key - стартовый адрес) """
+        self._weights[key] = max(1, weight)
+        self._current[key] = 0
+        self._in_use_by[key] = 0
+        self._waiters[key] = deque()
+
+    def unregister(self, key: str) -> None:
+        """ Завершённый обход: его места уже освобождены воркерами """
+        for mapping in (self._weights, self._current, self._in_use_by, self._waiters):
+            mapping.pop(key, None)
+
+    def slot(self, key: str) -> FairSlot:
+        return FairSlot(share=self, key=key)
+
+    def in_use(self, key: str) -> int:
+        """ Места, занятые обходом """
+        return self._in_use_by.get(key, 0)
+
+    async def _acquire(self, key: str) -> None:
+        if self._in_use < self._capacity and not any(self._waiters.values()):
+            self._in_use += 1
+            self._in_use_by[key] += 1
+            return
+        waiter: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._waiters[key].append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Место уже передано - передаётся следующему
+                self._release(key)
+            elif waiter in self._waiters.get(key, ()):
+                self._waiters[key].remove(waiter)
+            raise
+
+    def _pick(self) -> str | None:
+        """ Следующий обход среди ожидающих: текущий вес растёт на свой вес, выбранный уменьшается на сумму весов """
+        for waiters in self._waiters.values():
+            # Отменённые ожидания, ещё не удалённые своими задачами
+            while waiters and waiters[0].done():
+                waiters.popleft()
+        waiting: list[str] = [key for key, waiters in self._waiters.items() if waiters]
+        if not waiting:
+            return None
+        for key in waiting:
+            self._current[key] += self._weights[key]
+        chosen: str = max(waiting, key=self._current.__getitem__)
+        self._current[chosen] -= sum(self._weights[key] for key in waiting)
+        return chosen
+
+    def _release(self, key: str) -> None:
+        if key in self._in_use_by:
+            self._in_use_by[key] -= 1
+        chosen: str | None = self._pick()
+        if chosen is None:
+            self._in_use -= 1
+            return
+        # Место передаётся без освобождения: занять его до пробуждения ожидающего не может никто
+        self._in_use_by[chosen] += 1
+        self._waiters[chosen].popleft().set_result(None)
@@ -0,0 +1,210 @@
+import time
+import asyncio
+from collections import deque
+from http import HTTPStatus
+from types import TracebackType
+from urllib.parse import urlparse
+from aiohttp import ClientConnectorError
+from aiohttp import ServerTimeoutError
+from aiohttp import ServerDisconnectedError
+
+
+class HostState():
+    """ Окно одновременных запросов к одному хосту """
+    limit: float
+    in_flight: int
+    requests: int
+    decreases: int
+    slow_start: bool
+    baseline_sec: float | None
+    recent_sec: float
+    decreased_at: float
+    delay_sec: float
+    next_start_at: float
+    waiters: deque[asyncio.Future]
+
+    def __init__(self, limit: float) -> None:
+        self.limit = limit
+        self.in_flight = 0
+        self.requests = 0
+        self.decreases = 0
+        # До первого снижения окно растёт на 1 за каждый успешный ответ (удваивается за время ответа)
+        self.slow_start = True
+        self.baseline_sec = None
+        self.recent_sec = 0
+        self.decreased_at = 0
+        # Минимальный интервал между началами запросов (Crawl-delay из robots.txt)
+        self.delay_sec = 0
+        self.next_start_at = 0
+        self.waiters = deque()
+
+
+class HostSlot():
+    """
+        Запрос к хосту: ожидание свободного места в окне и учёт результата при выходе
+        Таймауты и ошибки соединения учитываются автоматически, статус ответа - через status()
+    """
+    # Исключения, означающие перегрузку хоста
+    CONGESTION_ERRORS: tuple[type[BaseException], ...] = (
+        asyncio.TimeoutError,
+        ServerTimeoutError,
+        ClientConnectorError,
+        ServerDisconnectedError,
+    )
+
+    _limiter: "HostLimiter"
+    _host: str
+    _started_at: float
+    _congested: bool
+
+    def __init__(self, limiter: "HostLimiter", host: str) -> None:
+        self._limiter = limiter
+        self._host = host
+        self._started_at = 0
+        self._congested = False
+
+    def start(self) -> None:
+        """ Начало запроса: ожидание других ограничений после места в окне (общие места загрузки) не входит во время ответа """
+        self._started_at = time.monotonic()
+
+    def status(self, status: int) -> None:
+        """ 429 и 5xx - сигнал перегрузки """
+        self._congested = status == HTTPStatus.TOO_MANY_REQUESTS or status >= HTTPStatus.INTERNAL_SERVER_ERROR
+
+    async def __aenter__(self) -> "HostSlot":
+        await self._limiter._acquire(self._host)
+        self._started_at = time.monotonic()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        if exc_type is not None and issubclass(exc_type, self.CONGESTION_ERRORS):
+            self._congested = True
+        # Отмена обхода и прочие ошибки (неверный URL и т.п.) о состоянии хоста не говорят
+        neutral: bool = exc_type is not None and not self._congested
+        self._limiter._release(self._host, started_at=self._started_at, congested=self._congested, neutral=neutral)
+
+
+class HostLimiter():
+    """
+        Адаптивное ограничение одновременных запросов к каждому хосту (AIMD)
+            - окно растёт, пока среднее время ответа не превышает базовое больше чем в latency_tolerance раз:
+              на 1 за ответ до первой перегрузки, затем на 1 за окно ответов
+            - таймаут, ошибка соединения, 429 или 5xx уменьшают окно в backoff_factor раз
+              (один раз на окно: ответы на запросы, начатые до снижения, окно повторно не уменьшают)
+        Окно ограничено сверху max_limit (max_concurrent обхода, не больше соединений пула на хост)
+        Для хоста с Crawl-delay (set_delay) запросы дополнительно начинаются не чаще одного за delay_sec
+    """
+    _max_limit: int
+    _min_limit: int
+    _initial_limit: int
+    _latency_tolerance: float
+    _backoff_factor: float
+    _hosts: dict[str, HostState]
+
+    def __init__(
+        self,
+        max_limit: int,
+        min_limit: int = 1,
+        initial_limit: int = 1,
+        latency_tolerance: float = 2.0,
+        backoff_factor: float = 0.5,
+    ) -> None:
+        """
+            max_limit: верхняя граница окна одного хоста
+            min_limit: нижняя граница окна
+            initial_limit: начальное окно нового хоста
+            latency_tolerance: во сколько раз время ответа может превысить базовое без остановки роста
+            backoff_factor: множитель окна при перегрузке
+        """
+        self._max_limit = max_limit
+        self._min_limit = min(min_limit, max_limit)
+        self._initial_limit = max(self._min_limit, min(initial_limit, max_limit))
+        self._latency_tolerance = latency_tolerance
+        self._backoff_factor = backoff_factor
+        self._hosts = {}
+
+    def slot(self, url: str) -> HostSlot:
+        """ Место в окне хоста адреса (async with) """
+        return HostSlot(limiter=self, host=urlparse(url).netloc.lower())
+
+    def set_delay(self, url: str, delay_sec: float) -> None:
+        """ Минимальный интервал между началами запросов к хосту адреса """
+        self._state(urlparse(url).netloc.lower()).delay_sec = delay_sec
+
+    def _state(self, host: str) -> HostState:
+        state: HostState | None = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = HostState(limit=self._initial_limit)
+        return state
+
+    async def _acquire(self, host: str) -> None:
+        state: HostState = self._state(host)
+        while state.in_flight >= int(state.limit):
+            waiter: asyncio.Future = asyncio.get_running_loop().create_future()
+            state.waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    # Место передано отменённому ожиданию - передаётся следующему
+                    self._wake(state)
+                raise
+        state.in_flight += 1
+        state.requests += 1
+        if state.delay_sec:
+            # Время начала резервируется до ожидания: одновременные запросы получают последовательные интервалы
+            now: float = time.monotonic()
+            wait_sec: float = state.next_start_at - now
+            state.next_start_at = max(now, state.next_start_at) + state.delay_sec
+            if wait_sec > 0:
+                try:
+                    await asyncio.sleep(wait_sec)
+                except asyncio.CancelledError:
+                    state.in_flight -= 1
+                    self._wake(state)
+                    raise
+
+    def _wake(self, state: HostState) -> None:
+        """ Пробуждение ожидающих по числу свободных мест """
+        free: int = int(state.limit) - state.in_flight
+        while free > 0 and state.waiters:
+            waiter: asyncio.Future = state.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+    def _release(self, host: str, started_at: float, congested: bool, neutral: bool) -> None:
+        state: HostState = self._hosts[host]
+        state.in_flight -= 1
+        if congested:
+            if started_at >= state.decreased_at:
+                state.limit = max(float(self._min_limit), state.limit * self._backoff_factor)
+                state.decreased_at = time.monotonic()
+                state.decreases += 1
+                state.slow_start = False
+        elif not neutral:
+            latency_sec: float = time.monotonic() - started_at
+            if state.baseline_sec is None:
+                state.baseline_sec = state.recent_sec = latency_sec
+            # Текущее время ответа - скользящее среднее (разброс отдельных ответов сглаживается),
+            # базовое - его минимум, медленно следующий вверх (сервер мог стать медленнее навсегда)
+            state.recent_sec += (latency_sec - state.recent_sec) * 0.3
+            state.baseline_sec = min(state.recent_sec, state.baseline_sec + (state.recent_sec - state.baseline_sec) * 0.01)
+            if state.recent_sec <= state.baseline_sec * self._latency_tolerance:
+                state.limit = min(
+                    float(self._max_limit),
+                    state.limit + (1 if state.slow_start else 1 / state.limit),
+                )
+        self._wake(state)
+
+    def limits(self, top: int = 20) -> dict[str, float]:
+        """ Текущие окна хостов с наибольшим числом запросов """
+        hosts: list[tuple[str, HostState]] = sorted(
+            self._hosts.items(), key=lambda item: item[1].requests, reverse=True,
+        )[:top]
+        return {host: round(state.limit, 2) for host, state in hosts}
@@ -0,0 +1,48 @@
+import codecs
+import charset_normalizer
+from aiohttp import ClientResponse
+
+# Типы содержимого, которые разбираются как HTML
+HTML_TYPES: frozenset[str] = frozenset({"text/html", "application/xhtml+xml"})
+# Заголовок Accept запросов обхода: остальные типы - с низким приоритетом (сервер может выбрать HTML-вариант)
+ACCEPT: str = "text/html,application/xhtml+xml;q=0.9,*/*;q=0.1"
+
+
+def is_html(content_type: str | None) -> bool:
+    """ Проверка Content-Type до чтения тела; без заголовка тип определяется разбором (декодированием) """
+    if not content_type:
+        return True
+    return content_type.split(";", 1)[0].strip().lower() in HTML_TYPES
+
+
+async def read_body(response: ClientResponse, max_bytes: int, chunk_bytes: int = 65536) -> tuple[bytes, bool]:
+    """
+        Чтение тела частями не больше max_bytes (после распаковки Content-Encoding)
+        При превышении соединение разрывается, остаток не загружается
+        Возвращает тело и признак усечения
+    """
+    chunks: list[bytes] = []
+    size: int = 0
+    async for chunk in response.content.iter_chunked(chunk_bytes):
+        chunks.append(chunk)
+        size += len(chunk)
+        if size > max_bytes:
+            response.close()
+            return b"".join(chunks)[:max_bytes], True
+    return b"".join(chunks), False
+
+
+def decode_body(body: bytes, charset: str | None, truncated: bool = False) -> str:
+    """
+        Декодирование по charset из Content-Type, без него - по содержимому (как ClientResponse.text())
+        Усечённое тело может оканчиваться неполным символом - он отбрасывается
+    """
+    encoding: str | None = None
+    if charset:
+        try:
+            encoding = codecs.lookup(charset).name
+        except LookupError:
+            encoding = None
+    if encoding is None:
+        encoding = charset_normalizer.detect(body)["encoding"] or "utf-8"
+    return body.decode(encoding, errors="ignore" if truncated else "strict")
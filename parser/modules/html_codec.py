@@ -0,0 +1,32 @@
+import gzip
+
+# Кодеки хранения HTML; имена совпадают со значениями Content-Encoding
+CODECS: tuple[str, ...] = ("identity", "gzip", "zstd")
+
+
+def compress(data: bytes, codec: str) -> bytes:
+    """ Сжатие содержимого страницы для хранения в БД """
+    match codec:
+        case "identity":
+            return data
+        case "gzip":
+            return gzip.compress(data, compresslevel=6)
+        case "zstd":
+            import zstandard
+            return zstandard.ZstdCompressor(level=3).compress(data)
+        case _:
+            raise ValueError(f"Unknown html codec: {codec}")
+
+
+def decompress(data: bytes, codec: str) -> bytes:
+    """ Восстановление содержимого страницы """
+    match codec:
+        case "identity":
+            return data
+        case "gzip":
+            return gzip.decompress(data)
+        case "zstd":
+            import zstandard
+            return zstandard.ZstdDecompressor().decompress(data)
+        case _:
+            raise ValueError(f"Unknown html codec: {codec}")
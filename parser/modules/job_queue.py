@@ -0,0 +1,73 @@
+import time
+import heapq
+import itertools
+
+
+class QueuedJob():
+    """ Обход, ожидающий запуска: параметры ParserService.parse_site """
+    start_url: str
+    priority: int
+    options: dict
+    queued_at: float
+    _sequence: int
+
+    def __init__(self, start_url: str, priority: int, options: dict, sequence: int) -> None:
+        self.start_url = start_url
+        self.priority = priority
+        self.options = options
+        self.queued_at = time.monotonic()
+        self._sequence = sequence
+
+    def __lt__(self, other: "QueuedJob") -> bool:
+        """ Больший приоритет - раньше, при равном - в порядке постановки """
+        return (-self.priority, self._sequence) < (-other.priority, other._sequence)
+
+    @property
+    def wait_sec(self) -> float:
+        return round(time.monotonic() - self.queued_at, 2)
+
+
+class JobQueue():
+    """ Очередь обходов с приоритетами (в памяти процесса) """
+    _maxsize: int
+    _heap: list[QueuedJob]
+    _counter: itertools.count
+
+    def __init__(self, maxsize: int) -> None:
+        """ maxsize: количество ожидающих обходов, сверх - отказ """
+        self._maxsize = maxsize
+        self._heap = []
+        self._counter = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def __contains__(self, start_url: str) -> bool:
+        return any(job.start_url == start_url for job in self._heap)
+
+    def put(self, start_url: str, priority: int, options: dict) -> int | None:
+        """ Постановка в очередь, возвращает позицию (с 1), None - очередь заполнена или обход уже в ней """
+        if len(self._heap) >= self._maxsize or start_url in self:
+            return None
+        job: QueuedJob = QueuedJob(start_url=start_url, priority=priority, options=options, sequence=next(self._counter))
+        heapq.heappush(self._heap, job)
+        return self.jobs().index(job) + 1
+
+    def pop(self) -> QueuedJob | None:
+        return heapq.heappop(self._heap) if self._heap else None
+
+    def remove(self, start_url: str) -> bool:
+        """ Отмена ожидающего обхода """
+        for index, job in enumerate(self._heap):
+            if job.start_url == start_url:
+                self._heap.pop(index)
+                heapq.heapify(self._heap)
+                return True
+        return False
+
+    def jobs(self) -> list[QueuedJob]:
+        """ Ожидающие обходы в порядке запуска """
+        return sorted(self._heap)
+
+    def clear(self) -> None:
+        self._heap.clear()
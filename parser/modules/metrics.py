@@ -0,0 +1,197 @@
+import math
+from bisect import bisect_left
+from typing import Callable
+
+
+# Границы корзин гистограмм задержек, секунды
+LATENCY_BUCKETS: tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    pairs: list[str] = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Metric():
+    """ Базовая метрика: имя, описание, имена меток """
+    TYPE: str = "untyped"
+
+    name: str
+    help: str
+    labelnames: tuple[str, ...]
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+
+    def samples(self) -> list[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        return "\n".join([f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.TYPE}", *self.samples()])
+
+
+class Counter(Metric):
+    """
+        Монотонно растущий счётчик
+        Обновление - сложение в словаре без блокировок (только из event loop'а)
+    """
+    TYPE: str = "counter"
+
+    _values: dict[tuple[str, ...], float]
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> None:
+        super().__init__(name=name, help=help, labelnames=labelnames)
+        self._values = {} if labelnames else {(): 0}
+
+    def inc(self, amount: float = 1, labels: tuple[str, ...] = ()) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, labels: tuple[str, ...] = ()) -> float:
+        return self._values.get(labels, 0)
+
+    def samples(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in sorted(self._values.items())
+        ]
+
+
+class Gauge(Metric):
+    """ Текущее значение, вычисляемое при чтении метрик (функция без аргументов) """
+    TYPE: str = "gauge"
+
+    _function: Callable[[], float]
+
+    def __init__(self, name: str, help: str, function: Callable[[], float]) -> None:
+        super().__init__(name=name, help=help)
+        self._function = function
+
+    def samples(self) -> list[str]:
+        return [f"{self.name} {_format_value(self._function())}"]
+
+
+class Histogram(Metric):
+    """
+        Распределение значений по корзинам (le - включительно)
+        Наблюдение - bisect по границам и два сложения, накопительные суммы считаются при чтении
+    """
+    TYPE: str = "histogram"
+
+    _buckets: tuple[float, ...]
+    _counts: list[int]
+    count: int
+    sum: float
+
+    def __init__(self, name: str, help: str, buckets: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        super().__init__(name=name, help=help)
+        self._buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self._buckets) + 1)
+        self.count = 0
+        self.sum = 0
+
+    def observe(self, value: float) -> None:
+        self._counts[bisect_left(self._buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def samples(self) -> list[str]:
+        lines: list[str] = []
+        cumulative: int = 0
+        for bound, count in zip((*self._buckets, math.inf), self._counts):
+            cumulative += count
+            lines.append(f'{self.name}_bucket{{le="{_format_value(bound)}"}} {cumulative}')
+        lines.append(f"{self.name}_sum {_format_value(self.sum)}")
+        lines.append(f"{self.name}_count {self.count}")
+        return lines
+
+
+class Registry():
+    """ Набор метрик процесса, отдаётся в текстовом формате Prometheus (/metrics) """
+    # charset добавляется Response
+    CONTENT_TYPE: str = "text/plain; version=0.0.4"
+
+    _metrics: dict[str, Metric]
+
+    def __init__(self) -> None:
+        self._metrics = {}
+
+    def _register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric is already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name=name, help=help, labelnames=labelnames))
+
+    def histogram(self, name: str, help: str, buckets: tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name=name, help=help, buckets=buckets))
+
+    def gauge(self, name: str, help: str, function: Callable[[], float]) -> Gauge:
+        """ Повторная регистрация заменяет функцию (например, при пересоздании сервисов) """
+        self._metrics.pop(name, None)
+        return self._register(Gauge(name=name, help=help, function=function))
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+REGISTRY: Registry = Registry()
+
+PAGES_FETCHED: Counter = REGISTRY.counter(
+    "parser_pages_fetched_total", "Pages fetched with a response (rate() - pages per second)",
+)
+FETCH_ERRORS: Counter = REGISTRY.counter(
+    "parser_fetch_errors_total", "Fetches failed without a response", labelnames=("error",),
+)
+RESPONSES: Counter = REGISTRY.counter(
+    "parser_responses_total", "Responses by HTTP status", labelnames=("status",),
+)
+BYTES_DOWNLOADED: Counter = REGISTRY.counter(
+    "parser_downloaded_bytes_total", "Response body bytes downloaded",
+)
+PAGES_SKIPPED: Counter = REGISTRY.counter(
+    "parser_pages_skipped_total", "Responses not parsed", labelnames=("reason",),
+)
+LINKS_OUT_OF_SCOPE: Counter = REGISTRY.counter(
+    "parser_links_out_of_scope_total", "Links dropped by the crawl scope",
+)
+LINKS_DISALLOWED: Counter = REGISTRY.counter(
+    "parser_links_disallowed_total", "Links dropped by robots.txt Disallow rules",
+)
+BUDGET_STOPS: Counter = REGISTRY.counter(
+    "parser_budget_stops_total", "Crawls stopped early by a budget", labelnames=("budget",),
+)
+PAGES_TRUNCATED: Counter = REGISTRY.counter(
+    "parser_pages_truncated_total", "Pages cut at the size limit (connection aborted)",
+)
+FETCH_SECONDS: Histogram = REGISTRY.histogram(
+    "parser_fetch_seconds", "Request latency including body download",
+)
+PARSE_SECONDS: Histogram = REGISTRY.histogram(
+    "parser_parse_seconds", "HTML parsing time (link and title extraction)",
+)
+RESULT_QUEUE_WAIT_SECONDS: Histogram = REGISTRY.histogram(
+    "parser_result_queue_wait_seconds", "Wait for a free slot in the result queue (writer backpressure)",
+)
+FRONTIER_WAIT_SECONDS: Histogram = REGISTRY.histogram(
+    "parser_frontier_wait_seconds", "Worker wait for the next URL (idle workers)",
+)
+WRITER_BATCH_SECONDS: Histogram = REGISTRY.histogram(
+    "parser_writer_batch_seconds", "Database write latency per batch",
+)
+WRITER_ROWS: Counter = REGISTRY.counter(
+    "parser_writer_rows_total", "Rows processed by the database writer", labelnames=("result",),
+)
@@ -0,0 +1,40 @@
+import os
+from concurrent.futures import Executor
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ProcessPoolExecutor
+
+from .extractors import ExtractedPage
+from .extractors import LinkExtractor
+from .extractors import get_extractor
+
+# Экземпляры извлекателей, по одному на процесс
+_extractors: dict[str, LinkExtractor] = {}
+
+
+def parse_page(html: str, extractor: str = "bs4") -> ExtractedPage:
+    """
+        Разбор документа: ссылки (href как есть), title страницы и <base href>
+        * функция уровня модуля, т.к. выполняется в дочерних процессах
+        extractor: имя реализации из modules.extractors.EXTRACTORS
+    """
+    if extractor not in _extractors:
+        _extractors[extractor] = get_extractor(extractor)
+    return _extractors[extractor].extract(html)
+
+
+def create_executor(kind: str, workers: int = 0) -> Executor | None:
+    """
+        Пул для разбора HTML вне event loop'а
+        kind: process - пул процессов, thread - пул потоков, inline - разбор в event loop'е
+        workers: размер пула, 0 - по количеству ядер
+    """
+    max_workers: int = workers or os.cpu_count() or 1
+    match kind:
+        case "process":
+            return ProcessPoolExecutor(max_workers=max_workers)
+        case "thread":
+            return ThreadPoolExecutor(max_workers=max_workers)
+        case "inline":
+            return None
+        case _:
+            raise ValueError(f"Unknown parse executor: {kind}")
@@ -1,13 +1,21 @@
+import time
 import logging
 import asyncio
+import hashlib
 import aiohttp
+import contextlib
 from asyncio import Queue
+from datetime import datetime
+from datetime import timezone
+from typing import Callable
+from typing import Awaitable
+from contextlib import aclosing
+from collections import deque
 from http import HTTPStatus
-from typing import Coroutine
-from contextlib import suppress
+from concurrent.futures import Executor
+from urllib.parse import urljoin
 from urllib.parse import urlparse
-from bs4 import BeautifulSoup
-from bs4.element import ResultSet
+from urllib.robotparser import RobotFileParser
 from aiohttp import ClientResponse
 from aiohttp import ClientSession
 from aiohttp import InvalidURL
@@ -17,20 +25,214 @@ from aiohttp import ServerTimeoutError
 from aiohttp import ServerDisconnectedError
 
 from models import SiteModel
+from models import PageStateModel
+from models import ParserStateModel
+from models import DepthProgressModel
+from . import metrics
+from .urls import canonicalize
+from .visited import ExactSet
+from .visited import VisitedSet
+from .visited import dump_visited
+from .checkpoint import CheckpointStore
+from .pg_frontier import PostgresFrontier
+from .progress import RateMeter
+from .host_limiter import HostLimiter
+from .scope import CrawlScope
+from .budget import CrawlBudget
+from .fair_share import FairShare
+from .fair_share import FairSlot
+from .sitemap import ROBOTS_AGENT
+from .sitemap import fetch_robots
+from .sitemap import iter_sitemap
+from .extractors import ExtractedPage
+from .page_parser import parse_page
+from .html_body import ACCEPT
+from .html_body import is_html
+from .html_body import read_body
+from .html_body import decode_body
+
+
+class Frontier():
+    """
+        Граница обхода: очереди адресов (url, depth) по уровням глубины
+        Уровень n + 1 выдаётся только после полной обработки уровня n,
+        поэтому каждая страница получает минимальную глубину (обход в ширину)
+        Адрес считается занятым при постановке в очередь: повторно не добавляется
+    """
+    _max_depth: int
+    _seen: VisitedSet
+    _levels: dict[int, deque[str]]
+    _current_depth: int
+    _in_progress: dict[str, int]
+    _is_finished: bool
+    _condition: asyncio.Condition
+    duplicates: int
+
+    def __init__(self, max_depth: int, seen: VisitedSet | None = None) -> None:
+        """
+            max_depth: максимальная глубина (адреса глубже не добавляются)
+            seen: множество уже поставленных в очередь адресов
+        """
+        self._max_depth = max_depth
+        self._seen = ExactSet() if seen is None else seen
+        self._levels = {level: deque() for level in range(max_depth + 1)}
+        self._current_depth = 0
+        # Выданные, но не обработанные адреса (url -> depth) - попадают в контрольную точку
+        self._in_progress = {}
+        self._is_finished = False
+        self._condition = asyncio.Condition()
+        self.duplicates = 0
+
+    def __len__(self) -> int:
+        return sum(len(level) for level in self._levels.values())
+
+    @property
+    def in_progress(self) -> int:
+        """ Количество выданных, но не обработанных адресов """
+        return len(self._in_progress)
+
+    def put(self, url: str, depth: int) -> bool:
+        """
+            Добавление адреса в очередь своего уровня
+            Возвращает False, если адрес глубже max_depth или уже был добавлен
+        """
+        if depth > self._max_depth or not self.claim(url):
+            return False
+        self._levels[depth].append(url)
+        return True
+
+    def claim(self, url: str) -> bool:
+        """ Отметка адреса как занятого, False - адрес уже был занят (дубликат) """
+        if url in self._seen:
+            self.duplicates += 1
+            return False
+        self._seen.add(url)
+        return True
+
+    def _next_level(self) -> bool:
+        """ Переход к ближайшему непустому уровню, False - обход завершён """
+        for depth in range(self._current_depth + 1, self._max_depth + 1):
+            if self._levels[depth]:
+                self._current_depth = depth
+                return True
+        self._is_finished = True
+        return False
+
+    async def get(self) -> tuple[str, int] | None:
+        """ Следующий адрес текущего уровня, None - адресов больше не будет """
+        async with self._condition:
+            while not self._is_finished:
+                level: deque[str] = self._levels[self._current_depth]
+                if level:
+                    url: str = level.popleft()
+                    self._in_progress[url] = self._current_depth
+                    return url, self._current_depth
+                if not self._in_progress and not self._next_level():
+                    # Разбудить остальные воркеры для завершения
+                    self._condition.notify_all()
+                    break
+                if self._in_progress:
+                    await self._condition.wait()
+        return None
+
+    async def task_done(self, url: str) -> None:
+        """ Отметка об окончании обработки адреса, полученного через get() """
+        async with self._condition:
+            del self._in_progress[url]
+            self._condition.notify_all()
+
+    async def put_many(self, urls: list[str], depth: int) -> int:
+        """ Пакетное добавление (адреса из sitemap), возвращает количество новых адресов """
+        return sum(self.put(url=url, depth=depth) for url in urls)
+
+    async def close(self) -> None:
+        """ Досрочное завершение: get() больше не выдаёт адресов, оставшиеся сохраняются в snapshot() """
+        async with self._condition:
+            self._is_finished = True
+            self._condition.notify_all()
+
+    def snapshot(self) -> dict:
+        """
+            Состояние границы для контрольной точки
+            Адреса в обработке возвращаются в начало своих уровней: после восстановления они будут загружены повторно
+        """
+        levels: dict[int, list[str]] = {depth: list(level) for depth, level in self._levels.items()}
+        for url, depth in self._in_progress.items():
+            levels[depth].insert(0, url)
+        return {
+            "current_depth": self._current_depth,
+            "levels": {str(depth): urls for depth, urls in levels.items() if urls},
+            "duplicates": self.duplicates,
+        }
+
+    def restore(self, snapshot: dict) -> None:
+        """ Восстановление из snapshot(), адреса уже отмечены в множестве занятых """
+        self._current_depth = snapshot["current_depth"]
+        for depth, urls in snapshot["levels"].items():
+            self._levels[int(depth)].extend(urls)
+        self.duplicates = snapshot["duplicates"]
+
 
 class Parser():
-    """ Рекурсивная обработка данных сайта """
-    _url_site: str
+    """ Обход сайта в ширину фиксированным пулом воркеров """
+    # Ошибки загрузки, при которых адрес пропускается (учитываются в метриках)
+    FETCH_ERRORS: tuple[type[Exception], ...] = (
+        InvalidURL,
+        ClientConnectorError,
+        AssertionError,
+        TooManyRedirects,
+        ServerTimeoutError,
+        UnicodeError,
+        ServerDisconnectedError,
+    )
+
     _url_start: str
     _status_store: dict
     _max_depth: int
     _max_concurrent: int
     _default_timeout_sec: int
-    _processed_urls: set[str]
-    _client: aiohttp.ClientSession
+    _processed_urls: VisitedSet
+    _session: ClientSession | None
+    _executor: Executor | None
+    _extractor: str
     _session_timeout: aiohttp.ClientTimeout
-    _semaphores: dict[int, asyncio.Semaphore]
+    _frontier: Frontier | PostgresFrontier
     _queue: Queue
+    _incremental: bool
+    _page_state_loader: Callable[[str], Awaitable[PageStateModel | None]] | None
+    _checkpoints: CheckpointStore | None
+    _checkpoint_interval_sec: float
+    _checkpoint_lock: asyncio.Lock
+    _is_restored: bool
+    _started_at: float
+    _fetched: list[int]
+    _failed: list[int]
+    _skipped: list[int]
+    _rate: RateMeter
+    _host_limiter: HostLimiter
+    _max_page_bytes: int
+    _scope: CrawlScope
+    _budget: CrawlBudget
+    _dispatched: int
+    _respect_robots: bool
+    _seed_sitemaps: bool
+    _sitemap_max_urls: int
+    _max_crawl_delay_sec: float
+    _robots: RobotFileParser | None
+    _robots_host: str | None
+    _fetch_slots: FairShare | None
+    _weight: int
+    stop_reason: str | None
+    queue_wait_sec: float
+    not_modified: int
+    unchanged: int
+    bytes_downloaded: int
+    skipped_content_type: int
+    truncated: int
+    links_out_of_scope: int
+    links_disallowed: int
+    seeded_urls: int
+    crawl_delay_sec: float
 
     def __init__(
         self,
@@ -39,97 +241,463 @@ class Parser():
         status_store: dict,
         max_depth: int = 0,
         max_concurrent: int = 1,
-        default_timeout_sec: int = 10
+        default_timeout_sec: int = 10,
+        session: ClientSession | None = None,
+        executor: Executor | None = None,
+        extractor: str = "bs4",
+        visited: VisitedSet | None = None,
+        incremental: bool = False,
+        page_state_loader: Callable[[str], Awaitable[PageStateModel | None]] | None = None,
+        checkpoints: CheckpointStore | None = None,
+        checkpoint_interval_sec: float = 30,
+        frontier: PostgresFrontier | None = None,
+        host_limiter: HostLimiter | None = None,
+        max_page_bytes: int = 5 * 2 ** 20,
+        scope: CrawlScope | None = None,
+        budget: CrawlBudget | None = None,
+        respect_robots: bool = False,
+        seed_sitemaps: bool = False,
+        sitemap_max_urls: int = 1_000_000,
+        max_crawl_delay_sec: float = 30,
+        fetch_slots: FairShare | None = None,
+        weight: int = 1,
     ) -> None:
         """
             start_url: адрес начала обхода ссылок
             max_depth: максимальная глубина обработки ссылок
-            max_concurrent: максимальное количество одновременных запросов для каждого уровня
+            max_concurrent: количество воркеров (верхняя граница одновременных запросов к хосту)
             default_timeout_sec: таймаут ответа (задержавшиеся ответы не обрабатываются)
+            session: общая HTTP-сессия с пулом соединений (ParserService)
+            executor: пул для разбора HTML (None - разбор в event loop'е)
+            extractor: реализация извлечения ссылок (modules.extractors)
+            visited: множество занятых адресов (modules.visited), по умолчанию - точное
+            incremental: повторный обход - условные запросы по сохранённым валидаторам,
+                неизменённые страницы не загружаются, не разбираются и не перезаписываются
+            page_state_loader: получение сохранённого состояния страницы (Database.get_page_state)
+            checkpoints: хранилище контрольных точек (None - обход не сохраняется)
+            checkpoint_interval_sec: период сохранения контрольной точки
+            frontier: общая граница в Postgres (распределённый обход), по умолчанию - в памяти
+            host_limiter: адаптивное окно запросов к каждому хосту, по умолчанию - до max_concurrent
+            max_page_bytes: максимальный размер загружаемой страницы, остаток не загружается
+            scope: область обхода (modules.scope), по умолчанию - хост стартового адреса
+            budget: ограничения ресурсов запуска (modules.budget), по умолчанию - без ограничений
+            respect_robots: адреса стартового хоста, запрещённые его robots.txt (Disallow), не обходятся
+            seed_sitemaps: до загрузки страниц граница заполняется адресами из sitemap (robots.txt Sitemap:
+                или /sitemap.xml) на уровне 1
+            sitemap_max_urls: максимальное количество адресов из sitemap
+            max_crawl_delay_sec: верхняя граница соблюдаемого Crawl-delay (robots.txt читается при respect_robots
+                или seed_sitemaps)
+            fetch_slots: общие для всех обходов места загрузки (ParserService), None - без общего ограничения
+            weight: доля обхода в общих местах загрузки относительно других обходов
         """
         self.logger = logging.getLogger(self.__class__.__name__)
         self._queue = queue
+        self._session = session
+        self._executor = executor
+        self._extractor = extractor
         self._url_start = start_url
-        self._url_site = "://".join(urlparse(start_url)[:2])
         self._url_domain = urlparse(start_url)[1]
         self._status_store = status_store
         self._max_depth = max_depth
         self._max_concurrent = max_concurrent
         self._default_timeout_sec = default_timeout_sec
-        self._semaphores = {level: asyncio.Semaphore(max_concurrent) for level in range(max_depth + 1)}
-        self._processed_urls = set()
+        self._processed_urls = ExactSet() if visited is None else visited
+        self._frontier = Frontier(max_depth=max_depth, seen=self._processed_urls) if frontier is None else frontier
+        self._incremental = incremental
+        self._page_state_loader = page_state_loader
+        self._checkpoints = checkpoints
+        self._checkpoint_interval_sec = checkpoint_interval_sec
+        self._checkpoint_lock = asyncio.Lock()
+        self._is_restored = False
+        # Счётчики хода обхода по уровням глубины: обновляются только из event loop'а, без блокировок
+        self._started_at = time.monotonic()
+        self._fetched = [0] * (max_depth + 1)
+        self._failed = [0] * (max_depth + 1)
+        self._skipped = [0] * (max_depth + 1)
+        self._rate = RateMeter()
+        self._host_limiter = HostLimiter(max_limit=max_concurrent) if host_limiter is None else host_limiter
+        self.not_modified = 0
+        self.unchanged = 0
+        self.bytes_downloaded = 0
+        self.skipped_content_type = 0
+        self.truncated = 0
+        self._max_page_bytes = max_page_bytes
+        self._scope = CrawlScope(start_url=start_url) if scope is None else scope
+        self._budget = CrawlBudget() if budget is None else budget
+        # Запросы, отправленные в этом запуске (учёт max_pages до запроса)
+        self._dispatched = 0
+        self.stop_reason = None
+        self.links_out_of_scope = 0
+        self._respect_robots = respect_robots
+        self._seed_sitemaps = seed_sitemaps
+        self._sitemap_max_urls = sitemap_max_urls
+        self._max_crawl_delay_sec = max_crawl_delay_sec
+        self._robots = None
+        # robots.txt действует только для своего хоста: правила стартового хоста не применяются к другим хостам области
+        self._robots_host = urlparse(start_url).hostname
+        self.links_disallowed = 0
+        self.seeded_urls = 0
+        self.crawl_delay_sec = 0
+        self._fetch_slots = fetch_slots
+        self._weight = weight
+        # Время ожидания в очереди обходов до запуска (ParserService)
+        self.queue_wait_sec = 0
         self._session_timeout = aiohttp.ClientTimeout(
             total=None,
             sock_connect=default_timeout_sec,
             sock_read=default_timeout_sec
         )
 
-    def _get_links(self, url: str, html: str) -> set:
-        """ Сбор ссылок из документа """
+    @staticmethod
+    def _collect(page: ExtractedPage, base_url: str) -> set:
+        """ Приведение ссылок к каноническому виду относительно адреса страницы или <base href> """
+        if page.base:
+            base_url = canonicalize(page.base, base_url) or base_url
         result_set: set = set()
-        soup: BeautifulSoup = BeautifulSoup(html, 'html.parser')
-        all_links: ResultSet = soup.find_all('a')
-        for next_link in all_links:
-            link: str = next_link.get('href')
-            if link:
-                # Обработка относительных ссылок
-                if link.startswith('/'):
-                    link = f"{self._url_site}{link}"
+        for href in page.links:
+            if link := canonicalize(href, base_url):
                 result_set.add(link)
+        return result_set
 
-        self._queue.put_nowait(SiteModel.from_soup(url=url, soup=soup))
+    async def _parse(
+        self,
+        url: str,
+        html: str,
+        base_url: str | None = None,
+        etag: str | None = None,
+        last_modified: str | None = None,
+        content_hash: str | None = None,
+    ) -> set:
+        """
+            Сбор ссылок из документа в пуле разбора, event loop не блокируется
+            Передача страницы на сохранение ожидает места в очереди результатов
+            base_url: итоговый адрес ответа (после перенаправлений), по умолчанию - url
+            etag, last_modified, content_hash: состояние страницы для повторного обхода
+        """
+        started: float = time.perf_counter()
+        if self._executor:
+            loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+            page: ExtractedPage = await loop.run_in_executor(self._executor, parse_page, html, self._extractor)
+        else:
+            page = parse_page(html, self._extractor)
+        links: set = self._collect(page=page, base_url=base_url or url)
+        metrics.PARSE_SECONDS.observe(time.perf_counter() - started)
+        started = time.perf_counter()
+        await self._queue.put(SiteModel(
+            html=html,
+            url=url,
+            title=page.title,
+            etag=etag,
+            last_modified=last_modified,
+            content_hash=content_hash,
+            fetched_at=datetime.now(timezone.utc),
+            links=sorted(links),
+            refresh=self._incremental,
+        ))
+        metrics.RESULT_QUEUE_WAIT_SECONDS.observe(time.perf_counter() - started)
+        return links
 
-        return result_set
+    async def _load_state(self, url: str) -> PageStateModel | None:
+        """ Сохранённое состояние страницы, None - обычный (полный) запрос """
+        if not self._incremental or not self._page_state_loader:
+            return None
+        try:
+            return await self._page_state_loader(url)
+        except Exception:
+            self.logger.exception(f"Page state is unavailable, full fetch: {url}")
+            return None
 
     async def _fetch(self, session: ClientSession, url: str, current_depth: int) -> None:
-        """ Рекурсивная процедура обработки каждого адреса """
-        if current_depth > self._max_depth:
+        """ Обработка адреса, найденные ссылки добавляются в следующий уровень границы """
+        state: PageStateModel | None = await self._load_state(url)
+        headers: dict[str, str] = {"Accept": ACCEPT}
+        if state and state.etag:
+            headers["If-None-Match"] = state.etag
+        if state and state.last_modified:
+            headers["If-Modified-Since"] = state.last_modified
+        links: set = set()
+        page: dict | None = None
+        started: float = time.perf_counter()
+        try:
+            # Место в окне хоста освобождается после загрузки тела, разбор выполняется вне окна
+            # Общее место загрузки занимается после места в окне (не простаивает в ожидании хоста),
+            # время ответа хоста отсчитывается после его получения
+            async with self._host_limiter.slot(url) as slot, self._fetch_slot():
+                slot.start()
+                async with session.get(url=url, headers=headers, timeout=self._session_timeout) as response:
+                    slot.status(response.status)
+                    metrics.PAGES_FETCHED.inc()
+                    metrics.RESPONSES.inc(labels=(str(response.status),))
+                    self._fetched[current_depth] += 1
+                    self._rate.add()
+                    if response.status >= HTTPStatus.BAD_REQUEST:
+                        self._failed[current_depth] += 1
+                    final_url: str = canonicalize(str(response.url), url) or url
+                    # Перенаправление за пределы области обхода
+                    if final_url != url and final_url not in self._scope:
+                        self._skip(current_depth, reason="out_of_scope")
+                        return
+                    # Цель перенаправления уже занята другой задачей
+                    if final_url != url and not self._frontier.claim(final_url):
+                        self._skip(current_depth, reason="duplicate_redirect")
+                        return
+                    if response.status == HTTPStatus.NOT_MODIFIED and state:
+                        # Страница не изменилась: обход продолжается по сохранённым ссылкам
+                        self.not_modified += 1
+                        links = set(state.links)
+                    elif response.status == HTTPStatus.OK:
+                        if not is_html(response.headers.get("Content-Type")):
+                            # PDF, изображения, архивы: тело не загружается, соединение разрывается
+                            self._skip(current_depth, reason="content_type")
+                            response.close()
+                            return
+                        body, truncated = await read_body(response, max_bytes=self._max_page_bytes)
+                        metrics.BYTES_DOWNLOADED.inc(len(body))
+                        metrics.FETCH_SECONDS.observe(time.perf_counter() - started)
+                        self.bytes_downloaded += len(body)
+                        if truncated:
+                            # Разбирается начало страницы (ссылки обычно в нём)
+                            self.truncated += 1
+                            metrics.PAGES_TRUNCATED.inc()
+                        try:
+                            html: str = decode_body(body, charset=response.charset, truncated=truncated)
+                        except UnicodeDecodeError:
+                            # Не текст или неверная кодировка: страница пропускается
+                            self._skip(current_depth, reason="undecodable")
+                            return
+                        content_hash: str = hashlib.sha256(html.encode()).hexdigest()
+                        if state and state.content_hash == content_hash:
+                            # Сервер не поддерживает валидаторы, но содержимое то же
+                            self.unchanged += 1
+                            links = set(state.links)
+                        else:
+                            page = {
+                                "html": html,
+                                "base_url": final_url,
+                                "etag": response.headers.get("ETag"),
+                                "last_modified": response.headers.get("Last-Modified"),
+                                "content_hash": content_hash,
+                            }
+                    else:
+                        metrics.FETCH_SECONDS.observe(time.perf_counter() - started)
+        # Подавление "не интересных" исключений
+        except self.FETCH_ERRORS as error:
+            metrics.FETCH_ERRORS.inc(labels=(type(error).__name__,))
+            self._failed[current_depth] += 1
             return
+        if page is not None:
+            links = await self._parse(url=url, **page)
+        # Граница принимает только новые URL'ы в области обхода
+        for link in links:
+            if self._admit(link):
+                self._frontier.put(url=link, depth=current_depth + 1)
 
-        # Подавление "не интересных" исключений
-        with suppress(
-            InvalidURL,
-            ClientConnectorError,
-            AssertionError,
-            TooManyRedirects,
-            ServerTimeoutError,
-            UnicodeError,
-            ServerDisconnectedError,
+    def _admit(self, url: str) -> bool:
+        """ Адрес в области обхода и не запрещён robots.txt (адреса стартового хоста) """
+        if url not in self._scope:
+            self.links_out_of_scope += 1
+            metrics.LINKS_OUT_OF_SCOPE.inc()
+            return False
+        if (
+            self._robots is not None
+            and urlparse(url).hostname == self._robots_host
+            and not self._robots.can_fetch(ROBOTS_AGENT, url)
         ):
-            # ! Семафор для каждой глубины, запрос данных
-            async with self._semaphores[current_depth], session.get(url=url) as response:
-                self._processed_urls.add(url)
-                if response.status == HTTPStatus.OK:
-                    # Подавление в случае ошибки с кодировкой
-                    with suppress(UnicodeDecodeError):
-                        html: str = await response.text()
-                        links: set = self._get_links(url=url, html=html)
-                        # Добавить в обработку только новые URL'ы
-                        links_to_fetch = links - self._processed_urls
-                        # Формирование задач на обработку "в глубину"
-                        tasks: list[Coroutine] = []
-                        for url in links_to_fetch:
-                            tasks.append(
-                                self._fetch(
-                                    session=session,
-                                    url=url,
-                                    current_depth=current_depth + 1
-                                )
-                            )
-                        await asyncio.gather(*tasks)
+            self.links_disallowed += 1
+            metrics.LINKS_DISALLOWED.inc()
+            return False
+        return True
+
+    def _fetch_slot(self) -> FairSlot | contextlib.nullcontext:
+        """ Место загрузки в общем пуле обходов (занимается после места в окне хоста) """
+        return self._fetch_slots.slot(self._url_start) if self._fetch_slots else contextlib.nullcontext()
+
+    def _skip(self, depth: int, reason: str) -> None:
+        """ Учёт пропущенной страницы (ответ получен, но страница не разбирается) """
+        self._skipped[depth] += 1
+        metrics.PAGES_SKIPPED.inc(labels=(reason,))
+        if reason == "content_type":
+            self.skipped_content_type += 1
+
+    async def _read_robots(self) -> list[str]:
+        """ Правила robots.txt стартового хоста: Crawl-delay - в окно хоста, возвращает адреса Sitemap: """
+        robots: RobotFileParser | None = await fetch_robots(
+            session=self._session, start_url=self._url_start, timeout=self._session_timeout,
+        )
+        if robots is None:
+            return []
+        delay_sec: float | None = robots.crawl_delay(ROBOTS_AGENT)
+        if delay_sec:
+            self.crawl_delay_sec = min(float(delay_sec), self._max_crawl_delay_sec)
+            self._host_limiter.set_delay(self._url_start, self.crawl_delay_sec)
+        if self._respect_robots:
+            self._robots = robots
+        return robots.site_maps() or []
+
+    async def _seed(self, sitemap_urls: list[str], batch_size: int = 1000) -> None:
+        """
+            Заполнение границы адресами из sitemap до загрузки страниц (уровень 1 - как ссылки стартовой страницы)
+            Файлы разбираются потоково, адреса добавляются пачками: память не зависит от размера sitemap
+        """
+        if self._max_depth < 1:
+            return
+        batch: list[str] = []
+        async with aclosing(iter_sitemap(
+            session=self._session,
+            sitemap_urls=sitemap_urls or [urljoin(self._url_start, "/sitemap.xml")],
+            timeout=self._session_timeout,
+        )) as locations:
+            async for location in locations:
+                url: str | None = canonicalize(location, self._url_start)
+                if url and self._admit(url):
+                    batch.append(url)
+                if len(batch) >= batch_size:
+                    self.seeded_urls += await self._frontier.put_many(batch, depth=1)
+                    batch = []
+                    if self.seeded_urls >= self._sitemap_max_urls:
+                        break
+        if batch:
+            self.seeded_urls += await self._frontier.put_many(batch, depth=1)
+        self.logger.info(f"Seeded from sitemaps: {self.seeded_urls} URLs, {self._url_start}...")
+
+    async def _stop(self, reason: str) -> None:
+        """ Исчерпан бюджет: граница больше не выдаёт адресов, воркеры завершают начатые запросы """
+        if self.stop_reason is not None:
+            return
+        self.stop_reason = reason
+        metrics.BUDGET_STOPS.inc(labels=(reason,))
+        self.logger.info(f"Budget exhausted ({reason}), stopping: {self._url_start}...")
+        await self._frontier.close()
+
+    async def _deadline(self) -> None:
+        """ Таймер max_duration_sec """
+        await asyncio.sleep(self._budget.max_duration_sec - (time.monotonic() - self._started_at))
+        await self._stop("max_duration_sec")
+
+    async def _worker(self, session: ClientSession) -> None:
+        """ Воркер: забирает адреса из границы обхода до её исчерпания или исчерпания бюджета """
+        while True:
+            reason: str | None = self._budget.exhausted(pages=self._dispatched, bytes_downloaded=self.bytes_downloaded)
+            if reason is not None:
+                await self._stop(reason)
+            if self.stop_reason is not None:
+                break
+            # Место под запрос занимается до ожидания адреса: max_pages не превышается параллельными воркерами
+            self._dispatched += 1
+            started: float = time.perf_counter()
+            item: tuple[str, int] | None = await self._frontier.get()
+            metrics.FRONTIER_WAIT_SECONDS.observe(time.perf_counter() - started)
+            if item is None:
+                self._dispatched -= 1
+                break
+            url, depth = item
+            try:
+                await self._fetch(session=session, url=url, current_depth=depth)
+            except Exception:
+                self.logger.exception(f"Fetch failed: {url}")
+                self._failed[depth] += 1
+            finally:
+                await self._frontier.task_done(url)
 
     async def check_site_avail(self, session) -> bool:
         """ Первичная проверка доступности ресурса """
-        async with session.get(self._url_start, allow_redirects=True) as response:
+        async with session.get(self._url_start, allow_redirects=True, timeout=self._session_timeout) as response:
             return response.status == HTTPStatus.OK
 
+    def snapshot(self) -> tuple[dict, bytes]:
+        """ Параметры и состояние обхода для контрольной точки: (заголовок, множество занятых адресов) """
+        state: dict = {
+            "max_depth": self._max_depth,
+            "max_concurrent": self._max_concurrent,
+            "default_timeout_sec": self._default_timeout_sec,
+            "incremental": self._incremental,
+            "frontier": self._frontier.snapshot(),
+            "not_modified": self.not_modified,
+            "unchanged": self.unchanged,
+            "distributed": isinstance(self._frontier, PostgresFrontier),
+            "scope": self._scope.to_dict(),
+            "budget": self._budget.to_dict(),
+            "respect_robots": self._respect_robots,
+            "weight": self._weight,
+        }
+        return state, dump_visited(self._processed_urls)
+
+    def restore(self, state: dict) -> None:
+        """ Продолжение обхода с контрольной точки (множество занятых адресов передаётся в конструктор) """
+        self._frontier.restore(state["frontier"])
+        self.not_modified = state["not_modified"]
+        self.unchanged = state["unchanged"]
+        self._is_restored = True
+
+    async def _write_checkpoint(self, state: dict, visited: bytes) -> None:
+        """ Запись в отдельном потоке, записи одного обхода не пересекаются """
+        async with self._checkpoint_lock:
+            await asyncio.to_thread(self._checkpoints.save, self._url_start, state, visited)
+
+    async def _checkpoint_loop(self) -> None:
+        """ Периодическое сохранение: прерывание обхода теряет не больше одного периода работы """
+        while True:
+            await asyncio.sleep(self._checkpoint_interval_sec)
+            state, visited = self.snapshot()
+            try:
+                # Отмена обхода не прерывает начатую запись
+                await asyncio.shield(self._write_checkpoint(state=state, visited=visited))
+            except OSError:
+                self.logger.exception(f"Checkpoint failed: {self._url_start}")
+
     async def _process(self) -> None:
-        """ Процесс сбора данных """
+        """ Процесс сбора данных: место обхода освобождается при любом завершении, в том числе при ошибке """
+        message: str = "Failed"
+        try:
+            message = await self._crawl()
+        except Exception:
+            self.logger.exception(f"Crawl failed: {self._url_start}")
+        finally:
+            self._remove_from_store(message=message)
+
+    async def _crawl(self) -> str:
+        """ Обход до исчерпания границы или бюджета, возвращает итог для журнала """
         if len(self._url_domain) > 64:
             raise Exception("Domain name too long")
-        async with aiohttp.ClientSession(timeout=self._session_timeout) as session:
-            await asyncio.create_task(self._fetch(session=session, url=self._url_start, current_depth=0))
-        self._remove_from_store()
+        if not self._is_restored:
+            self._frontier.put(url=canonicalize(self._url_start, self._url_start) or self._url_start, depth=0)
+        if self._respect_robots or self._seed_sitemaps:
+            sitemap_urls: list[str] = await self._read_robots()
+            # Продолженный обход уже содержит адреса из sitemap в границе
+            if self._seed_sitemaps and not self._is_restored:
+                await self._seed(sitemap_urls)
+        if self._fetch_slots:
+            self._fetch_slots.register(self._url_start, weight=self._weight)
+        workers: list[asyncio.Task] = [
+            asyncio.create_task(self._worker(session=self._session))
+            for _ in range(self._max_concurrent)
+        ]
+        checkpoint_task: asyncio.Task | None = None
+        if self._checkpoints:
+            checkpoint_task = asyncio.create_task(self._checkpoint_loop())
+        deadline_task: asyncio.Task | None = None
+        if self._budget.max_duration_sec:
+            deadline_task = asyncio.create_task(self._deadline())
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            # Ошибка одного воркера (граница недоступна) останавливает остальных
+            for task in (*workers, checkpoint_task, deadline_task):
+                if task:
+                    task.cancel()
+            if self._fetch_slots:
+                self._fetch_slots.unregister(self._url_start)
+        if self.stop_reason is not None:
+            if self._checkpoints:
+                # Начатые запросы завершены: оставшаяся граница продолжается через resume с новым бюджетом
+                state, visited = self.snapshot()
+                await self._write_checkpoint(state=state, visited=visited)
+            return f"Budget exhausted ({self.stop_reason})"
+        if self._checkpoints:
+            # Обход завершён - продолжать нечего
+            async with self._checkpoint_lock:
+                self._checkpoints.remove(self._url_start)
+        return "Completed"
 
     async def start(self) -> bool:
         """
@@ -139,9 +707,8 @@ class Parser():
                 - False, если недоступен стартовый URL
         """
         # Предварительная проверка доступности стартового URL
-        async with aiohttp.ClientSession(timeout=self._session_timeout) as session:
-            if not await self.check_site_avail(session):
-                return False
+        if not await self.check_site_avail(self._session):
+            return False
         self.logger.info(f"Started: {self._url_start}...")
         # Запуск фонового процесса обработки
         self._task = asyncio.create_task(self._process())
@@ -151,19 +718,78 @@ class Parser():
     def _remove_from_store(self, message: str = "Completed") -> None:
         """ Удаление состояния и ссылок на task """
         # После завершения работы ссылок не остаётся, экземпляр Parser'а будет удалён GC
+        # Повторный вызов (завершение отменённой задачи) и запись нового обхода того же адреса не затрагиваются
+        if self._status_store.get(self._url_start) is not self:
+            return
         del self._status_store[self._url_start]
         self.logger.info(f"{message}: {self._url_start}...")
 
-    def cancel(self) -> None:
+    async def cancel(self) -> None:
+        """ Останов обхода с сохранением контрольной точки (обход можно продолжить через resume) """
+        # Состояние фиксируется до отмены: адреса в обработке остаются в границе
+        checkpoint: tuple[dict, bytes] | None = self.snapshot() if self._checkpoints else None
         self._task.cancel()
         self._remove_from_store(message="Cancelled")
+        if checkpoint:
+            state, visited = checkpoint
+            await self._write_checkpoint(state=state, visited=visited)
 
-    @property
-    def __dict__(self):
-        """ Поле для формирования описания Парсера в OpenAPI """
-        return {
-            "status": "Processing...",
-            "max_depth": self._max_depth,
-            "max_concurrent": self._max_concurrent,
-            "default_timeout_sec": self._default_timeout_sec,
-        }
+    def state(self) -> ParserStateModel:
+        """ Параметры и ход обхода для GET / """
+        pages_per_sec: float = self._rate.rate(started_at=self._started_at)
+        in_progress: int = self._frontier.in_progress
+        frontier_size: int = len(self._frontier)
+        remaining: int = frontier_size + in_progress
+        remaining_pages: int | None = self._budget.remaining_pages(self._dispatched)
+        if remaining_pages is not None:
+            remaining = min(remaining, remaining_pages + in_progress)
+        eta_sec: float | None = round(remaining / pages_per_sec, 1) if pages_per_sec else None
+        if self._budget.max_duration_sec and eta_sec is not None:
+            time_left_sec: float = self._budget.max_duration_sec - (time.monotonic() - self._started_at)
+            eta_sec = min(eta_sec, round(max(0.0, time_left_sec), 1))
+        return ParserStateModel(
+            status="Processing..." if self.stop_reason is None else f"Stopping: {self.stop_reason}",
+            max_depth=self._max_depth,
+            max_concurrent=self._max_concurrent,
+            default_timeout_sec=self._default_timeout_sec,
+            incremental=self._incremental,
+            distributed=isinstance(self._frontier, PostgresFrontier),
+            elapsed_sec=round(time.monotonic() - self._started_at, 2),
+            pages_fetched=sum(self._fetched),
+            pages_failed=sum(self._failed),
+            pages_skipped=sum(self._skipped),
+            depths={
+                depth: DepthProgressModel(
+                    fetched=self._fetched[depth],
+                    failed=self._failed[depth],
+                    skipped=self._skipped[depth],
+                )
+                for depth in range(self._max_depth + 1)
+            },
+            frontier_size=frontier_size,
+            in_progress=in_progress,
+            bytes_downloaded=self.bytes_downloaded,
+            pages_per_sec=pages_per_sec,
+            eta_sec=eta_sec,
+            duplicates_skipped=self._frontier.duplicates,
+            visited_size=len(self._processed_urls),
+            visited_memory_bytes=self._processed_urls.memory_bytes,
+            visited_false_positive_rate=getattr(self._processed_urls, "false_positive_rate", 0),
+            not_modified=self.not_modified,
+            unchanged=self.unchanged,
+            host_limits=self._host_limiter.limits(),
+            skipped_content_type=self.skipped_content_type,
+            truncated=self.truncated,
+            scope=self._scope.mode,
+            links_out_of_scope=self.links_out_of_scope,
+            links_disallowed=self.links_disallowed,
+            seeded_urls=self.seeded_urls,
+            crawl_delay_sec=self.crawl_delay_sec,
+            max_pages=self._budget.max_pages,
+            max_bytes=self._budget.max_bytes,
+            max_duration_sec=self._budget.max_duration_sec,
+            stop_reason=self.stop_reason,
+            weight=self._weight,
+            queue_wait_sec=self.queue_wait_sec,
+            fetch_slots=self._fetch_slots.in_use(self._url_start) if self._fetch_slots else 0,
+        )
@@ -0,0 +1,247 @@
+import os
+import json
+import socket
+import logging
+import asyncio
+import asyncpg
+from collections import deque
+
+from .visited import ExactSet
+from .visited import VisitedSet
+
+
+class PostgresFrontier():
+    """
+        Общая граница обхода в Postgres (crawl_frontier): несколько реплик обходят один сайт
+        Адреса забираются пачками через select ... for update skip locked, порядок - по глубине
+        Первичный ключ (job_id, url) - общее множество занятых адресов
+        Забранные, но не завершённые адреса возвращаются в работу по истечении аренды (реплика упала)
+        Интерфейс совпадает с modules.parser.Frontier (кроме snapshot/restore: состояние и так хранится в БД)
+    """
+    # Ошибки связи с БД (в том числе закрытое соединение или пул, таймаут pool.acquire):
+    # адреса остаются в аренде и будут забраны повторно
+    DB_ERRORS: tuple[type[Exception], ...] = (
+        asyncpg.PostgresError,
+        asyncpg.InterfaceError,
+        asyncio.TimeoutError,
+        OSError,
+    )
+
+    _pool: asyncpg.Pool
+    _job_id: int
+    _max_depth: int
+    _worker_id: str
+    _batch_size: int
+    _lease_sec: float
+    _poll_interval_sec: float
+    _seen: VisitedSet
+    _pending: list[tuple[str, int]]
+    _claimed: deque[tuple[str, int]]
+    _in_progress: dict[str, int]
+    _closed: bool
+    duplicates: int
+
+    def __init__(
+        self,
+        pool: asyncpg.Pool,
+        job_id: int,
+        max_depth: int,
+        batch_size: int = 20,
+        lease_sec: float = 120,
+        poll_interval_sec: float = 0.5,
+        seen: VisitedSet | None = None,
+    ) -> None:
+        """
+            job_id: задача обхода (crawl_jobs)
+            batch_size: количество адресов, забираемых за один запрос
+            lease_sec: время, после которого незавершённый адрес забирается другой репликой
+            poll_interval_sec: ожидание новых адресов, пока другие реплики обрабатывают свои
+            seen: локальный кэш занятых адресов (повторные ссылки не отправляются в БД)
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._pool = pool
+        self._job_id = job_id
+        self._max_depth = max_depth
+        self._worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._batch_size = batch_size
+        self._lease_sec = lease_sec
+        self._poll_interval_sec = poll_interval_sec
+        self._seen = ExactSet() if seen is None else seen
+        self._pending = []
+        self._claimed = deque()
+        self._in_progress = {}
+        self._closed = False
+        self.duplicates = 0
+
+    @staticmethod
+    async def create_job(
+        pool: asyncpg.Pool,
+        start_url: str,
+        max_depth: int,
+        max_concurrent: int,
+        default_timeout_sec: int,
+        incremental: bool,
+        options: dict | None = None,
+    ) -> int:
+        """
+            Новая задача обхода (предыдущая задача с тем же стартовым URL удаляется)
+            options: область обхода и бюджет ({"scope": ..., "budget": ...}), общие для всех реплик
+        """
+        async with pool.acquire() as connection:
+            async with connection.transaction():
+                await connection.execute("delete from crawl_jobs where start_url = $1", start_url)
+                return await connection.fetchval(
+                    "insert into crawl_jobs(start_url, max_depth, max_concurrent, default_timeout_sec, incremental, options) "
+                    "values($1, $2, $3, $4, $5, $6::jsonb) returning id",
+                    start_url, max_depth, max_concurrent, default_timeout_sec, incremental, json.dumps(options or {}),
+                )
+
+    @staticmethod
+    async def find_job(pool: asyncpg.Pool, start_url: str) -> dict | None:
+        """ Задача обхода по стартовому URL (для подключения реплики) """
+        async with pool.acquire() as connection:
+            job: asyncpg.Record | None = await connection.fetchrow(
+                "select id, max_depth, max_concurrent, default_timeout_sec, incremental, options "
+                "from crawl_jobs where start_url = $1",
+                start_url,
+            )
+        if job is None:
+            return None
+        return {**job, "options": json.loads(job["options"])}
+
+    def __len__(self) -> int:
+        return len(self._pending) + len(self._claimed)
+
+    @property
+    def in_progress(self) -> int:
+        """ Количество адресов, обрабатываемых этой репликой """
+        return len(self._in_progress)
+
+    def put(self, url: str, depth: int) -> bool:
+        """ Адрес отправляется в БД вместе с завершением обрабатываемой страницы (task_done) """
+        if depth > self._max_depth or not self.claim(url):
+            return False
+        self._pending.append((url, depth))
+        return True
+
+    def claim(self, url: str) -> bool:
+        """ Локальная отметка: окончательная проверка - первичный ключ crawl_frontier """
+        if url in self._seen:
+            self.duplicates += 1
+            return False
+        self._seen.add(url)
+        return True
+
+    async def _flush(self, connection: asyncpg.Connection, pending: list[tuple[str, int]]) -> None:
+        """
+            Вставка найденных адресов одной командой
+            Адрес, найденный на меньшей глубине, получает её, пока не забран
+        """
+        if not pending:
+            return
+        urls, depths = zip(*pending)
+        await connection.execute(
+            "insert into crawl_frontier(job_id, url, depth) "
+            "select $1, url, depth from unnest($2::text[], $3::int[]) as pending(url, depth) "
+            "on conflict (job_id, url) do update set depth = excluded.depth "
+            "where crawl_frontier.state = 0 and crawl_frontier.depth > excluded.depth",
+            self._job_id, list(urls), list(depths),
+        )
+
+    async def _claim_batch(self) -> bool:
+        """ Захват пачки адресов наименьшей глубины, False - свободных адресов нет """
+        # Воркеры продолжают добавлять адреса, пока идёт запись
+        pending, self._pending = self._pending, []
+        try:
+            async with self._pool.acquire() as connection:
+                async with connection.transaction():
+                    await self._flush(connection, pending)
+                    rows: list[asyncpg.Record] = await connection.fetch(
+                        "update crawl_frontier set state = 1, claimed_by = $2, claimed_at = now() "
+                        "where (job_id, url) in ("
+                        "    select job_id, url from crawl_frontier "
+                        "    where job_id = $1 and (state = 0 or state = 1 and claimed_at < now() - make_interval(secs => $3)) "
+                        "    order by depth limit $4 for update skip locked"
+                        ") returning url, depth",
+                        self._job_id, self._worker_id, self._lease_sec, self._batch_size,
+                    )
+        except Exception:
+            self._pending = pending + self._pending
+            raise
+        self._claimed.extend(sorted(((row["url"], row["depth"]) for row in rows), key=lambda item: item[1]))
+        return bool(rows)
+
+    async def _is_finished(self) -> bool:
+        """ В задаче не осталось свободных и забранных адресов """
+        async with self._pool.acquire() as connection:
+            return not await connection.fetchval(
+                "select exists(select 1 from crawl_frontier where job_id = $1 and state < 2)",
+                self._job_id,
+            )
+
+    async def get(self) -> tuple[str, int] | None:
+        """ Следующий адрес, None - обход завершён всеми репликами или реплика остановлена (close) """
+        while not self._closed:
+            try:
+                if self._claimed or await self._claim_batch():
+                    url, depth = self._claimed.popleft()
+                    self._in_progress[url] = depth
+                    return url, depth
+                if not self._in_progress and not self._pending and await self._is_finished():
+                    return None
+            except self.DB_ERRORS:
+                self.logger.exception(f"Frontier is unavailable, job: {self._job_id}")
+            await asyncio.sleep(self._poll_interval_sec)
+        return None
+
+    async def task_done(self, url: str) -> None:
+        """ Найденные на странице адреса и отметка о завершении - в одной транзакции """
+        del self._in_progress[url]
+        pending, self._pending = self._pending, []
+        try:
+            async with self._pool.acquire() as connection:
+                async with connection.transaction():
+                    await self._flush(connection, pending)
+                    await connection.execute(
+                        "update crawl_frontier set state = 2 where job_id = $1 and url = $2",
+                        self._job_id, url,
+                    )
+        except self.DB_ERRORS:
+            # Адрес будет забран повторно по истечении аренды, найденные ссылки - отправлены со следующей записью
+            self.logger.exception(f"Frontier is unavailable, job: {self._job_id}")
+            self._pending = pending + self._pending
+
+    async def put_many(self, urls: list[str], depth: int) -> int:
+        """ Пакетное добавление (адреса из sitemap): записывается сразу, одной командой """
+        added: int = sum(self.put(url=url, depth=depth) for url in urls)
+        pending, self._pending = self._pending, []
+        try:
+            async with self._pool.acquire() as connection:
+                await self._flush(connection, pending)
+        except self.DB_ERRORS:
+            # Адреса будут отправлены со следующей записью
+            self.logger.exception(f"Frontier is unavailable, job: {self._job_id}")
+            self._pending = pending + self._pending
+        return added
+
+    async def close(self) -> None:
+        """
+            Досрочная остановка реплики (исчерпан бюджет): get() больше не выдаёт адресов,
+            забранные, но не выданные воркерам адреса возвращаются в очередь для других реплик
+        """
+        self._closed = True
+        released: list[str] = [url for url, _ in self._claimed]
+        self._claimed.clear()
+        pending, self._pending = self._pending, []
+        try:
+            async with self._pool.acquire() as connection:
+                async with connection.transaction():
+                    await self._flush(connection, pending)
+                    await connection.execute(
+                        "update crawl_frontier set state = 0, claimed_by = null, claimed_at = null "
+                        "where job_id = $1 and url = any($2::text[]) and state = 1 and claimed_by = $3",
+                        self._job_id, released, self._worker_id,
+                    )
+        except self.DB_ERRORS:
+            # Адреса будут забраны другими репликами по истечении аренды
+            self.logger.exception(f"Frontier is unavailable, job: {self._job_id}")
@@ -0,0 +1,36 @@
+import time
+from collections import deque
+
+
+class RateMeter():
+    """
+        Текущая скорость событий (страниц в секунду) за скользящее окно
+        События считаются в посекундных корзинах: учёт - одно сравнение и сложение, без блокировок
+    """
+    _window_sec: int
+    _buckets: deque[list[int]]
+
+    def __init__(self, window_sec: int = 10) -> None:
+        """ window_sec: окно усреднения """
+        self._window_sec = window_sec
+        self._buckets = deque()
+
+    def add(self, count: int = 1) -> None:
+        second: int = int(time.monotonic())
+        if self._buckets and self._buckets[-1][0] == second:
+            self._buckets[-1][1] += count
+            return
+        self._buckets.append([second, count])
+        while self._buckets[0][0] <= second - self._window_sec:
+            self._buckets.popleft()
+
+    def rate(self, started_at: float) -> float:
+        """
+            События в секунду за последние window_sec
+            started_at: начало отсчёта (time.monotonic()) - в первые секунды окно короче
+        """
+        now: float = time.monotonic()
+        since: int = int(now) - self._window_sec + 1
+        count: int = sum(bucket_count for second, bucket_count in self._buckets if second >= since)
+        span: float = min(float(self._window_sec), now - started_at)
+        return round(count / span, 2) if span > 0 else 0
@@ -0,0 +1,91 @@
+import re
+import ipaddress
+from urllib.parse import urlsplit
+
+# Область обхода: host - хост стартового адреса (с www. и без), domain - регистрируемый домен с поддоменами,
+# any - без ограничения по хосту
+SCOPES: tuple[str, ...] = ("host", "domain", "any")
+# Домены второго уровня, под которыми регистрируются домены в национальных зонах (bbc.co.uk, abc.net.au)
+SECOND_LEVEL_LABELS: frozenset[str] = frozenset({
+    "ac", "co", "com", "edu", "gov", "net", "org", "mil", "nom", "or", "ne", "go", "ltd", "plc", "gob",
+})
+
+
+def registrable_domain(host: str) -> str:
+    """
+        Регистрируемый домен хоста: news.example.com -> example.com, www.bbc.co.uk -> bbc.co.uk
+        Без списка публичных суффиксов: в национальных зонах учитываются распространённые домены второго уровня
+        IP-адрес возвращается без изменений
+    """
+    host = host.lower().rstrip(".")
+    try:
+        ipaddress.ip_address(host.strip("[]"))
+        return host
+    except ValueError:
+        pass
+    labels: list[str] = host.split(".")
+    if len(labels) > 2 and len(labels[-1]) == 2 and labels[-2] in SECOND_LEVEL_LABELS:
+        return ".".join(labels[-3:])
+    return ".".join(labels[-2:])
+
+
+def _host(url: str) -> str:
+    host: str = (urlsplit(url).hostname or "").rstrip(".")
+    return host[4:] if host.startswith("www.") else host
+
+
+class CrawlScope():
+    """
+        Область обхода: найденные ссылки вне области не добавляются в границу
+        Хост проверяется по mode, затем адрес - по шаблонам (регулярные выражения, re.search):
+        при непустом allow адрес должен подходить хотя бы под один, под deny - ни под один
+    """
+    mode: str
+    allow: list[str]
+    deny: list[str]
+    _host: str
+    _domain: str
+    _allow: list[re.Pattern]
+    _deny: list[re.Pattern]
+
+    def __init__(
+        self,
+        start_url: str,
+        mode: str = "host",
+        allow: list[str] | None = None,
+        deny: list[str] | None = None,
+    ) -> None:
+        """
+            start_url: адрес начала обхода (хост и домен области)
+            mode: host | domain | any
+            allow, deny: шаблоны адресов
+        """
+        if mode not in SCOPES:
+            raise ValueError(f"Unknown scope: {mode}")
+        self.mode = mode
+        self.allow = list(allow or [])
+        self.deny = list(deny or [])
+        self._host = _host(start_url)
+        self._domain = registrable_domain(self._host)
+        self._allow = self._compile(self.allow)
+        self._deny = self._compile(self.deny)
+
+    @staticmethod
+    def _compile(patterns: list[str]) -> list[re.Pattern]:
+        try:
+            return [re.compile(pattern) for pattern in patterns]
+        except re.error as error:
+            raise ValueError(f"Invalid pattern: {error.pattern}") from error
+
+    def __contains__(self, url: str) -> bool:
+        if self.mode == "host" and _host(url) != self._host:
+            return False
+        if self.mode == "domain" and registrable_domain(_host(url)) != self._domain:
+            return False
+        if self._allow and not any(pattern.search(url) for pattern in self._allow):
+            return False
+        return not any(pattern.search(url) for pattern in self._deny)
+
+    def to_dict(self) -> dict:
+        """ Параметры для контрольной точки и задачи распределённого обхода: CrawlScope(start_url, **to_dict()) """
+        return {"mode": self.mode, "allow": self.allow, "deny": self.deny}
@@ -0,0 +1,115 @@
+import zlib
+import logging
+import asyncio
+from collections import deque
+from http import HTTPStatus
+from typing import AsyncIterator
+from urllib.parse import urljoin
+from urllib.robotparser import RobotFileParser
+from xml.etree.ElementTree import Element
+from xml.etree.ElementTree import ParseError
+from xml.etree.ElementTree import XMLPullParser
+import aiohttp
+from aiohttp import ClientError
+from aiohttp import ClientSession
+
+# Правила robots.txt для всех агентов (группа "*")
+ROBOTS_AGENT: str = "*"
+ROBOTS_MAX_BYTES: int = 512 * 1024
+# Ограничения протокола sitemaps.org: 50 МБ (после распаковки) на файл
+SITEMAP_MAX_BYTES: int = 50 * 2 ** 20
+# Файлов sitemap на обход (вложенные sitemap index, зацикленные ссылки)
+SITEMAP_MAX_FILES: int = 1000
+GZIP_MAGIC: bytes = b"\x1f\x8b"
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+async def fetch_robots(session: ClientSession, start_url: str, timeout: aiohttp.ClientTimeout) -> RobotFileParser | None:
+    """ robots.txt хоста стартового адреса, None - файла нет или он недоступен (ограничений нет) """
+    robots_url: str = urljoin(start_url, "/robots.txt")
+    try:
+        async with session.get(robots_url, timeout=timeout) as response:
+            if response.status != HTTPStatus.OK:
+                return None
+            body: bytes = await response.content.read(ROBOTS_MAX_BYTES)
+    except (ClientError, asyncio.TimeoutError):
+        logger.warning(f"robots.txt is unavailable: {robots_url}")
+        return None
+    robots: RobotFileParser = RobotFileParser(robots_url)
+    robots.parse(body.decode("utf-8", errors="ignore").splitlines())
+    return robots
+
+
+def _local_name(tag: str) -> str:
+    """ Имя тега без пространства имён: {http://www.sitemaps.org/schemas/sitemap/0.9}loc -> loc """
+    return tag.rsplit("}", 1)[-1]
+
+
+async def _read_sitemap(
+    session: ClientSession,
+    sitemap_url: str,
+    timeout: aiohttp.ClientTimeout,
+    max_bytes: int,
+) -> AsyncIterator[tuple[str, str]]:
+    """
+        Потоковый разбор одного sitemap: (тип корня - urlset | sitemapindex, loc) по мере загрузки
+        Сжатый файл (sitemap.xml.gz без Content-Encoding) распаковывается по частям, не больше max_bytes
+    """
+    parser: XMLPullParser = XMLPullParser(events=("start", "end"))
+    root: Element | None = None
+    decompressor: zlib._Decompress | None = None
+    size: int = 0
+    async with session.get(sitemap_url, timeout=timeout) as response:
+        if response.status != HTTPStatus.OK:
+            return
+        async for chunk in response.content.iter_chunked(65536):
+            if root is None and decompressor is None and size == 0 and chunk.startswith(GZIP_MAGIC):
+                decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            if decompressor is not None:
+                chunk = decompressor.decompress(chunk, max_bytes - size + 1)
+            size += len(chunk)
+            if size > max_bytes:
+                logger.warning(f"Sitemap is too large, truncated: {sitemap_url}")
+                break
+            parser.feed(chunk)
+            for event, element in parser.read_events():
+                if event == "start":
+                    if root is None:
+                        root = element
+                    continue
+                name: str = _local_name(element.tag)
+                if name == "loc" and element.text and root is not None:
+                    yield _local_name(root.tag), element.text.strip()
+                elif name in ("url", "sitemap") and root is not None:
+                    # Разобранные записи не накапливаются в дереве
+                    root.clear()
+
+
+async def iter_sitemap(
+    session: ClientSession,
+    sitemap_urls: list[str],
+    timeout: aiohttp.ClientTimeout,
+    max_bytes: int = SITEMAP_MAX_BYTES,
+    max_files: int = SITEMAP_MAX_FILES,
+) -> AsyncIterator[str]:
+    """
+        Адреса страниц из sitemap по мере разбора
+        Вложенные sitemap index обходятся в ширину, каждый файл загружается один раз
+        Недоступный или некорректный файл пропускается
+    """
+    queue: deque[str] = deque(sitemap_urls)
+    seen: set[str] = set(sitemap_urls)
+    files: int = 0
+    while queue and files < max_files:
+        sitemap_url: str = queue.popleft()
+        files += 1
+        try:
+            async for kind, loc in _read_sitemap(session, sitemap_url, timeout=timeout, max_bytes=max_bytes):
+                if kind == "urlset":
+                    yield loc
+                elif kind == "sitemapindex" and loc not in seen:
+                    seen.add(loc)
+                    queue.append(loc)
+        except (ClientError, asyncio.TimeoutError, ParseError, zlib.error):
+            logger.warning(f"Sitemap is unavailable or invalid: {sitemap_url}")
@@ -0,0 +1,220 @@
+import asyncio
+import logging
+from typing import BinaryIO
+from pathlib import Path
+from collections import deque
+from pydantic import ValidationError
+
+from models import SiteModel
+
+
+class SpillQueue():
+    """
+        Ограниченная очередь результатов с вытеснением на диск
+        - в памяти хранится не более maxsize страниц
+        - при заполнении put() ожидает освобождения места (давление на воркеры),
+          по истечении spill_after_sec страница дописывается в сегмент на диске
+        - сегменты (append-only jsonl) читаются, когда очередь в памяти пуста,
+          в том числе оставшиеся от предыдущего запуска
+        - прочитанный сегмент удаляется только после commit() (запись в БД выполнена)
+        * файловые операции синхронные: локальный диск, только в режиме вытеснения
+    """
+    # Номер первого сегмента: запас для сегментов, добавляемых в начало очереди
+    FIRST_SEGMENT: int = 10 ** 15
+
+    _memory: asyncio.Queue
+    _spill_dir: Path
+    _segment_max_items: int
+    _spill_after_sec: float
+    _head_segment: int
+    _tail_segment: int
+    _write_file: BinaryIO | None
+    _write_path: Path | None
+    _write_count: int
+    _sealed: deque[Path]
+    _read_file: BinaryIO | None
+    _read_path: Path | None
+    _read_size: int
+    _drained: list[Path]
+    _spilled: int
+    spilled_total: int
+    replayed_total: int
+
+    def __init__(
+        self,
+        maxsize: int,
+        spill_dir: str,
+        segment_max_items: int = 500,
+        spill_after_sec: float = 1.0,
+    ) -> None:
+        """
+            maxsize: количество страниц в памяти
+            spill_dir: директория сегментов
+            segment_max_items: количество страниц в одном сегменте
+            spill_after_sec: ожидание места в памяти перед вытеснением на диск
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._memory = asyncio.Queue(maxsize=maxsize)
+        self._spill_dir = Path(spill_dir)
+        self._spill_dir.mkdir(parents=True, exist_ok=True)
+        self._segment_max_items = segment_max_items
+        self._spill_after_sec = spill_after_sec
+        self._write_file = None
+        self._write_path = None
+        self._write_count = 0
+        self._read_file = None
+        self._read_path = None
+        self._read_size = 0
+        self._drained = []
+        self.spilled_total = 0
+        self.replayed_total = 0
+        # Сегменты предыдущего запуска, порядок чтения - по номеру сегмента
+        self._sealed = deque(sorted(self._spill_dir.glob("segment-*.jsonl")))
+        numbers: list[int] = [int(path.stem.split("-")[1]) for path in self._sealed]
+        self._head_segment = min(numbers, default=self.FIRST_SEGMENT)
+        self._tail_segment = max(numbers, default=self.FIRST_SEGMENT)
+        self._spilled = sum(self._count_lines(path) for path in self._sealed)
+        if self._spilled:
+            self.logger.info(f"Found {self._spilled} spilled pages in {len(self._sealed)} segments")
+
+    @staticmethod
+    def _count_lines(path: Path) -> int:
+        with path.open("rb") as file:
+            return sum(1 for _ in file)
+
+    def _segment_path(self, number: int) -> Path:
+        return self._spill_dir / f"segment-{number:020d}.jsonl"
+
+    def qsize(self) -> int:
+        return self._memory.qsize() + self._spilled
+
+    def empty(self) -> bool:
+        return not self.qsize()
+
+    @property
+    def spilled(self) -> int:
+        """ Количество страниц, ожидающих записи на диске """
+        return self._spilled
+
+    def _spill(self, site: SiteModel) -> None:
+        """ Дозапись страницы в конечный сегмент """
+        if not self._write_file:
+            self._tail_segment += 1
+            self._write_path = self._segment_path(self._tail_segment)
+            self._write_file = self._write_path.open("ab")
+        self._write_file.write(site.json().encode() + b"\n")
+        self._write_file.flush()
+        self._write_count += 1
+        self._spilled += 1
+        self.spilled_total += 1
+        if self._write_count >= self._segment_max_items:
+            self._seal()
+
+    def _spill_head(self, sites: list[SiteModel]) -> None:
+        """ Запись страниц отдельным сегментом в начало очереди (они старше вытесненных) """
+        if not sites:
+            return
+        self._head_segment -= 1
+        path: Path = self._segment_path(self._head_segment)
+        with path.open("wb") as file:
+            for site in sites:
+                file.write(site.json().encode() + b"\n")
+        self._sealed.appendleft(path)
+        self._spilled += len(sites)
+        self.spilled_total += len(sites)
+
+    def _seal(self) -> None:
+        """ Закрытие конечного сегмента для чтения """
+        if self._write_file and self._write_path:
+            self._write_file.close()
+            self._sealed.append(self._write_path)
+        self._write_file = None
+        self._write_path = None
+        self._write_count = 0
+
+    def _close_read(self) -> None:
+        """ Сегмент прочитан полностью, удаляется при следующем commit() """
+        if self._read_file and self._read_path:
+            self._read_file.close()
+            self._drained.append(self._read_path)
+        self._read_file = None
+        self._read_path = None
+
+    def _read_spilled(self) -> SiteModel | None:
+        """ Следующая страница из сегментов на диске """
+        while True:
+            if not self._read_file:
+                if not self._sealed:
+                    self._seal()
+                if not self._sealed:
+                    return None
+                self._read_path = self._sealed.popleft()
+                self._read_file = self._read_path.open("rb")
+                self._read_size = self._read_path.stat().st_size
+            line: bytes = self._read_file.readline()
+            # Сегмент считается прочитанным сразу после последней записи
+            if self._read_file.tell() >= self._read_size:
+                self._close_read()
+            if not line:
+                continue
+            self._spilled = max(self._spilled - 1, 0)
+            try:
+                site: SiteModel = SiteModel.parse_raw(line)
+            except ValidationError:
+                # Недописанная строка при аварийном завершении
+                self.logger.warning("Skipped broken spilled record")
+                continue
+            self.replayed_total += 1
+            return site
+
+    def put_nowait(self, site: SiteModel) -> None:
+        if self._memory.full():
+            self._spill(site)
+        else:
+            self._memory.put_nowait(site)
+
+    async def put(self, site: SiteModel) -> None:
+        """ Ожидание места в памяти не дольше spill_after_sec, затем вытеснение на диск """
+        if not self._memory.full():
+            self._memory.put_nowait(site)
+            return
+        try:
+            await asyncio.wait_for(self._memory.put(site), timeout=self._spill_after_sec)
+        except asyncio.TimeoutError:
+            self._spill(site)
+
+    def get_nowait(self) -> SiteModel:
+        if not self._memory.empty():
+            return self._memory.get_nowait()
+        if site := self._read_spilled():
+            return site
+        raise asyncio.QueueEmpty
+
+    async def get(self) -> SiteModel:
+        if self._memory.empty() and (site := self._read_spilled()):
+            return site
+        # Пока в памяти пусто, на диск ничего не вытесняется - достаточно ждать память
+        return await self._memory.get()
+
+    def requeue(self, sites: list[SiteModel]) -> None:
+        """ Возврат незаписанных страниц: сохраняются на диск и будут прочитаны повторно """
+        for site in sites:
+            self._spill(site)
+        self._seal()
+
+    def commit(self) -> None:
+        """ Удаление полностью прочитанных сегментов (их страницы записаны в БД) """
+        for path in self._drained:
+            path.unlink(missing_ok=True)
+        self._drained = []
+
+    def persist(self, in_flight: list[SiteModel] | None = None) -> None:
+        """
+            Сохранение на диск незаписанной пачки и содержимого памяти при остановке
+            Они старше вытесненных страниц, поэтому пишутся в начало очереди
+        """
+        sites: list[SiteModel] = list(in_flight or [])
+        while not self._memory.empty():
+            sites.append(self._memory.get_nowait())
+        self._spill_head(sites)
+        self._seal()
@@ -0,0 +1,54 @@
+from urllib.parse import urljoin
+from urllib.parse import urlsplit
+from urllib.parse import urlunsplit
+
+SCHEMES: tuple[str, ...] = ("http", "https")
+DEFAULT_PORTS: dict[str, int] = {"http": 80, "https": 443}
+
+
+def _remove_dot_segments(path: str) -> str:
+    """ Удаление сегментов '.' и '..' из пути (RFC 3986, 5.2.4) """
+    segments: list[str] = []
+    for segment in path.split("/"):
+        if segment == "..":
+            if len(segments) > 1:
+                segments.pop()
+        elif segment != ".":
+            segments.append(segment)
+    # Путь, оканчивающийся на '.' или '..', остаётся "директорией"
+    if path.endswith(("/.", "/..")):
+        segments.append("")
+    return "/".join(segments) or "/"
+
+
+def canonicalize(href: str, base_url: str) -> str | None:
+    """
+        Приведение ссылки к каноническому абсолютному виду
+        - разрешение относительно base_url (адрес страницы или <base href>)
+        - схема и хост в нижнем регистре, без порта по умолчанию
+        - без '.'/'..' в пути и без #fragment
+        - параметры запроса упорядочены
+        Возвращает None для ссылок не на http(s) и некорректных адресов
+    """
+    try:
+        parts = urlsplit(urljoin(base_url, href.strip()))
+        port: int | None = parts.port
+    except ValueError:
+        return None
+    scheme: str = parts.scheme.lower()
+    if scheme not in SCHEMES or not parts.hostname:
+        return None
+
+    netloc: str = parts.hostname.lower()
+    if ":" in netloc:
+        # IPv6
+        netloc = f"[{netloc}]"
+    if port and port != DEFAULT_PORTS[scheme]:
+        netloc = f"{netloc}:{port}"
+    if parts.username is not None:
+        userinfo: str = parts.username + (f":{parts.password}" if parts.password is not None else "")
+        netloc = f"{userinfo}@{netloc}"
+
+    path: str = _remove_dot_segments(parts.path) if parts.path else "/"
+    query: str = "&".join(sorted(param for param in parts.query.split("&") if param))
+    return urlunsplit((scheme, netloc, path, query, ""))
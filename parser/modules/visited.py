@@ -0,0 +1,254 @@
+import sys
+import math
+import struct
+import hashlib
+from array import array
+from typing import Protocol
+
+
+class VisitedSet(Protocol):
+    """ Множество занятых адресов обхода """
+
+    def __contains__(self, url: object) -> bool: ...
+
+    def add(self, url: str) -> None: ...
+
+    def __len__(self) -> int: ...
+
+    @property
+    def memory_bytes(self) -> int: ...
+
+    def to_bytes(self) -> bytes: ...
+
+
+class ExactSet(set):
+    """ Точное множество строк (учёт памяти ведётся при добавлении) """
+    _strings_bytes: int
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._strings_bytes = 0
+
+    def add(self, url: str) -> None:
+        if url not in self:
+            self._strings_bytes += sys.getsizeof(url)
+        super().add(url)
+
+    @property
+    def memory_bytes(self) -> int:
+        return sys.getsizeof(self) + self._strings_bytes
+
+    def to_bytes(self) -> bytes:
+        """ Адреса построчно (канонические URL не содержат переводов строк) """
+        return "\n".join(self).encode()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "ExactSet":
+        visited: ExactSet = cls()
+        for url in data.decode().split("\n") if data else ():
+            visited.add(url)
+        return visited
+
+
+class FingerprintSet():
+    """
+        Множество отпечатков адресов (64 или 128 бит) в таблице с открытой адресацией
+        Хранятся только отпечатки: 16-32 байта на адрес при заполнении не выше 1/2
+        Вероятность совпадения отпечатков разных адресов: ~n^2 / 2^(bits+1)
+    """
+    MAX_LOAD: float = 0.5
+
+    _words: int
+    _capacity: int
+    _table: array
+    _size: int
+
+    def __init__(self, bits: int = 64, capacity: int = 1024) -> None:
+        """
+            bits: размер отпечатка, 64 или 128
+            capacity: начальное количество ячеек (округляется до степени двойки)
+        """
+        if bits not in (64, 128):
+            raise ValueError(f"Unsupported fingerprint size: {bits}")
+        self._words = bits // 64
+        self._capacity = 1 << max(capacity - 1, 1).bit_length()
+        self._table = array('Q', bytes(8 * self._words * self._capacity))
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def memory_bytes(self) -> int:
+        return sys.getsizeof(self._table)
+
+    def _fingerprint(self, url: str) -> tuple[int, ...]:
+        digest: bytes = hashlib.blake2b(url.encode(), digest_size=8 * self._words).digest()
+        words: tuple[int, ...] = struct.unpack(f"<{self._words}Q", digest)
+        # Нулевое первое слово - признак пустой ячейки
+        return (words[0] or 1,) + words[1:]
+
+    def _find(self, fingerprint: tuple[int, ...]) -> tuple[int, bool]:
+        """ Ячейка отпечатка: (индекс, найден ли) - линейное пробирование """
+        mask: int = self._capacity - 1
+        index: int = fingerprint[0] & mask
+        while True:
+            offset: int = index * self._words
+            first: int = self._table[offset]
+            if not first:
+                return index, False
+            if first == fingerprint[0] and tuple(self._table[offset:offset + self._words]) == fingerprint:
+                return index, True
+            index = (index + 1) & mask
+
+    def _store(self, index: int, fingerprint: tuple[int, ...]) -> None:
+        offset: int = index * self._words
+        for shift, word in enumerate(fingerprint):
+            self._table[offset + shift] = word
+
+    def _grow(self) -> None:
+        """ Увеличение таблицы вдвое с перераспределением отпечатков """
+        old_table: array = self._table
+        self._capacity *= 2
+        self._table = array('Q', bytes(8 * self._words * self._capacity))
+        for offset in range(0, len(old_table), self._words):
+            if old_table[offset]:
+                fingerprint: tuple[int, ...] = tuple(old_table[offset:offset + self._words])
+                self._store(self._find(fingerprint)[0], fingerprint)
+
+    def __contains__(self, url: object) -> bool:
+        return isinstance(url, str) and self._find(self._fingerprint(url))[1]
+
+    def add(self, url: str) -> None:
+        fingerprint: tuple[int, ...] = self._fingerprint(url)
+        index, found = self._find(fingerprint)
+        if found:
+            return
+        self._store(index, fingerprint)
+        self._size += 1
+        if self._size > self._capacity * self.MAX_LOAD:
+            self._grow()
+
+    def to_bytes(self) -> bytes:
+        """ Заголовок (слов на отпечаток, ячеек, отпечатков) и таблица как есть """
+        return struct.pack("<3Q", self._words, self._capacity, self._size) + self._table.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "FingerprintSet":
+        words, capacity, size = struct.unpack_from("<3Q", data)
+        visited: FingerprintSet = cls(bits=words * 64, capacity=1)
+        visited._capacity = capacity
+        visited._table = array('Q')
+        visited._table.frombytes(data[struct.calcsize("<3Q"):])
+        visited._size = size
+        return visited
+
+
+class BloomFilter():
+    """
+        Фильтр Блума: фиксированный объём памяти, приближённая проверка
+        Ложноположительный ответ означает, что новый адрес будет пропущен
+    """
+    _bits: bytearray
+    _bits_count: int
+    _hashes: int
+    _size: int
+
+    def __init__(self, capacity: int, error_rate: float = 0.001) -> None:
+        """
+            capacity: ожидаемое количество адресов
+            error_rate: допустимая доля ложноположительных ответов при заполнении до capacity
+        """
+        self._bits_count = max(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self._hashes = max(round(self._bits_count / capacity * math.log(2)), 1)
+        self._bits = bytearray((self._bits_count + 7) // 8)
+        self._size = 0
+
+    def __len__(self) -> int:
+        """ Количество добавленных адресов (без учёта ложных совпадений) """
+        return self._size
+
+    @property
+    def memory_bytes(self) -> int:
+        return sys.getsizeof(self._bits)
+
+    @property
+    def false_positive_rate(self) -> float:
+        """ Оценка вероятности ложноположительного ответа при текущем заполнении """
+        return (1 - math.exp(-self._hashes * self._size / self._bits_count)) ** self._hashes
+
+    def _positions(self, url: str) -> list[int]:
+        """ Позиции битов: двойное хеширование (Kirsch-Mitzenmacher) """
+        digest: bytes = hashlib.blake2b(url.encode(), digest_size=16).digest()
+        first, second = struct.unpack("<2Q", digest)
+        return [(first + i * second) % self._bits_count for i in range(self._hashes)]
+
+    def __contains__(self, url: object) -> bool:
+        if not isinstance(url, str):
+            return False
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(url))
+
+    def add(self, url: str) -> None:
+        is_new: bool = False
+        for position in self._positions(url):
+            mask: int = 1 << (position & 7)
+            if not self._bits[position >> 3] & mask:
+                self._bits[position >> 3] |= mask
+                is_new = True
+        self._size += is_new
+
+    def to_bytes(self) -> bytes:
+        """ Заголовок (битов, хеш-функций, адресов) и битовый массив """
+        return struct.pack("<3Q", self._bits_count, self._hashes, self._size) + bytes(self._bits)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "BloomFilter":
+        bits_count, hashes, size = struct.unpack_from("<3Q", data)
+        visited: BloomFilter = cls.__new__(cls)
+        visited._bits_count = bits_count
+        visited._hashes = hashes
+        visited._bits = bytearray(data[struct.calcsize("<3Q"):])
+        visited._size = size
+        return visited
+
+
+def create_visited_set(kind: str, bloom_capacity: int = 10_000_000, bloom_error_rate: float = 0.001) -> VisitedSet:
+    """
+        Множество занятых адресов для одного обхода
+        kind: exact - строки, fingerprint64/fingerprint128 - отпечатки, bloom - фильтр Блума
+    """
+    match kind:
+        case "exact":
+            return ExactSet()
+        case "fingerprint64":
+            return FingerprintSet(bits=64)
+        case "fingerprint128":
+            return FingerprintSet(bits=128)
+        case "bloom":
+            return BloomFilter(capacity=bloom_capacity, error_rate=bloom_error_rate)
+        case _:
+            raise ValueError(f"Unknown visited set: {kind}")
+
+
+# Метки реализаций в сохранённом состоянии (контрольные точки обхода)
+VISITED_TAGS: dict[bytes, type] = {
+    b"E": ExactSet,
+    b"F": FingerprintSet,
+    b"B": BloomFilter,
+}
+
+
+def dump_visited(visited: VisitedSet) -> bytes:
+    """ Сериализация множества: метка реализации и её собственное представление """
+    for tag, kind in VISITED_TAGS.items():
+        if isinstance(visited, kind):
+            return tag + visited.to_bytes()
+    raise ValueError(f"Unsupported visited set: {type(visited).__name__}")
+
+
+def load_visited(data: bytes) -> VisitedSet:
+    """ Восстановление множества, сохранённого dump_visited """
+    kind: type | None = VISITED_TAGS.get(data[:1])
+    if kind is None:
+        raise ValueError(f"Unknown visited set tag: {data[:1]!r}")
+    return kind.from_bytes(data[1:])
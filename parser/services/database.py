@@ -1,15 +1,41 @@
+import time
+import asyncio
+import hashlib
 import asyncpg
-from asyncio import Queue
 
 from models import SiteModel
+from models import PageStateModel
+from models import WriterStatsModel
+from modules import SpillQueue
+from modules import metrics
+from modules.html_codec import CODECS
+from modules.html_codec import compress
 
 from .service_base import ServiceBase
 
 
 class Database(ServiceBase):
+    # Ошибки в самих данных: повтор записи не поможет
+    DATA_ERRORS: tuple[type[Exception], ...] = (
+        asyncpg.exceptions.DataError,
+        asyncpg.exceptions.IntegrityConstraintViolationError,
+    )
+    RETRY_DELAY_SEC: float = 1.0
+    # Колонки sites_info, заполняемые писателем
+    COLUMNS: tuple[str, ...] = (
+        "url", "html", "title", "html_data", "html_codec",
+        "etag", "last_modified", "content_hash", "fetched_at", "links",
+    )
+
     _dsn: str
-    _queue: Queue
+    _queue: SpillQueue
+    _batch: list[SiteModel]
     _pool: asyncpg.Pool | None = None
+    _write_mode: str
+    _batch_size: int
+    _flush_interval_sec: float
+    _html_codec: str
+    stats: WriterStatsModel
     is_listener_started: bool = False
 
     def __init__(self,
@@ -18,30 +44,278 @@ class Database(ServiceBase):
         database: str,
         username: str,
         password: str,
-        queue: Queue
+        queue: SpillQueue,
+        write_mode: str = "copy",
+        batch_size: int = 200,
+        flush_interval_ms: int = 500,
+        html_codec: str = "identity",
     ) -> None:
+        """
+            write_mode: copy - COPY во временную таблицу и слияние, executemany - пакетный insert
+            batch_size: максимальный размер пачки
+            flush_interval_ms: максимальное ожидание наполнения пачки
+            html_codec: сжатие HTML при хранении (identity - текстом в колонке html)
+        """
         super().__init__()
         _host: str = host + (f":{port}" if port else '')
         self._dsn = f"postgresql://{username}:{password}@{_host}/{database}"
         self._queue = queue
+        self._batch = []
+        if write_mode not in ("copy", "executemany"):
+            raise ValueError(f"Unknown write mode: {write_mode}")
+        self._write_mode = write_mode
+        self._batch_size = batch_size
+        self._flush_interval_sec = flush_interval_ms / 1000
+        if html_codec not in CODECS:
+            raise ValueError(f"Unknown html codec: {html_codec}")
+        self._html_codec = html_codec
+        self.stats = WriterStatsModel()
 
-    async def _put(self, site: SiteModel) -> None:
+    async def get_pool(self) -> asyncpg.Pool:
         if not self._pool:
             self._pool = await asyncpg.create_pool(self._dsn)
             if not self._pool:
                 raise Exception("Database connection error...")
+        return self._pool
+
+    def _encode_contents(self, sites: list[SiteModel]) -> list[tuple]:
+        """
+            Записи page_content (content_hash, html, html_data, html_codec, size) для новых тел
+            identity - HTML текстом в колонке html, иначе - сжатый в html_data
+        """
+        records: list[tuple] = []
+        for site in sites:
+            html: bytes = site.html.encode()
+            if self._html_codec == "identity":
+                records.append((site.content_hash, site.html, None, None, len(html)))
+                continue
+            records.append((site.content_hash, None, compress(html, self._html_codec), self._html_codec, len(html)))
+        return records
+
+    @staticmethod
+    def _site_records(sites: list[SiteModel]) -> list[tuple]:
+        """
+            Записи sites_info в порядке COLUMNS и признак refresh
+            Тело хранится в page_content по content_hash, колонки html/html_data заполнены только у старых строк
+        """
+        return [
+            (
+                site.url, None, site.title, None, None,
+                site.etag, site.last_modified, site.content_hash, site.fetched_at, site.links, site.refresh,
+            )
+            for site in sites
+        ]
+
+    def _merge_sql(self, source: str, refresh: bool) -> str:
+        """
+            Вставка новых страниц; при повторном обходе (refresh) - обновление
+            только тех строк, содержимое которых изменилось
+        """
+        columns: str = ", ".join(self.COLUMNS)
+        if not refresh:
+            return f"insert into sites_info({columns}) {source} on conflict do nothing"
+        updates: str = ", ".join(f"{column} = excluded.{column}" for column in self.COLUMNS[1:])
+        return (
+            f"insert into sites_info({columns}) {source} "
+            f"on conflict (url) do update set {updates} "
+            "where sites_info.content_hash is distinct from excluded.content_hash"
+        )
 
-        async with self._pool.acquire() as connection:
-            await connection.execute(
-                "insert into sites_info(url, html, title) values($1, $2, $3) on conflict do nothing",
-                site.url, site.html, site.title
+    async def _put_batch(self, sites: list[SiteModel]) -> None:
+        """
+            Запись пачки за один обмен с БД (плюс проверка уже сохранённых тел)
+            Одинаковые страницы хранят одно тело: тела, уже имеющиеся в page_content
+            (или повторяющиеся в пачке), не сжимаются и не передаются
+            Тело записывается только для строк sites_info, которые на него ссылаются после слияния:
+            страница, уже сохранённая без refresh (on conflict do nothing), не оставляет тела без ссылок
+        """
+        for site in sites:
+            # Страницы, вытесненные на диск до появления content_hash
+            site.content_hash = site.content_hash or hashlib.sha256(site.html.encode()).hexdigest()
+        pool: asyncpg.Pool = await self.get_pool()
+        async with pool.acquire() as connection:
+            existing: set[str] = {
+                row["content_hash"] for row in await connection.fetch(
+                    "select content_hash from page_content where content_hash = any($1::varchar[])",
+                    list({site.content_hash for site in sites}),
+                )
+            }
+            records: list[tuple] = self._site_records(sites)
+            async with connection.transaction():
+                if self._write_mode == "executemany":
+                    values: str = ", ".join(f"${number}" for number in range(1, len(self.COLUMNS) + 1))
+                    for refresh in (False, True):
+                        if part := [record[:-1] for record in records if record[-1] == refresh]:
+                            await connection.executemany(self._merge_sql(f"values({values})", refresh), part)
+                else:
+                    await self._copy_sites(connection=connection, records=records)
+                referenced: set[str] = {
+                    row["content_hash"] for row in await connection.fetch(
+                        "select content_hash from sites_info where url = any($1::varchar[])",
+                        list({site.url for site in sites}),
+                    )
+                }
+                new_sites: list[SiteModel] = list({
+                    site.content_hash: site for site in sites
+                    if site.content_hash not in existing and site.content_hash in referenced
+                }.values())
+                if self._html_codec == "identity":
+                    contents: list[tuple] = self._encode_contents(new_sites)
+                else:
+                    # Сжатие вне event loop'а (zlib/zstd освобождают GIL)
+                    contents = await asyncio.to_thread(self._encode_contents, new_sites)
+                if contents and self._write_mode == "executemany":
+                    await connection.executemany(
+                        "insert into page_content(content_hash, html, html_data, html_codec, size) "
+                        "values($1, $2, $3, $4, $5) on conflict do nothing",
+                        contents,
+                    )
+                elif contents:
+                    await self._copy_contents(connection=connection, contents=contents)
+        html_bytes: int = sum(len(site.html.encode()) for site in sites)
+        stored_bytes: int = sum(len(record[1].encode()) if record[1] is not None else len(record[2]) for record in contents)
+        self.stats.record_contents(
+            written=len(contents),
+            deduplicated=len(sites) - len(contents),
+            html_bytes=html_bytes,
+            stored_bytes=stored_bytes,
+        )
+
+    async def _copy_contents(self, connection: asyncpg.Connection, contents: list[tuple]) -> None:
+        """ COPY тел во временную таблицу и слияние с page_content (внутри транзакции _put_batch) """
+        await connection.execute(
+            "create temporary table if not exists page_content_staging("
+            "content_hash varchar(64), html text, html_data bytea, html_codec varchar(16), size int"
+            ") on commit delete rows"
+        )
+        await connection.copy_records_to_table(
+            "page_content_staging",
+            records=contents,
+            columns=["content_hash", "html", "html_data", "html_codec", "size"],
+        )
+        await connection.execute(
+            "insert into page_content(content_hash, html, html_data, html_codec, size) "
+            "select content_hash, html, html_data, html_codec, size from page_content_staging "
+            "on conflict do nothing"
+        )
+
+    async def _copy_sites(self, connection: asyncpg.Connection, records: list[tuple]) -> None:
+        """ COPY страниц во временную таблицу и слияние с sites_info (внутри транзакции _put_batch) """
+        await connection.execute(
+            "create temporary table if not exists sites_info_staging("
+            "url varchar(1000), html text, title varchar(1000), html_data bytea, html_codec varchar(16), "
+            "etag varchar(1000), last_modified varchar(100), content_hash varchar(64), "
+            "fetched_at timestamptz, links text[], refresh boolean"
+            ") on commit delete rows"
+        )
+        await connection.copy_records_to_table(
+            "sites_info_staging",
+            records=records,
+            columns=[*self.COLUMNS, "refresh"],
+        )
+        columns: str = ", ".join(self.COLUMNS)
+        for refresh in (False, True):
+            await connection.execute(self._merge_sql(
+                f"select distinct on (url) {columns} from sites_info_staging "
+                f"where {'' if refresh else 'not '}refresh",
+                refresh,
+            ))
+
+    async def get_page_state(self, url: str) -> PageStateModel | None:
+        """ Сохранённые валидаторы, хэш и ссылки страницы (None - страница не сохранялась) """
+        pool: asyncpg.Pool = await self.get_pool()
+        async with pool.acquire() as connection:
+            row: asyncpg.Record | None = await connection.fetchrow(
+                "select etag, last_modified, content_hash, links from sites_info where url = $1",
+                url,
             )
+        if row is None:
+            return None
+        return PageStateModel(
+            etag=row["etag"],
+            last_modified=row["last_modified"],
+            content_hash=row["content_hash"],
+            links=row["links"] or [],
+        )
+
+    async def _write(self, sites: list[SiteModel]) -> list[SiteModel]:
+        """
+            Запись пачки; при ошибке в данных - построчно, чтобы одна запись не отбрасывала всю пачку
+            Возвращает страницы, не записанные из-за недоступности БД (подлежат повтору)
+            * записи с ошибками в данных (слишком длинный URL и т.п.) отбрасываются
+        """
+        started: float = time.perf_counter()
+        retry: list[SiteModel] = []
+        dropped: int = 0
+        try:
+            await self._put_batch(sites)
+        except self.DATA_ERRORS:
+            self.logger.exception(f"Batch write failed ({len(sites)} rows), writing row by row")
+            self.stats.errors += 1
+            for site in sites:
+                try:
+                    await self._put_batch([site])
+                except self.DATA_ERRORS:
+                    self.logger.exception(f"Write failed, record dropped: {site.url}")
+                    self.stats.errors += 1
+                    dropped += 1
+                except Exception:
+                    self.logger.exception(f"Write failed, will retry: {site.url}")
+                    self.stats.errors += 1
+                    retry.append(site)
+        except Exception:
+            self.logger.exception(f"Batch write failed ({len(sites)} rows), will retry")
+            self.stats.errors += 1
+            retry = sites
+        failed: int = len(retry) + dropped
+        elapsed_sec: float = time.perf_counter() - started
+        self.stats.record(
+            written=len(sites) - failed,
+            failed=failed,
+            dropped=dropped,
+            elapsed_sec=elapsed_sec,
+        )
+        metrics.WRITER_BATCH_SECONDS.observe(elapsed_sec)
+        metrics.WRITER_ROWS.inc(len(sites) - failed, labels=("written",))
+        metrics.WRITER_ROWS.inc(len(retry), labels=("retried",))
+        metrics.WRITER_ROWS.inc(dropped, labels=("dropped",))
+        return retry
+
+    async def _next_batch(self) -> None:
+        """
+            Ожидание первой записи, затем добор до batch_size или до истечения flush_interval
+            Пачка собирается в self._batch, чтобы при остановке её можно было сохранить
+        """
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        self._batch.append(await self._queue.get())
+        deadline: float = loop.time() + self._flush_interval_sec
+        while len(self._batch) < self._batch_size:
+            if not self._queue.empty():
+                self._batch.append(self._queue.get_nowait())
+                continue
+            remaining: float = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                self._batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
 
     async def start_listener(self) -> None:
         self.is_listener_started = True
         while self.is_listener_started:
-            site: SiteModel = await self._queue.get()
-            await self._put(site)
+            await self._next_batch()
+            retry: list[SiteModel] = await self._write(self._batch)
+            # Незаписанные страницы возвращаются на диск до подтверждения прочитанных сегментов
+            if retry:
+                self._queue.requeue(retry)
+            self._queue.commit()
+            self._batch = []
+            if retry:
+                await asyncio.sleep(self.RETRY_DELAY_SEC)
 
     def close(self) -> None:
+        """ Останов записи, незаписанные страницы сохраняются на диск до следующего запуска """
         self.is_listener_started = False
+        self._queue.persist(in_flight=self._batch)
+        self._batch = []
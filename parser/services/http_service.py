@@ -0,0 +1,69 @@
+import aiohttp
+from aiohttp import ClientSession
+from aiohttp import TCPConnector
+
+from .service_base import ServiceBase
+
+
+class HttpService(ServiceBase):
+    """
+        Общий для всех Parser'ов пул HTTP-соединений
+        (keep-alive, ограничения на хост, кэш DNS)
+    """
+    _limit: int
+    _limit_per_host: int
+    _dns_cache_ttl_sec: int
+    _keepalive_timeout_sec: int
+    _trace_configs: list[aiohttp.TraceConfig]
+    _session: ClientSession | None = None
+
+    def __init__(
+        self,
+        limit: int,
+        limit_per_host: int,
+        dns_cache_ttl_sec: int,
+        keepalive_timeout_sec: int,
+        trace_configs: list[aiohttp.TraceConfig] | None = None,
+    ) -> None:
+        """
+            limit: общий размер пула соединений
+            limit_per_host: количество одновременных соединений с одним хостом
+            dns_cache_ttl_sec: время жизни записей в кэше DNS
+            keepalive_timeout_sec: время удержания простаивающего соединения
+            trace_configs: обработчики событий запросов aiohttp (замеры задержек в бенчмарках)
+        """
+        super().__init__()
+        self._limit = limit
+        self._limit_per_host = limit_per_host
+        self._dns_cache_ttl_sec = dns_cache_ttl_sec
+        self._keepalive_timeout_sec = keepalive_timeout_sec
+        self._trace_configs = trace_configs or []
+
+    @property
+    def limit_per_host(self) -> int:
+        """ Одновременных соединений с одним хостом (0 - без ограничения) """
+        return self._limit_per_host
+
+    @property
+    def session(self) -> ClientSession:
+        """ Сессия создаётся при первом обращении (требуется запущенный event loop) """
+        if not self._session or self._session.closed:
+            connector: TCPConnector = TCPConnector(
+                limit=self._limit,
+                limit_per_host=self._limit_per_host,
+                use_dns_cache=True,
+                ttl_dns_cache=self._dns_cache_ttl_sec,
+                keepalive_timeout=self._keepalive_timeout_sec,
+            )
+            # Таймауты задаются каждым Parser'ом на уровне запроса
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=None),
+                trace_configs=self._trace_configs,
+            )
+        return self._session
+
+    async def close(self) -> None:
+        if self._session:
+            await self._session.close()
+            self._session = None
@@ -1,55 +1,397 @@
-from asyncio import Queue
+import asyncio
+import asyncpg
+from aiohttp import ClientError
+from typing import Callable
+from typing import Awaitable
+from concurrent.futures import Executor
 
 from .service_base import ServiceBase
+from .http_service import HttpService
+from models import PageStateModel
+from models import QueuedJobModel
 from modules import Parser
+from modules import HostLimiter
+from modules import CrawlScope
+from modules import CrawlBudget
+from modules import FairShare
+from modules import JobQueue
+from modules.job_queue import QueuedJob
+from modules import SpillQueue
+from modules.visited import VisitedSet
+from modules.visited import load_visited
+from modules.visited import create_visited_set
+from modules.checkpoint import CheckpointStore
+from modules.pg_frontier import PostgresFrontier
 
 class ParserService(ServiceBase):
-    _queue: Queue
+    _queue: SpillQueue
     _status_store: dict[str, Parser]
     _limit_concurrent_processes: int
+    _http: HttpService
+    _executor: Executor | None
+    _extractor: str
+    _visited_kind: str
+    _bloom_capacity: int
+    _bloom_error_rate: float
+    _page_state_loader: Callable[[str], Awaitable[PageStateModel | None]] | None
+    _checkpoints: CheckpointStore | None
+    _checkpoint_interval_sec: float
+    _pool_provider: Callable[[], Awaitable[asyncpg.Pool]] | None
+    _frontier_batch_size: int
+    _frontier_lease_sec: float
+    _frontier_poll_interval_sec: float
+    _host_latency_tolerance: float
+    _host_backoff_factor: float
+    _max_page_bytes: int
+    _sitemap_max_urls: int
+    _max_crawl_delay_sec: float
+    _jobs: JobQueue
+    _fetch_slots: FairShare | None
+    _admission: asyncio.Task | None
 
-    def __init__(self, queue: Queue, limit_concurrent_processes: int):
+    def __init__(
+        self,
+        queue: SpillQueue,
+        limit_concurrent_processes: int,
+        http: HttpService,
+        executor: Executor | None = None,
+        extractor: str = "bs4",
+        visited_kind: str = "exact",
+        bloom_capacity: int = 10_000_000,
+        bloom_error_rate: float = 0.001,
+        page_state_loader: Callable[[str], Awaitable[PageStateModel | None]] | None = None,
+        checkpoints: CheckpointStore | None = None,
+        checkpoint_interval_sec: float = 30,
+        pool_provider: Callable[[], Awaitable[asyncpg.Pool]] | None = None,
+        frontier_batch_size: int = 20,
+        frontier_lease_sec: float = 120,
+        frontier_poll_interval_sec: float = 0.5,
+        host_latency_tolerance: float = 2.0,
+        host_backoff_factor: float = 0.5,
+        max_page_bytes: int = 5 * 2 ** 20,
+        sitemap_max_urls: int = 1_000_000,
+        max_crawl_delay_sec: float = 30,
+        job_queue_size: int = 100,
+        fetch_slots: int = 0,
+    ):
         super().__init__()
         self._status_store = {}
         self._queue = queue
         self._limit_concurrent_processes = limit_concurrent_processes
+        self._http = http
+        self._executor = executor
+        self._extractor = extractor
+        self._visited_kind = visited_kind
+        self._bloom_capacity = bloom_capacity
+        self._bloom_error_rate = bloom_error_rate
+        self._page_state_loader = page_state_loader
+        self._checkpoints = checkpoints
+        self._checkpoint_interval_sec = checkpoint_interval_sec
+        self._pool_provider = pool_provider
+        self._frontier_batch_size = frontier_batch_size
+        self._frontier_lease_sec = frontier_lease_sec
+        self._frontier_poll_interval_sec = frontier_poll_interval_sec
+        self._host_latency_tolerance = host_latency_tolerance
+        self._host_backoff_factor = host_backoff_factor
+        self._max_page_bytes = max_page_bytes
+        self._sitemap_max_urls = sitemap_max_urls
+        self._max_crawl_delay_sec = max_crawl_delay_sec
+        # Обходы сверх limit_concurrent_processes ждут в очереди
+        self._jobs = JobQueue(maxsize=job_queue_size)
+        # Общие места загрузки всех обходов (0 - без общего ограничения), делятся по весам обходов
+        self._fetch_slots = FairShare(capacity=fetch_slots) if fetch_slots else None
+        self._admission = None
 
     def is_url_processing(self, start_url: str) -> bool:
         """ Поиск запущенного процесса сбора данных по URL """
         return start_url in self._status_store
 
-    def cancel_by_url(self, start_url: str) -> None:
-        """ Останов задачи по стартовому URL """
-        self._status_store[start_url].cancel()
+    async def cancel_by_url(self, start_url: str) -> None:
+        """ Останов задачи по стартовому URL (состояние сохраняется в контрольную точку) """
+        await self._status_store[start_url].cancel()
+        # Место освобождено сразу: обратный вызов завершения задачи мог уже сработать (задача завершилась ранее)
+        self._schedule_admission()
+
+    def list_checkpoints(self) -> list[str]:
+        """ Стартовые URL'ы прерванных обходов, доступных для продолжения """
+        return self._checkpoints.list() if self._checkpoints else []
 
     def is_busy(self) -> bool:
-        return len(self._status_store) > self._limit_concurrent_processes
+        """ Все места для обходов заняты """
+        return len(self._status_store) >= self._limit_concurrent_processes
+
+    def has_queued(self) -> bool:
+        return len(self._jobs) > 0
+
+    def is_url_queued(self, start_url: str) -> bool:
+        return start_url in self._jobs
+
+    def dequeue(self, start_url: str) -> bool:
+        """ Отмена ожидающего обхода """
+        return self._jobs.remove(start_url)
+
+    def enqueue(self, start_url: str, priority: int = 0, **options) -> int | None:
+        """
+            Постановка обхода в очередь: запускается при освобождении места, больший priority - раньше
+            options: параметры parse_site
+            Возвращает позицию в очереди, None - очередь заполнена или обход уже запущен / ожидает
+        """
+        if start_url in self._status_store:
+            return None
+        position: int | None = self._jobs.put(start_url=start_url, priority=priority, options=options)
+        if position is not None:
+            self._schedule_admission()
+        return position
+
+    def queued(self) -> list[QueuedJobModel]:
+        """ Ожидающие обходы в порядке запуска """
+        return [
+            QueuedJobModel(start_url=job.start_url, priority=job.priority, position=position, wait_sec=job.wait_sec)
+            for position, job in enumerate(self._jobs.jobs(), start=1)
+        ]
+
+    def _schedule_admission(self) -> None:
+        """
+            Запуск ожидающих обходов, если есть свободные места (при постановке в очередь и завершении обходов)
+            Одновременно работает одна задача запуска: места перепроверяются после каждого запуска
+        """
+        if not self._jobs or self.is_busy() or self._admission and not self._admission.done():
+            return
+        self._admission = asyncio.create_task(self._admit())
+
+    async def _admit(self) -> None:
+        """ Запуск обходов из очереди по приоритету, пока есть места; недоступный адрес пропускается """
+        while self._jobs and not self.is_busy():
+            job: QueuedJob = self._jobs.pop()
+            if not await self.parse_site(start_url=job.start_url, **job.options):
+                self.logger.warning(f"Queued crawl is not started: {job.start_url}")
+                continue
+            self._status_store[job.start_url].queue_wait_sec = job.wait_sec
+            self.logger.info(f"Started from the queue after {job.wait_sec} sec: {job.start_url}")
 
     async def parse_site(
         self,
         start_url: str,
         max_depth: int,
         max_concurrent: int,
-        default_timeout_sec: int
+        default_timeout_sec: int,
+        incremental: bool = False,
+        distributed: bool = False,
+        scope: CrawlScope | None = None,
+        budget: CrawlBudget | None = None,
+        respect_robots: bool = False,
+        seed_sitemaps: bool = False,
+        weight: int = 1,
     ) -> bool:
         """
             Запуск процедуры обхода сайта
             start_url: адрес начала обхода ссылок
             max_depth: максимальная глубина обработки ссылок
-            max_concurrent: максимальное количество одновременных запросов для каждого уровня
+            max_concurrent: максимальное количество одновременных запросов
             default_timeout_sec: таймаут ответа (задержавшиеся ответы не обрабатываются)
+            incremental: повторный обход с условными запросами, обновляются только изменённые страницы
+            distributed: граница обхода в Postgres, к обходу могут подключиться другие реплики (join)
+            scope: область обхода, по умолчанию - хост стартового адреса
+            budget: ограничения ресурсов (для распределённого обхода - каждой реплики)
+            respect_robots: соблюдение Disallow из robots.txt
+            seed_sitemaps: заполнение границы адресами из sitemap до загрузки страниц
+            weight: доля обхода в общих местах загрузки (fetch_slots)
         """
-        if start_url in self._status_store:
+        if start_url in self._status_store or distributed and not self._pool_provider:
+            return False
+        scope = CrawlScope(start_url=start_url) if scope is None else scope
+        budget = CrawlBudget() if budget is None else budget
+        visited: VisitedSet = self._create_visited_set()
+        frontier: PostgresFrontier | None = None
+        if distributed:
+            try:
+                pool: asyncpg.Pool = await self._pool_provider()
+                job_id: int = await PostgresFrontier.create_job(
+                    pool=pool,
+                    start_url=start_url,
+                    max_depth=max_depth,
+                    max_concurrent=max_concurrent,
+                    default_timeout_sec=default_timeout_sec,
+                    incremental=incremental,
+                    options={
+                        "scope": scope.to_dict(),
+                        "budget": budget.to_dict(),
+                        "respect_robots": respect_robots,
+                    },
+                )
+            except PostgresFrontier.DB_ERRORS:
+                self.logger.exception(f"Crawl job is not created: {start_url}")
+                return False
+            frontier = self._create_frontier(pool=pool, job_id=job_id, max_depth=max_depth, visited=visited)
+        parser: Parser = self._create_parser(
+            start_url=start_url,
+            max_depth=max_depth,
+            max_concurrent=max_concurrent,
+            default_timeout_sec=default_timeout_sec,
+            incremental=incremental,
+            visited=visited,
+            frontier=frontier,
+            scope=scope,
+            budget=budget,
+            respect_robots=respect_robots,
+            seed_sitemaps=seed_sitemaps,
+            weight=weight,
+        )
+        return await self._start(parser=parser, start_url=start_url)
+
+    async def join(self, start_url: str) -> bool:
+        """
+            Подключение к распределённому обходу, запущенному на другой реплике
+            Возвращает False, если задача не найдена или уже обрабатывается этой репликой
+        """
+        if start_url in self._status_store or not self._pool_provider:
+            return False
+        try:
+            pool: asyncpg.Pool = await self._pool_provider()
+            job: dict | None = await PostgresFrontier.find_job(pool=pool, start_url=start_url)
+        except PostgresFrontier.DB_ERRORS:
+            self.logger.exception(f"Crawl job is unavailable: {start_url}")
             return False
-        # Подготовка Парсера
-        parser: Parser = Parser(
+        if job is None:
+            return False
+        visited: VisitedSet = self._create_visited_set()
+        parser: Parser = self._create_parser(
+            start_url=start_url,
+            max_depth=job["max_depth"],
+            max_concurrent=job["max_concurrent"],
+            default_timeout_sec=job["default_timeout_sec"],
+            incremental=job["incremental"],
+            visited=visited,
+            frontier=self._create_frontier(pool=pool, job_id=job["id"], max_depth=job["max_depth"], visited=visited),
+            scope=CrawlScope(start_url=start_url, **job["options"].get("scope", {})),
+            budget=CrawlBudget(**job["options"].get("budget", {})),
+            # Адреса из sitemap уже загружены в общую границу репликой, создавшей задачу
+            respect_robots=job["options"].get("respect_robots", False),
+        )
+        return await self._start(parser=parser, start_url=start_url)
+
+    async def resume(self, start_url: str) -> bool:
+        """
+            Продолжение прерванного обхода с последней контрольной точки
+            Возвращает False, если контрольной точки нет, обход уже запущен или ресурс недоступен
+        """
+        if start_url in self._status_store or not self._checkpoints:
+            return False
+        checkpoint: tuple[dict, bytes] | None = await asyncio.to_thread(self._checkpoints.load, start_url)
+        if checkpoint is None:
+            return False
+        state, visited = checkpoint
+        parser: Parser = self._create_parser(
+            start_url=start_url,
+            max_depth=state["max_depth"],
+            max_concurrent=state["max_concurrent"],
+            default_timeout_sec=state["default_timeout_sec"],
+            incremental=state["incremental"],
+            visited=load_visited(visited),
+            # Бюджет - на запуск: продолжение получает его заново
+            scope=CrawlScope(start_url=start_url, **state.get("scope", {})),
+            budget=CrawlBudget(**state.get("budget", {})),
+            respect_robots=state.get("respect_robots", False),
+            weight=state.get("weight", 1),
+        )
+        parser.restore(state)
+        return await self._start(parser=parser, start_url=start_url)
+
+    def _create_visited_set(self) -> VisitedSet:
+        return create_visited_set(
+            kind=self._visited_kind,
+            bloom_capacity=self._bloom_capacity,
+            bloom_error_rate=self._bloom_error_rate,
+        )
+
+    def _create_frontier(self, pool: asyncpg.Pool, job_id: int, max_depth: int, visited: VisitedSet) -> PostgresFrontier:
+        return PostgresFrontier(
+            pool=pool,
+            job_id=job_id,
+            max_depth=max_depth,
+            batch_size=self._frontier_batch_size,
+            lease_sec=self._frontier_lease_sec,
+            poll_interval_sec=self._frontier_poll_interval_sec,
+            seen=visited,
+        )
+
+    def _create_parser(
+        self,
+        start_url: str,
+        max_depth: int,
+        max_concurrent: int,
+        default_timeout_sec: int,
+        incremental: bool,
+        visited: VisitedSet,
+        frontier: PostgresFrontier | None = None,
+        scope: CrawlScope | None = None,
+        budget: CrawlBudget | None = None,
+        respect_robots: bool = False,
+        seed_sitemaps: bool = False,
+        weight: int = 1,
+    ) -> Parser:
+        """
+            Парсер с общими ресурсами сервиса (пул соединений, пул разбора, контрольные точки)
+            Распределённый обход хранит состояние в Postgres, контрольные точки ему не нужны
+        """
+        return Parser(
             queue=self._queue,
             start_url=start_url,
             status_store=self._status_store,
             max_depth=max_depth,
             max_concurrent=max_concurrent,
             default_timeout_sec=default_timeout_sec,
+            session=self._http.session,
+            executor=self._executor,
+            extractor=self._extractor,
+            visited=visited,
+            incremental=incremental,
+            page_state_loader=self._page_state_loader,
+            checkpoints=None if frontier is not None else self._checkpoints,
+            checkpoint_interval_sec=self._checkpoint_interval_sec,
+            frontier=frontier,
+            host_limiter=HostLimiter(
+                # Окно сверх соединений пула на хост не даёт параллельности: запросы ждут соединения,
+                # и это ожидание учитывалось бы как время ответа хоста
+                max_limit=min(max_concurrent, self._http.limit_per_host or max_concurrent),
+                latency_tolerance=self._host_latency_tolerance,
+                backoff_factor=self._host_backoff_factor,
+            ),
+            max_page_bytes=self._max_page_bytes,
+            scope=scope,
+            budget=budget,
+            respect_robots=respect_robots,
+            seed_sitemaps=seed_sitemaps,
+            sitemap_max_urls=self._sitemap_max_urls,
+            max_crawl_delay_sec=self._max_crawl_delay_sec,
+            fetch_slots=self._fetch_slots,
+            weight=weight,
         )
+
+    async def _start(self, parser: Parser, start_url: str) -> bool:
+        """ Регистрация и запуск Парсера, при недоступности ресурса состояние удаляется """
         # Обогащение состояния задач деталями
         self._status_store[start_url] = parser
-        return await parser.start()
+        try:
+            is_started: bool = await parser.start()
+        except (ClientError, asyncio.TimeoutError, ValueError):
+            self.logger.exception(f"Start URL is unavailable: {start_url}")
+            is_started = False
+        if not is_started:
+            del self._status_store[start_url]
+            return False
+        # Освободившееся место занимает следующий обход из очереди
+        parser._task.add_done_callback(lambda _: self._schedule_admission())
+        return True
+
+    async def close(self) -> None:
+        """ Останов запущенных задач (с контрольными точками), закрытие пула соединений и пула разбора """
+        # Ожидающие обходы не сохраняются
+        self._jobs.clear()
+        if self._admission:
+            self._admission.cancel()
+        for parser in list(self._status_store.values()):
+            await parser.cancel()
+        await self._http.close()
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
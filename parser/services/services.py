@@ -1,21 +1,25 @@
-from asyncio import Queue
-
 from modules import Config
+from modules import SpillQueue
+from modules import create_executor
+from modules import CheckpointStore
+from modules import metrics
 from .parser_service import ParserService
+from .http_service import HttpService
 from .database import Database
 
 
 class Services:
     """ Оркестратор сервисов """
     parser_service: ParserService
-    queue: Queue
+    queue: SpillQueue
     database: Database
 
     def __init__(self, config: Config) -> None:
-        self.queue = Queue()
-        self.parser_service = ParserService(
-            queue=self.queue,
-            limit_concurrent_processes=config.MAX_CONCURRENT_PROCESSES,
+        self.queue = SpillQueue(
+            maxsize=int(config.RESULT_QUEUE_SIZE),
+            spill_dir=config.SPILL_DIR,
+            segment_max_items=int(config.SPILL_SEGMENT_ITEMS),
+            spill_after_sec=int(config.SPILL_AFTER_MS) / 1000,
         )
         self.database = Database(
             host=config.DB_HOSTNAME,
@@ -24,4 +28,52 @@ class Services:
             username=config.DB_USERNAME,
             password=config.DB_PASSWORD,
             queue=self.queue,
+            write_mode=config.DB_WRITE_MODE,
+            batch_size=int(config.DB_BATCH_SIZE),
+            flush_interval_ms=int(config.DB_FLUSH_INTERVAL_MS),
+            html_codec=config.HTML_CODEC,
+        )
+        self.parser_service = ParserService(
+            queue=self.queue,
+            limit_concurrent_processes=int(config.MAX_CONCURRENT_PROCESSES),
+            http=HttpService(
+                limit=int(config.HTTP_POOL_LIMIT),
+                limit_per_host=int(config.HTTP_POOL_LIMIT_PER_HOST),
+                dns_cache_ttl_sec=int(config.HTTP_DNS_CACHE_TTL_SEC),
+                keepalive_timeout_sec=int(config.HTTP_KEEPALIVE_TIMEOUT_SEC),
+            ),
+            executor=create_executor(
+                kind=config.PARSE_EXECUTOR,
+                workers=int(config.PARSE_WORKERS),
+            ),
+            extractor=config.LINK_EXTRACTOR,
+            visited_kind=config.VISITED_SET,
+            bloom_capacity=int(config.BLOOM_CAPACITY),
+            bloom_error_rate=float(config.BLOOM_ERROR_RATE),
+            page_state_loader=self.database.get_page_state,
+            checkpoints=CheckpointStore(directory=config.CHECKPOINT_DIR),
+            checkpoint_interval_sec=float(config.CHECKPOINT_INTERVAL_SEC),
+            pool_provider=self.database.get_pool,
+            frontier_batch_size=int(config.FRONTIER_BATCH_SIZE),
+            frontier_lease_sec=float(config.FRONTIER_LEASE_SEC),
+            frontier_poll_interval_sec=int(config.FRONTIER_POLL_MS) / 1000,
+            host_latency_tolerance=float(config.HOST_LATENCY_TOLERANCE),
+            host_backoff_factor=float(config.HOST_BACKOFF_FACTOR),
+            max_page_bytes=int(config.MAX_PAGE_BYTES),
+            sitemap_max_urls=int(config.SITEMAP_MAX_URLS),
+            max_crawl_delay_sec=float(config.MAX_CRAWL_DELAY_SEC),
+            job_queue_size=int(config.JOB_QUEUE_SIZE),
+            fetch_slots=int(config.FETCH_SLOTS),
+        )
+        metrics.REGISTRY.gauge(
+            "parser_result_queue_size", "Pages waiting for the database writer (in memory)", self.queue.qsize,
+        )
+        metrics.REGISTRY.gauge(
+            "parser_result_queue_spilled", "Pages spilled to disk", lambda: self.queue.spilled,
+        )
+        metrics.REGISTRY.gauge(
+            "parser_crawls_running", "Crawls in progress", lambda: len(self.parser_service._status_store),
+        )
+        metrics.REGISTRY.gauge(
+            "parser_crawls_queued", "Crawls waiting for a free slot", lambda: len(self.parser_service._jobs),
         )
@@ -0,0 +1,28 @@
+import sys
+import importlib
+from pathlib import Path
+from types import ModuleType
+
+CLIENT_DIR: Path = Path(__file__).parents[2] / "client"
+# Пакеты верхнего уровня с одинаковыми именами у client и parser (pytest.ini: pythonpath = ./parser)
+SHARED_PACKAGES: tuple[str, ...] = ("models", "modules", "schemas", "services")
+
+
+def _is_shared(name: str) -> bool:
+    return name.split(".", 1)[0] in SHARED_PACKAGES
+
+
+def import_client(name: str) -> ModuleType:
+    """
+        Модуль клиента (client/...) по имени, как при запуске из каталога client: from models import ...
+        Модули parser с теми же именами на время импорта убираются из sys.modules и затем восстанавливаются
+    """
+    saved: dict[str, ModuleType] = {key: sys.modules.pop(key) for key in list(sys.modules) if _is_shared(key)}
+    sys.path.insert(0, str(CLIENT_DIR))
+    try:
+        return importlib.import_module(name)
+    finally:
+        sys.path.remove(str(CLIENT_DIR))
+        for key in [key for key in sys.modules if _is_shared(key)]:
+            del sys.modules[key]
+        sys.modules.update(saved)
@@ -0,0 +1,34 @@
+import pytest
+from types import ModuleType
+
+from tests.client.client_import import import_client
+
+html_codec: ModuleType = import_client("modules.html_codec")
+
+
+@pytest.mark.parametrize("codec", ["identity", "gzip"])
+def test_round_trip(codec: str) -> None:
+    data: bytes = "<html>Привет</html>".encode() * 100
+    compressed: bytes = html_codec.compress(data, codec)
+    assert html_codec.decompress(compressed, codec) == data
+    decompress = html_codec.decompressor(codec)
+    assert b"".join(decompress(compressed[i:i + 7]) for i in range(0, len(compressed), 7)) == data
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip", True),
+    ("gzip, deflate, br", True),
+    ("GZIP;q=0.5", True),
+    ("deflate, br", False),
+    ("", False),
+    ("*", True),
+    ("gzip;q=0", False),
+    ("gzip; q=0.0, *", False),
+    ("br, gzip;q=invalid", False),
+    # Запись с именем сжатия важнее "*"
+    ("*, gzip;q=0", False),
+    ("*;q=0, gzip", True),
+    ("br, *;q=0", False),
+])
+def test_accepts_encoding(header: str, expected: bool) -> None:
+    assert html_codec.accepts_encoding(header, "gzip") is expected
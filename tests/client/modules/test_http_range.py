@@ -0,0 +1,38 @@
+import pytest
+from types import ModuleType
+
+from tests.client.client_import import import_client
+
+http_range: ModuleType = import_client("modules.http_range")
+parse_range = http_range.parse_range
+RangeNotSatisfiable = http_range.RangeNotSatisfiable
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-99", (0, 99)),
+    ("bytes=10-", (10, 999)),
+    ("bytes=990-5000", (990, 999)),
+    ("bytes=-100", (900, 999)),
+    ("bytes=-5000", (0, 999)),
+    (" Bytes = 5-5", (5, 5)),
+    # Целиком: другие единицы, несколько диапазонов, некорректный заголовок
+    ("items=0-1", None),
+    ("bytes=0-1,5-6", None),
+    ("bytes=5", None),
+    ("bytes=a-b", None),
+    ("bytes=9-3", None),
+])
+def test_parse_range(header: str, expected: tuple[int, int] | None) -> None:
+    assert parse_range(header, 1000) == expected
+
+
+@pytest.mark.parametrize("header, size", [
+    ("bytes=1000-", 1000),
+    ("bytes=1000-2000", 1000),
+    ("bytes=-0", 1000),
+    ("bytes=-10", 0),
+    ("bytes=0-", 0),
+])
+def test_unsatisfiable_range(header: str, size: int) -> None:
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range(header, size)
@@ -0,0 +1,81 @@
+import pytest
+from types import ModuleType
+from pytest_mock import MockerFixture
+
+from tests.client.client_import import import_client
+
+page_cache: ModuleType = import_client("modules.page_cache")
+PageCache = page_cache.PageCache
+SiteContentModel = page_cache.SiteContentModel
+
+
+def make_content(size: int) -> SiteContentModel:
+    return SiteContentModel(body=b"x" * size, codec="identity", content_hash="hash")
+
+
+@pytest.fixture
+def clock(mocker: MockerFixture) -> list[float]:
+    now: list[float] = [0.0]
+    mocked_time = mocker.patch.object(page_cache, "time")
+    mocked_time.monotonic.side_effect = lambda: now[0]
+    return now
+
+
+def test_evicts_least_recently_used_within_byte_budget(clock: list[float]) -> None:
+    cache: PageCache = PageCache(max_bytes=300, ttl_sec=60, max_item_bytes=200)
+    cache.put("a", make_content(100))
+    cache.put("b", make_content(100))
+    cache.put("c", make_content(100))
+    assert cache.get("a") is not None
+    cache.put("d", make_content(150))
+
+    assert cache.get("b") is None and cache.get("c") is None
+    assert cache.get("a") is not None and cache.get("d") is not None
+    assert cache.size_bytes == 250
+    assert cache.stats["evictions"] == 2
+
+
+def test_large_pages_and_disabled_cache_are_not_stored(clock: list[float]) -> None:
+    cache: PageCache = PageCache(max_bytes=800, ttl_sec=60)
+    cache.put("large", make_content(101))
+    assert len(cache) == 0 and cache.max_item_bytes == 100
+
+    disabled: PageCache = PageCache(max_bytes=0, ttl_sec=60)
+    disabled.put("a", make_content(1))
+    assert len(disabled) == 0 and disabled.max_item_bytes == 0
+
+
+def test_entries_expire_after_ttl(clock: list[float]) -> None:
+    cache: PageCache = PageCache(max_bytes=1000, ttl_sec=10)
+    cache.put("a", make_content(100))
+    clock[0] = 9.9
+    assert cache.get("a") is not None
+    clock[0] = 10
+    assert cache.get("a") is None
+    assert (cache.size_bytes, len(cache)) == (0, 0)
+
+    # Повторная запись того же адреса заменяет тело и продлевает срок
+    cache.put("a", make_content(50))
+    cache.put("a", make_content(70))
+    assert cache.size_bytes == 70
+    assert cache.stats == {
+        "entries": 1,
+        "size_bytes": 70,
+        "max_bytes": 1000,
+        "hits": 1,
+        "misses": 1,
+        "hit_ratio": 0.5,
+        "evictions": 0,
+        "expirations": 1,
+    }
+
+
+def test_etag_matches() -> None:
+    etag: str = page_cache.make_etag("abc", "identity")
+    assert etag == '"abc"'
+    assert page_cache.make_etag("abc", "gzip") == '"abc-gzip"'
+    assert page_cache.etag_matches("*", etag)
+    assert page_cache.etag_matches('"other", W/"abc"', etag)
+    assert page_cache.etag_matches(' "abc" ', etag)
+    assert not page_cache.etag_matches('"abc-gzip"', etag)
+    assert not page_cache.etag_matches('"ABC"', etag)
@@ -0,0 +1,73 @@
+import pytest
+from pathlib import Path
+from asyncio import Queue
+from aiohttp import ClientSession
+from aioresponses import aioresponses
+
+from parser.modules import Parser
+from parser.modules import CheckpointStore
+from parser.modules.visited import load_visited
+
+HTML_TEMPLATE: str = "<html><body>%s</body></html>"
+LINK_TEMPLATE: str = "<a href='%s'>Link text</a>"
+
+
+def test_checkpoint_store(tmp_path: Path) -> None:
+    store: CheckpointStore = CheckpointStore(directory=str(tmp_path))
+    assert store.load("https://test.url/") is None
+
+    store.save("https://test.url/", {"max_depth": 2}, b"visited")
+    state, visited = store.load("https://test.url/")
+    assert state == {"max_depth": 2, "start_url": "https://test.url/"}
+    assert visited == b"visited"
+    assert store.list() == ["https://test.url/"]
+
+    store.remove("https://test.url/")
+    assert store.list() == []
+
+
+@pytest.mark.asyncio
+async def test_resume_continues_from_checkpoint(tmp_path: Path) -> None:
+    start_url: str = "https://test.url/"
+    store: CheckpointStore = CheckpointStore(directory=str(tmp_path))
+    queue: Queue = Queue()
+    status_store: dict = {}
+    interrupted: Parser = Parser(
+        queue=queue,
+        start_url=start_url,
+        status_store=status_store,
+        max_depth=1,
+        checkpoints=store,
+    )
+    # Корень обработан, a - в обработке, b - в очереди
+    interrupted._frontier.put(url=start_url, depth=0)
+    await interrupted._frontier.get()
+    interrupted._frontier.put(url=start_url + "a", depth=1)
+    interrupted._frontier.put(url=start_url + "b", depth=1)
+    await interrupted._frontier.task_done(start_url)
+    assert await interrupted._frontier.get() == (start_url + "a", 1)
+    state, visited = interrupted.snapshot()
+    store.save(start_url, state, visited)
+
+    state, visited = store.load(start_url)
+    session: ClientSession = ClientSession()
+    resumed: Parser = Parser(
+        queue=queue,
+        start_url=start_url,
+        status_store=status_store,
+        max_depth=state["max_depth"],
+        session=session,
+        visited=load_visited(visited),
+        checkpoints=store,
+    )
+    resumed.restore(state)
+    status_store[start_url] = resumed
+
+    with aioresponses() as mocked:
+        mocked.get(start_url + "a", content_type="text/html", body=HTML_TEMPLATE % (LINK_TEMPLATE % start_url))
+        mocked.get(start_url + "b", content_type="text/html", body=HTML_TEMPLATE % "")
+        await resumed._process()
+    await session.close()
+
+    assert sorted(queue.get_nowait().url for _ in range(queue.qsize())) == [start_url + "a", start_url + "b"]
+    assert store.list() == []
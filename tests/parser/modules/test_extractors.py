@@ -0,0 +1,44 @@
+import pytest
+
+from parser.modules.extractors import EXTRACTORS
+from parser.modules.extractors import ExtractedPage
+from parser.modules.extractors import get_extractor
+
+HTML: str = (
+    "<html><head><title>Title &amp; more</title></head><body>"
+    "<a href='/relative'>Link</a><a>No href</a><a href=''>Empty</a>"
+    "<A HREF=\"https://test.url/upper\">Upper</A><title>Second</title>"
+    "</body></html>"
+)
+XHTML: str = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<!DOCTYPE html><html xmlns="http://www.w3.org/1999/xhtml">'
+    "<head><title>Title &amp; more</title></head><body>"
+    '<a href="/relative">Link</a><a href="https://test.url/upper">Upper</a>'
+    "</body></html>"
+)
+
+
+@pytest.mark.parametrize("html", [HTML, XHTML], ids=["html", "xhtml"])
+@pytest.mark.parametrize("name", EXTRACTORS)
+def test_extractors_agree(name: str, html: str) -> None:
+    page: ExtractedPage = get_extractor(name).extract(html)
+    assert page.links == ["/relative", "https://test.url/upper"]
+    assert page.title == "Title & more"
+    assert page.base == ""
+
+
+@pytest.mark.parametrize("name", EXTRACTORS)
+def test_extractors_base_href(name: str) -> None:
+    html: str = "<html><head><base href='https://cdn.url/root/'><base href='/ignored'></head></html>"
+    assert get_extractor(name).extract(html).base == "https://cdn.url/root/"
+
+
+@pytest.mark.parametrize("name", EXTRACTORS)
+def test_extractors_empty(name: str) -> None:
+    assert get_extractor(name).extract("") == ([], "", "")
+
+
+def test_unknown_extractor() -> None:
+    with pytest.raises(ValueError):
+        get_extractor("unknown")
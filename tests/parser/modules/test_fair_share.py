@@ -0,0 +1,56 @@
+import pytest
+import asyncio
+
+from parser.modules.fair_share import FairShare
+from parser.modules.job_queue import JobQueue
+
+
+@pytest.mark.asyncio
+async def test_slots_are_shared_by_weight() -> None:
+    share: FairShare = FairShare(capacity=1)
+    share.register("large", weight=3)
+    share.register("small", weight=1)
+    order: list[str] = []
+
+    async def fetch(key: str) -> None:
+        async with share.slot(key):
+            order.append(key)
+            await asyncio.sleep(0)
+
+    # Большой обход ставит в очередь все свои запросы раньше малого
+    tasks: list[asyncio.Task] = [asyncio.create_task(fetch("large")) for _ in range(12)]
+    tasks += [asyncio.create_task(fetch("small")) for _ in range(4)]
+    await asyncio.gather(*tasks)
+
+    assert order[1:9].count("small") == 2
+    assert order.count("small") == 4
+    assert share.in_use("large") == share.in_use("small") == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_passes_slot_on() -> None:
+    share: FairShare = FairShare(capacity=1)
+    share.register("a")
+    share.register("b")
+    async with share.slot("a"):
+        cancelled: asyncio.Task = asyncio.create_task(share._acquire("a"))
+        waiting: asyncio.Task = asyncio.create_task(share._acquire("b"))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+    await asyncio.wait_for(waiting, timeout=1)
+    assert cancelled.cancelled()
+    assert (share.in_use("a"), share.in_use("b")) == (0, 1)
+
+
+def test_job_queue_orders_by_priority() -> None:
+    jobs: JobQueue = JobQueue(maxsize=3)
+    assert jobs.put("https://a/", priority=0, options={}) == 1
+    assert jobs.put("https://b/", priority=5, options={}) == 1
+    assert jobs.put("https://c/", priority=0, options={"max_depth": 2}) == 3
+    assert jobs.put("https://d/", priority=9, options={}) is None
+    assert jobs.remove("https://a/")
+    assert jobs.put("https://b/", priority=0, options={}) is None
+    assert [job.start_url for job in jobs.jobs()] == ["https://b/", "https://c/"]
+    assert jobs.pop().start_url == "https://b/"
+    assert jobs.pop().options == {"max_depth": 2}
+    assert jobs.pop() is None
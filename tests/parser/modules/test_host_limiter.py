@@ -0,0 +1,107 @@
+import pytest
+import asyncio
+from pytest_mock import MockerFixture
+
+from parser.modules.host_limiter import HostLimiter
+
+URL: str = "https://test.url/page"
+
+
+@pytest.fixture
+def clock(mocker: MockerFixture) -> list[float]:
+    """ Управляемое время ограничителя (event loop продолжает использовать настоящее) """
+    now: list[float] = [0.0]
+    mocked_time = mocker.patch("parser.modules.host_limiter.time")
+    mocked_time.monotonic.side_effect = lambda: now[0]
+    return now
+
+
+async def request(limiter: HostLimiter, clock: list[float], latency_sec: float, status: int = 200) -> None:
+    async with limiter.slot(URL) as slot:
+        clock[0] += latency_sec
+        slot.status(status)
+
+
+@pytest.mark.asyncio
+async def test_window_grows_to_max_while_healthy(clock: list[float]) -> None:
+    limiter: HostLimiter = HostLimiter(max_limit=8)
+    for _ in range(7):
+        await request(limiter, clock, latency_sec=0.1)
+    assert limiter.limits() == {"test.url": 8}
+
+    await request(limiter, clock, latency_sec=0.1)
+    assert limiter.limits() == {"test.url": 8}
+
+
+@pytest.mark.asyncio
+async def test_slow_responses_stop_growth(clock: list[float]) -> None:
+    limiter: HostLimiter = HostLimiter(max_limit=8, latency_tolerance=2)
+    await request(limiter, clock, latency_sec=0.1)
+    await request(limiter, clock, latency_sec=0.5)
+    assert limiter.limits() == {"test.url": 2}
+
+
+@pytest.mark.asyncio
+async def test_overload_halves_window_once(clock: list[float]) -> None:
+    limiter: HostLimiter = HostLimiter(max_limit=16, initial_limit=16)
+    slots: list = [limiter.slot(URL) for _ in range(4)]
+    for slot in slots:
+        await slot.__aenter__()
+    clock[0] += 0.1
+    for slot in slots:  # Ответы на запросы, начатые до снижения, окно повторно не уменьшают
+        slot.status(503)
+        await slot.__aexit__(None, None, None)
+    assert limiter.limits() == {"test.url": 8}
+
+    await request(limiter, clock, latency_sec=0.1, status=429)
+    assert limiter.limits() == {"test.url": 4}
+    # После снижения - аддитивный рост: +1 за окно ответов
+    for _ in range(4):
+        await request(limiter, clock, latency_sec=0.1)
+    assert 4.9 < limiter.limits()["test.url"] < 5.1
+
+
+@pytest.mark.asyncio
+async def test_timeout_is_overload_and_window_limits_concurrency(clock: list[float]) -> None:
+    limiter: HostLimiter = HostLimiter(max_limit=4, initial_limit=2)
+    with pytest.raises(asyncio.TimeoutError):
+        async with limiter.slot(URL):
+            raise asyncio.TimeoutError()
+    assert limiter.limits() == {"test.url": 1}
+
+    first: asyncio.Task = asyncio.create_task(limiter.slot(URL).__aenter__())
+    second: asyncio.Task = asyncio.create_task(limiter.slot(URL).__aenter__())
+    await asyncio.sleep(0)
+    assert first.done() and not second.done()
+    await (await first).__aexit__(None, None, None)
+    await asyncio.wait_for(second, timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_crawl_delay_spaces_request_starts() -> None:
+    limiter: HostLimiter = HostLimiter(max_limit=4, initial_limit=4)
+    limiter.set_delay(URL, 0.05)
+    loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+    starts: list[float] = []
+
+    async def request() -> None:
+        async with limiter.slot(URL):
+            starts.append(loop.time())
+
+    await asyncio.gather(*(request() for _ in range(3)))
+    assert starts[1] - starts[0] >= 0.04
+    assert starts[2] - starts[1] >= 0.04
+
+
+@pytest.mark.asyncio
+async def test_wait_before_start_is_not_latency(clock: list[float]) -> None:
+    limiter: HostLimiter = HostLimiter(max_limit=8, latency_tolerance=2)
+    await request(limiter, clock, latency_sec=0.1)
+    async with limiter.slot(URL) as slot:
+        # Ожидание общего места загрузки после места в окне хоста
+        clock[0] += 1
+        slot.start()
+        clock[0] += 0.1
+        slot.status(200)
+    assert limiter._hosts["test.url"].recent_sec == pytest.approx(0.1)
+    assert limiter.limits() == {"test.url": 3}
@@ -0,0 +1,28 @@
+import pytest
+
+from parser.modules.html_body import is_html
+from parser.modules.html_body import decode_body
+
+
+@pytest.mark.parametrize("content_type, expected", [
+    ("text/html", True),
+    ("TEXT/HTML; charset=windows-1251", True),
+    ("application/xhtml+xml", True),
+    (None, True),
+    ("application/pdf", False),
+    ("image/png", False),
+    ("application/json", False),
+])
+def test_is_html(content_type: str | None, expected: bool) -> None:
+    assert is_html(content_type) == expected
+
+
+def test_decode_body() -> None:
+    text: str = "<p>Страница</p>"
+    assert decode_body(text.encode("cp1251"), charset="windows-1251") == text
+    assert decode_body(text.encode(), charset=None) == text
+    assert decode_body(text.encode(), charset="unknown-charset") == text
+    # Усечение посреди многобайтного символа
+    assert decode_body(text.encode()[:4], charset="utf-8", truncated=True) == "<p>"
+    with pytest.raises(UnicodeDecodeError):
+        decode_body(text.encode()[:4], charset="utf-8")
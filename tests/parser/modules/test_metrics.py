@@ -0,0 +1,67 @@
+import pytest
+from asyncio import Queue
+from aiohttp import ClientSession
+from aioresponses import aioresponses
+
+from parser.modules import Parser
+from parser.modules import metrics
+from parser.modules.metrics import Registry
+from parser.modules.metrics import Counter
+from parser.modules.metrics import Histogram
+
+
+def test_histogram_buckets_are_cumulative() -> None:
+    registry: Registry = Registry()
+    histogram: Histogram = registry.histogram("test_seconds", "Test", buckets=(0.1, 1))
+    for value in (0.05, 0.1, 0.5, 2):
+        histogram.observe(value)
+
+    lines: list[str] = histogram.render().splitlines()
+    assert lines[1] == "# TYPE test_seconds histogram"
+    assert lines[2:] == [
+        'test_seconds_bucket{le="0.1"} 2',
+        'test_seconds_bucket{le="1"} 3',
+        'test_seconds_bucket{le="+Inf"} 4',
+        "test_seconds_sum 2.65",
+        "test_seconds_count 4",
+    ]
+
+
+def test_counter_labels_and_registry() -> None:
+    registry: Registry = Registry()
+    counter: Counter = registry.counter("test_total", "Test", labelnames=("status",))
+    counter.inc(labels=("200",))
+    counter.inc(2, labels=('a"b',))
+    registry.gauge("test_gauge", "Test", lambda: 1)
+    registry.gauge("test_gauge", "Test", lambda: 5)  # Повторная регистрация заменяет функцию
+
+    text: str = registry.render()
+    assert 'test_total{status="200"} 1' in text
+    assert 'test_total{status="a\\"b"} 2' in text
+    assert "test_gauge 5" in text
+    with pytest.raises(ValueError):
+        registry.counter("test_total", "Test")
+
+
+@pytest.mark.asyncio
+async def test_fetch_updates_metrics() -> None:
+    start_url: str = "https://test.url/"
+    html: str = "<html><body><a href='/1'>1</a></body></html>"
+    fetched: float = metrics.PAGES_FETCHED.value()
+    downloaded: float = metrics.BYTES_DOWNLOADED.value()
+    not_found: float = metrics.RESPONSES.value(labels=("404",))
+    parsed: int = metrics.PARSE_SECONDS.count
+
+    session: ClientSession = ClientSession()
+    parser: Parser = Parser(queue=Queue(), start_url=start_url, status_store={}, max_depth=1, session=session)
+    with aioresponses() as mocked:
+        mocked.get(start_url, content_type="text/html", body=html)
+        mocked.get(f"{start_url}1", status=404)
+        await parser._fetch(session=session, url=start_url, current_depth=0)
+        await parser._fetch(session=session, url=f"{start_url}1", current_depth=1)
+    await session.close()
+
+    assert metrics.PAGES_FETCHED.value() == fetched + 2
+    assert metrics.BYTES_DOWNLOADED.value() == downloaded + len(html.encode())
+    assert metrics.RESPONSES.value(labels=("404",)) == not_found + 1
+    assert metrics.PARSE_SECONDS.count == parsed + 1
@@ -1,9 +1,22 @@
 import pytest
+import asyncio
+import hashlib
+from pathlib import Path
 from asyncio import Queue
+from concurrent.futures import ProcessPoolExecutor
 from aiohttp import ClientSession
+from aioresponses import aioresponses
+from aioresponses import CallbackResult
 from pytest_mock import MockerFixture
 
 from parser.modules import Parser
+from parser.modules import CheckpointStore
+from parser.modules import CrawlScope
+from parser.modules import CrawlBudget
+from parser.modules.parser import Frontier
+from models import SiteModel
+from models import PageStateModel
+from models import ParserStateModel
 
 HTML_TEMPLATE: str = "<html><body>%s</body></html>"
 TITLE_TEMPLATE: str = "<title>%s</title>"
@@ -22,13 +35,14 @@ def make_html(links_count: int, page_title: str, parent_page: str = "") -> str:
     return html
 
 
-def test_get_links_parser_empty(queue: Queue) -> None:
+@pytest.mark.asyncio
+async def test_get_links_parser_empty(queue: Queue) -> None:
     start_url: str = "https://test.url/40"
     start_page_html: str = make_html(links_count=0, page_title="start page")
 
     status_store: dict = {}
     parser: Parser = Parser(queue=queue, start_url=start_url, status_store=status_store)
-    links: set = parser._get_links(url=start_url, html=start_page_html)
+    links: set = await parser._parse(url=start_url, html=start_page_html)
     assert len(links) == 0
 
     links_count: int = 5
@@ -37,14 +51,15 @@ def test_get_links_parser_empty(queue: Queue) -> None:
         page_title="Child page",
         parent_page=start_url,
     )
-    links = parser._get_links(url=start_url, html=child_page_html)
+    links = await parser._parse(url=start_url, html=child_page_html)
     assert len(links) == links_count
     with pytest.raises(AssertionError):
         assert links == ""
     for i in range(5):
         assert start_url + str(i) in links
 
-def test_get_links_parser_containing(queue: Queue) -> None:
+@pytest.mark.asyncio
+async def test_get_links_parser_containing(queue: Queue) -> None:
     start_url: str = "https://test.url/40"
     status_store: dict = {}
     parser: Parser = Parser(queue=queue, start_url=start_url, status_store=status_store)
@@ -55,7 +70,7 @@ def test_get_links_parser_containing(queue: Queue) -> None:
         page_title="Child page",
         parent_page=start_url,
     )
-    links = parser._get_links(url=start_url, html=child_page_html)
+    links = await parser._parse(url=start_url, html=child_page_html)
     assert len(links) == links_count
     with pytest.raises(AssertionError):
         assert links == ""
@@ -95,3 +110,316 @@ async def test_check_site_avail_failed(queue: Queue, mocker: MockerFixture) -> N
     assert await parser.check_site_avail(session=session) == False
 
     await session.close()
+
+
+@pytest.mark.asyncio
+async def test_frontier_breadth_first() -> None:
+    frontier: Frontier = Frontier(max_depth=2)
+    frontier.put(url="root", depth=0)
+    frontier.put(url="too-deep", depth=3)
+
+    assert await frontier.get() == ("root", 0)
+    frontier.put(url="a", depth=1)
+    frontier.put(url="b", depth=1)
+    await frontier.task_done("root")
+
+    assert await frontier.get() == ("a", 1)
+    frontier.put(url="a0", depth=2)
+    # Уровень 2 не выдаётся, пока не обработан весь уровень 1
+    assert await frontier.get() == ("b", 1)
+    await frontier.task_done("a")
+    await frontier.task_done("b")
+
+    assert await frontier.get() == ("a0", 2)
+    await frontier.task_done("a0")
+    assert await frontier.get() is None
+
+
+def test_frontier_deduplicates_on_put() -> None:
+    frontier: Frontier = Frontier(max_depth=2)
+    assert frontier.put(url="shared", depth=1)
+    assert not frontier.put(url="shared", depth=1)
+    assert not frontier.put(url="shared", depth=2)
+    assert len(frontier) == 1
+
+
+@pytest.mark.asyncio
+async def test_process_respects_max_depth(queue: Queue) -> None:
+    start_url: str = "https://test.url/"
+    status_store: dict = {}
+    session: ClientSession = ClientSession()
+    parser: Parser = Parser(
+        queue=queue,
+        start_url=start_url,
+        status_store=status_store,
+        max_depth=1,
+        max_concurrent=3,
+        session=session,
+    )
+    status_store[start_url] = parser
+
+    with aioresponses() as mocked:
+        mocked.get(start_url, content_type="text/html", body=make_html(links_count=3, page_title="root", parent_page=start_url))
+        for i in range(3):
+            mocked.get(
+                start_url + str(i),
+                content_type="text/html", body=make_html(links_count=2, page_title="child", parent_page=start_url + str(i)),
+            )
+        await parser._process()
+    await session.close()
+
+    assert queue.qsize() == 4
+    assert start_url not in status_store
+
+
+@pytest.mark.asyncio
+async def test_parse_in_process_pool(queue: Queue) -> None:
+    start_url: str = "https://test.url/40"
+    status_store: dict = {}
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        parser: Parser = Parser(queue=queue, start_url=start_url, status_store=status_store, executor=executor)
+        html: str = make_html(links_count=3, page_title="Child page", parent_page=start_url)
+        links: set = await parser._parse(url=start_url, html=html)
+
+    assert links == {start_url + str(i) for i in range(3)}
+    site: SiteModel = queue.get_nowait()
+    assert site.url == start_url
+    assert site.html == html
+
+
+@pytest.mark.asyncio
+async def test_process_fetches_canonical_urls_once(queue: Queue) -> None:
+    start_url: str = "https://test.url/"
+    status_store: dict = {}
+    session: ClientSession = ClientSession()
+    parser: Parser = Parser(
+        queue=queue,
+        start_url=start_url,
+        status_store=status_store,
+        max_depth=2,
+        max_concurrent=2,
+        session=session,
+    )
+    status_store[start_url] = parser
+    root_links: str = "".join(LINK_TEMPLATE % href for href in ("a", "./a#top", "/a?", "b", "HTTPS://TEST.URL:443/b"))
+    child_links: str = "".join(LINK_TEMPLATE % href for href in ("../", "a", "b"))
+
+    with aioresponses() as mocked:
+        mocked.get(start_url, content_type="text/html", body=HTML_TEMPLATE % root_links)
+        mocked.get(start_url + "a", content_type="text/html", body=HTML_TEMPLATE % child_links)
+        mocked.get(start_url + "b", content_type="text/html", body=HTML_TEMPLATE % child_links)
+        await parser._process()
+    await session.close()
+
+    assert queue.qsize() == 3
+    assert parser.state().duplicates_skipped == 6
+
+
+@pytest.mark.asyncio
+async def test_state_counts_pages_per_depth(queue: Queue) -> None:
+    start_url: str = "https://test.url/"
+    status_store: dict = {}
+    session: ClientSession = ClientSession()
+    parser: Parser = Parser(
+        queue=queue,
+        start_url=start_url,
+        status_store=status_store,
+        max_depth=1,
+        max_concurrent=2,
+        session=session,
+    )
+    status_store[start_url] = parser
+    html: str = HTML_TEMPLATE % "".join(LINK_TEMPLATE % href for href in ("ok", "missing", "binary"))
+
+    with aioresponses() as mocked:
+        mocked.get(start_url, content_type="text/html", body=html)
+        mocked.get(start_url + "ok", content_type="text/html", body=HTML_TEMPLATE % "")
+        mocked.get(start_url + "missing", status=404)
+        mocked.get(start_url + "binary", body=b"\xff\xfe\xfd", content_type="text/html; charset=utf-8")
+        await parser._process()
+    await session.close()
+
+    state: ParserStateModel = parser.state()
+    assert (state.pages_fetched, state.pages_failed, state.pages_skipped) == (4, 1, 1)
+    assert state.depths[0].fetched == 1
+    assert (state.depths[1].fetched, state.depths[1].failed, state.depths[1].skipped) == (3, 1, 1)
+    assert state.bytes_downloaded == len(html) + len(HTML_TEMPLATE % "") + 3
+    assert state.frontier_size == state.in_progress == 0
+    assert state.pages_per_sec > 0
+    assert state.host_limits["test.url"] >= 1
+
+
+@pytest.mark.asyncio
+async def test_non_html_skipped_and_large_pages_truncated(queue: Queue) -> None:
+    start_url: str = "https://test.url/"
+    status_store: dict = {}
+    session: ClientSession = ClientSession()
+    parser: Parser = Parser(
+        queue=queue,
+        start_url=start_url,
+        status_store=status_store,
+        max_depth=1,
+        session=session,
+        max_page_bytes=200,
+    )
+    status_store[start_url] = parser
+    root_links: str = LINK_TEMPLATE % "report.pdf" + LINK_TEMPLATE % "large"
+    large_html: str = HTML_TEMPLATE % (LINK_TEMPLATE % "early" + "<p>text</p>" * 100 + LINK_TEMPLATE % "late")
+
+    with aioresponses() as mocked:
+        mocked.get(start_url, content_type="text/html", body=HTML_TEMPLATE % root_links)
+        mocked.get(start_url + "report.pdf", content_type="application/pdf", body=b"%PDF-1.4" + b"\0" * 1000)
+        mocked.get(start_url + "large", content_type="text/html; charset=utf-8", body=large_html)
+        await parser._process()
+    await session.close()
+
+    state: ParserStateModel = parser.state()
+    assert (state.skipped_content_type, state.truncated) == (1, 1)
+    assert state.depths[1].skipped == 1
+    assert state.bytes_downloaded == len(HTML_TEMPLATE % root_links) + 200
+    sites: dict[str, SiteModel] = {site.url: site for site in (queue.get_nowait() for _ in range(queue.qsize()))}
+    assert set(sites) == {start_url, start_url + "large"}
+    assert sites[start_url + "large"].links == [start_url + "early"]
+
+
+@pytest.mark.asyncio
+async def test_external_links_are_out_of_scope(queue: Queue) -> None:
+    start_url: str = "https://test.url/"
+    status_store: dict = {}
+    session: ClientSession = ClientSession()
+    parser: Parser = Parser(
+        queue=queue,
+        start_url=start_url,
+        status_store=status_store,
+        max_depth=1,
+        session=session,
+        scope=CrawlScope(start_url=start_url, deny=[r"/logout"]),
+    )
+    status_store[start_url] = parser
+    links: str = "".join(LINK_TEMPLATE % href for href in (
+        "a", "https://other.url/", "https://sub.test.url/", "/logout", "redirect",
+    ))
+
+    with aioresponses() as mocked:
+        mocked.get(start_url, content_type="text/html", body=HTML_TEMPLATE % links)
+        mocked.get(start_url + "a", content_type="text/html", body=HTML_TEMPLATE % "")
+        mocked.get(start_url + "redirect", status=302, headers={"Location": "https://other.url/landing"})
+        mocked.get("https://other.url/landing", content_type="text/html", body=HTML_TEMPLATE % "")
+        await parser._process()
+    await session.close()
+
+    state: ParserStateModel = parser.state()
+    assert state.links_out_of_scope == 3
+    assert state.depths[1].skipped == 1
+    assert sorted(queue.get_nowait().url for _ in range(queue.qsize())) == [start_url, start_url + "a"]
+
+
+@pytest.mark.asyncio
+async def test_page_budget_stops_crawl(queue: Queue, tmp_path: Path) -> None:
+    start_url: str = "https://test.url/"
+    status_store: dict = {}
+    session: ClientSession = ClientSession()
+    store: CheckpointStore = CheckpointStore(directory=str(tmp_path))
+    parser: Parser = Parser(
+        queue=queue,
+        start_url=start_url,
+        status_store=status_store,
+        max_depth=1,
+        max_concurrent=3,
+        session=session,
+        checkpoints=store,
+        budget=CrawlBudget(max_pages=4),
+    )
+    status_store[start_url] = parser
+
+    with aioresponses() as mocked:
+        mocked.get(start_url, content_type="text/html", body=make_html(links_count=10, page_title="root", parent_page=start_url))
+        for i in range(10):
+            mocked.get(start_url + str(i), content_type="text/html", body=HTML_TEMPLATE % "")
+        await parser._process()
+    await session.close()
+
+    assert parser.stop_reason == "max_pages"
+    assert parser.state().pages_fetched == queue.qsize() == 4
+    assert start_url not in status_store
+    # Оставшаяся граница сохранена для продолжения
+    state, _ = store.load(start_url)
+    assert len(state["frontier"]["levels"]["1"]) == 7
+    assert state["budget"]["max_pages"] == 4
+
+
+@pytest.mark.asyncio
+async def test_duration_budget_stops_crawl(queue: Queue) -> None:
+    start_url: str = "https://test.url/"
+    status_store: dict = {}
+    session: ClientSession = ClientSession()
+    parser: Parser = Parser(
+        queue=queue,
+        start_url=start_url,
+        status_store=status_store,
+        max_depth=1,
+        session=session,
+        budget=CrawlBudget(max_duration_sec=0.2),
+    )
+    status_store[start_url] = parser
+
+    async def slow(url, **kwargs) -> CallbackResult:
+        await asyncio.sleep(0.15)
+        return CallbackResult(content_type="text/html", body=HTML_TEMPLATE % "")
+
+    with aioresponses() as mocked:
+        mocked.get(start_url, content_type="text/html", body=make_html(links_count=10, page_title="root", parent_page=start_url))
+        for i in range(10):
+            mocked.get(start_url + str(i), callback=slow)
+        await asyncio.wait_for(parser._process(), timeout=5)
+    await session.close()
+
+    assert parser.stop_reason == "max_duration_sec"
+    assert 1 < queue.qsize() < 11
+
+
+@pytest.mark.asyncio
+async def test_incremental_recrawl_skips_unchanged(queue: Queue) -> None:
+    start_url: str = "https://test.url/"
+    unchanged_html: str = make_html(links_count=0, page_title="unchanged")
+    changed_html: str = make_html(links_count=0, page_title="changed")
+    states: dict[str, PageStateModel] = {
+        start_url: PageStateModel(etag='"v1"', links=[start_url + "0", start_url + "1"]),
+        start_url + "0": PageStateModel(content_hash=hashlib.sha256(unchanged_html.encode()).hexdigest()),
+        start_url + "1": PageStateModel(content_hash="outdated"),
+    }
+
+    async def load_state(url: str) -> PageStateModel | None:
+        return states.get(url)
+
+    def not_modified(url, **kwargs) -> CallbackResult:
+        assert kwargs["headers"]["If-None-Match"] == '"v1"'
+        return CallbackResult(status=304)
+
+    status_store: dict = {}
+    session: ClientSession = ClientSession()
+    parser: Parser = Parser(
+        queue=queue,
+        start_url=start_url,
+        status_store=status_store,
+        max_depth=1,
+        session=session,
+        incremental=True,
+        page_state_loader=load_state,
+    )
+    status_store[start_url] = parser
+
+    with aioresponses() as mocked:
+        mocked.get(start_url, callback=not_modified)
+        mocked.get(start_url + "0", content_type="text/html", body=unchanged_html)
+        mocked.get(start_url + "1", content_type="text/html", body=changed_html, headers={"ETag": '"v2"'})
+        await parser._process()
+    await session.close()
+
+    assert parser.not_modified == 1
+    assert parser.unchanged == 1
+    assert queue.qsize() == 1
+    site: SiteModel = queue.get_nowait()
+    assert site.url == start_url + "1"
+    assert site.etag == '"v2"'
+    assert site.refresh
@@ -0,0 +1,24 @@
+import time
+from pytest_mock import MockerFixture
+
+from parser.modules.progress import RateMeter
+
+
+def test_rate_meter_window(mocker: MockerFixture) -> None:
+    now: list[float] = [100.0]
+    mocker.patch.object(time, "monotonic", side_effect=lambda: now[0])
+    meter: RateMeter = RateMeter(window_sec=10)
+    started_at: float = 100.0
+
+    now[0] = 100.5
+    meter.add(5)
+    assert meter.rate(started_at=started_at) == 10  # Окно короче: с начала обхода прошло 0.5 с
+
+    for second in range(101, 120):
+        now[0] = second + 0.5
+        meter.add(2)
+    assert meter.rate(started_at=started_at) == 2
+    assert len(meter._buckets) <= 10
+
+    now[0] = 200.0
+    assert meter.rate(started_at=started_at) == 0
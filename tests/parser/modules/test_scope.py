@@ -0,0 +1,60 @@
+import pytest
+
+from parser.modules.scope import CrawlScope
+from parser.modules.scope import registrable_domain
+from parser.modules.budget import CrawlBudget
+
+
+@pytest.mark.parametrize("host, domain", [
+    ("example.com", "example.com"),
+    ("news.example.com", "example.com"),
+    ("www.bbc.co.uk", "bbc.co.uk"),
+    ("ru.wikipedia.org", "wikipedia.org"),
+    ("127.0.0.1", "127.0.0.1"),
+    ("localhost", "localhost"),
+])
+def test_registrable_domain(host: str, domain: str) -> None:
+    assert registrable_domain(host) == domain
+
+
+def test_host_scope() -> None:
+    scope: CrawlScope = CrawlScope(start_url="https://www.example.com/news/")
+    assert "https://www.example.com/other" in scope
+    assert "http://example.com/" in scope
+    assert "https://blog.example.com/" not in scope
+    assert "https://other.com/" not in scope
+
+
+def test_domain_scope() -> None:
+    scope: CrawlScope = CrawlScope(start_url="https://news.bbc.co.uk/", mode="domain")
+    assert "https://www.bbc.co.uk/sport" in scope
+    assert "https://bbc.co.uk/" in scope
+    assert "https://cnn.co.uk/" not in scope
+
+
+def test_patterns() -> None:
+    scope: CrawlScope = CrawlScope(
+        start_url="https://example.com/", mode="any", allow=[r"/news/"], deny=[r"\?page=\d{3,}", r"/print/"],
+    )
+    assert "https://other.com/news/1" in scope
+    assert "https://example.com/about" not in scope
+    assert "https://example.com/news/print/1" not in scope
+    assert "https://example.com/news/?page=100" not in scope
+    assert CrawlScope(start_url="https://example.com/", **scope.to_dict()).to_dict() == scope.to_dict()
+
+
+def test_invalid_scope() -> None:
+    with pytest.raises(ValueError):
+        CrawlScope(start_url="https://example.com/", mode="world")
+    with pytest.raises(ValueError):
+        CrawlScope(start_url="https://example.com/", deny=["("])
+
+
+def test_budget() -> None:
+    budget: CrawlBudget = CrawlBudget(max_pages=10, max_bytes=1000)
+    assert budget.exhausted(pages=9, bytes_downloaded=999) is None
+    assert budget.exhausted(pages=10, bytes_downloaded=0) == "max_pages"
+    assert budget.exhausted(pages=0, bytes_downloaded=1000) == "max_bytes"
+    assert budget.remaining_pages(4) == 6
+    assert CrawlBudget().exhausted(pages=10 ** 9, bytes_downloaded=10 ** 12) is None
+    assert CrawlBudget().remaining_pages(4) is None
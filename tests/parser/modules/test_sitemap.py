@@ -0,0 +1,129 @@
+import gzip
+import pytest
+import aiohttp
+from urllib.parse import urljoin
+from asyncio import Queue
+from aiohttp import ClientSession
+from aioresponses import aioresponses
+
+from parser.modules import Parser
+from parser.modules import CrawlScope
+from parser.modules.sitemap import fetch_robots
+from parser.modules.sitemap import iter_sitemap
+from models import ParserStateModel
+
+START_URL: str = "https://test.url/"
+TIMEOUT: aiohttp.ClientTimeout = aiohttp.ClientTimeout(total=5)
+HTML_TEMPLATE: str = "<html><body>%s</body></html>"
+ROBOTS: str = """
+User-agent: *
+Disallow: /private/
+Crawl-delay: 2
+Sitemap: https://test.url/sitemap_index.xml
+"""
+SITEMAP_INDEX: str = """<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+    <sitemap><loc>https://test.url/sitemap-1.xml.gz</loc></sitemap>
+    <sitemap><loc>https://test.url/sitemap-2.xml</loc></sitemap>
+    <sitemap><loc>https://test.url/sitemap_index.xml</loc></sitemap>
+</sitemapindex>
+"""
+
+
+def make_urlset(paths: list[str]) -> str:
+    urls: str = "".join(f"<url><loc>{urljoin(START_URL, path)}</loc><lastmod>2024-01-01</lastmod></url>" for path in paths)
+    return f'<?xml version="1.0"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{urls}</urlset>'
+
+
+def mock_site(mocked: aioresponses) -> None:
+    mocked.get(START_URL + "robots.txt", body=ROBOTS, content_type="text/plain")
+    mocked.get(START_URL + "sitemap_index.xml", body=SITEMAP_INDEX, content_type="application/xml")
+    mocked.get(
+        START_URL + "sitemap-1.xml.gz",
+        body=gzip.compress(make_urlset(["a", "b", "private/c"]).encode()),
+        content_type="application/x-gzip",
+    )
+    mocked.get(START_URL + "sitemap-2.xml", body=make_urlset(["d", "https://other.url/e"]), content_type="text/xml")
+
+
+@pytest.mark.asyncio
+async def test_sitemap_index_and_gzipped_sitemaps() -> None:
+    session: ClientSession = ClientSession()
+    with aioresponses() as mocked:
+        mock_site(mocked)
+        robots = await fetch_robots(session=session, start_url=START_URL, timeout=TIMEOUT)
+        urls: list[str] = [url async for url in iter_sitemap(session, robots.site_maps(), timeout=TIMEOUT)]
+    await session.close()
+
+    assert robots.crawl_delay("*") == 2
+    assert not robots.can_fetch("*", START_URL + "private/c")
+    assert urls == [START_URL + "a", START_URL + "b", START_URL + "private/c", START_URL + "d", "https://other.url/e"]
+
+
+@pytest.mark.asyncio
+async def test_missing_robots_and_invalid_sitemap() -> None:
+    session: ClientSession = ClientSession()
+    with aioresponses() as mocked:
+        mocked.get(START_URL + "robots.txt", status=404)
+        mocked.get(START_URL + "sitemap.xml", body="<urlset><url><loc>https://test.url/a</loc></url><url", content_type="text/xml")
+        assert await fetch_robots(session=session, start_url=START_URL, timeout=TIMEOUT) is None
+        urls: list[str] = [url async for url in iter_sitemap(session, [START_URL + "sitemap.xml"], timeout=TIMEOUT)]
+    await session.close()
+
+    assert urls == [START_URL + "a"]
+
+
+@pytest.mark.asyncio
+async def test_sitemap_seeds_frontier() -> None:
+    queue: Queue = Queue()
+    status_store: dict = {}
+    session: ClientSession = ClientSession()
+    parser: Parser = Parser(
+        queue=queue,
+        start_url=START_URL,
+        status_store=status_store,
+        max_depth=1,
+        max_concurrent=2,
+        session=session,
+        respect_robots=True,
+        seed_sitemaps=True,
+        max_crawl_delay_sec=0.01,
+    )
+    status_store[START_URL] = parser
+
+    with aioresponses() as mocked:
+        mock_site(mocked)
+        mocked.get(START_URL, content_type="text/html", body=HTML_TEMPLATE % "<a href='/private/x'>x</a><a href='a'>a</a>")
+        for path in ("a", "b", "d"):
+            mocked.get(START_URL + path, content_type="text/html", body=HTML_TEMPLATE % "")
+        await parser._process()
+    await session.close()
+
+    state: ParserStateModel = parser.state()
+    assert state.seeded_urls == 3
+    assert state.crawl_delay_sec == 0.01
+    assert (state.links_disallowed, state.links_out_of_scope) == (2, 1)
+    assert sorted(queue.get_nowait().url for _ in range(queue.qsize())) == [START_URL + path for path in ("", "a", "b", "d")]
+
+
+@pytest.mark.asyncio
+async def test_robots_apply_to_start_host_only() -> None:
+    session: ClientSession = ClientSession()
+    parser: Parser = Parser(
+        queue=Queue(),
+        start_url=START_URL,
+        status_store={},
+        max_depth=1,
+        max_concurrent=1,
+        session=session,
+        scope=CrawlScope(START_URL, mode="domain"),
+        respect_robots=True,
+    )
+    with aioresponses() as mocked:
+        mocked.get(START_URL + "robots.txt", body=ROBOTS, content_type="text/plain")
+        await parser._read_robots()
+    await session.close()
+
+    assert not parser._admit(START_URL + "private/x")
+    assert parser._admit("https://blog.test.url/private/x")
+    assert parser.links_disallowed == 1
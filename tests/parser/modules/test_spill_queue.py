@@ -0,0 +1,41 @@
+import pytest
+from pathlib import Path
+
+from parser.modules import SpillQueue
+from models import SiteModel
+
+
+def make_site(i: int) -> SiteModel:
+    return SiteModel(html=f"<html>{i}</html>", url=f"https://test.url/{i}", title=str(i))
+
+
+@pytest.mark.asyncio
+async def test_spill_when_memory_is_full(tmp_path: Path) -> None:
+    queue: SpillQueue = SpillQueue(maxsize=2, spill_dir=str(tmp_path), segment_max_items=2, spill_after_sec=0.01)
+    for i in range(5):
+        await queue.put(make_site(i))
+
+    assert queue.qsize() == 5
+    assert queue.spilled == 3
+    assert len(list(tmp_path.glob("segment-*.jsonl"))) == 2
+
+    urls: set[str] = {(await queue.get()).url for _ in range(5)}
+    assert urls == {f"https://test.url/{i}" for i in range(5)}
+    assert queue.empty()
+
+    # Сегменты удаляются только после подтверждения записи
+    assert len(list(tmp_path.glob("segment-*.jsonl"))) == 2
+    queue.commit()
+    assert not list(tmp_path.glob("segment-*.jsonl"))
+
+
+@pytest.mark.asyncio
+async def test_replay_after_restart(tmp_path: Path) -> None:
+    queue: SpillQueue = SpillQueue(maxsize=1, spill_dir=str(tmp_path))
+    for i in range(3):
+        queue.put_nowait(make_site(i))
+    queue.persist()
+
+    restarted: SpillQueue = SpillQueue(maxsize=1, spill_dir=str(tmp_path))
+    assert restarted.qsize() == 3
+    assert [(await restarted.get()).title for _ in range(3)] == ["0", "1", "2"]
@@ -0,0 +1,21 @@
+import pytest
+
+from parser.modules.urls import canonicalize
+
+BASE_URL: str = "https://Test.URL:443/a/b/page.html?x=1"
+
+
+@pytest.mark.parametrize("href, expected", [
+    ("#fragment", "https://test.url/a/b/page.html?x=1"),
+    ("./c", "https://test.url/a/b/c"),
+    ("../d", "https://test.url/a/d"),
+    ("/e?b=2&a=1#x", "https://test.url/e?a=1&b=2"),
+    ("//other.url/p", "https://other.url/p"),
+    ("HTTP://Other.URL:80/p/./q/../r", "http://other.url/p/r"),
+    ("http://other.url:8080", "http://other.url:8080/"),
+    ("mailto:user@test.url", None),
+    ("javascript:void(0)", None),
+    ("https://test.url:99999/", None),
+])
+def test_canonicalize(href: str, expected: str | None) -> None:
+    assert canonicalize(href, BASE_URL) == expected
@@ -0,0 +1,55 @@
+import pytest
+
+from parser.modules.visited import BloomFilter
+from parser.modules.visited import FingerprintSet
+from parser.modules.visited import create_visited_set
+from parser.modules.visited import dump_visited
+from parser.modules.visited import load_visited
+
+URLS: list[str] = [f"https://test.url/page/{i}" for i in range(5000)]
+
+
+@pytest.mark.parametrize("kind", ["exact", "fingerprint64", "fingerprint128", "bloom"])
+def test_visited_set(kind: str) -> None:
+    visited = create_visited_set(kind, bloom_capacity=len(URLS))
+    for url in URLS:
+        visited.add(url)
+    visited.add(URLS[0])
+
+    assert all(url in visited for url in URLS)
+    assert "https://test.url/other" not in visited
+    assert len(visited) == pytest.approx(len(URLS), abs=5)
+    assert visited.memory_bytes > 0
+
+
+def test_fingerprint_set_is_compact() -> None:
+    visited: FingerprintSet = FingerprintSet(bits=64)
+    exact = create_visited_set("exact")
+    for url in URLS:
+        visited.add(url)
+        exact.add(url)
+    assert visited.memory_bytes * 3 < exact.memory_bytes
+
+
+def test_bloom_false_positive_rate() -> None:
+    bloom: BloomFilter = BloomFilter(capacity=len(URLS), error_rate=0.01)
+    for url in URLS:
+        bloom.add(url)
+    false_positives: int = sum(f"https://other.url/{i}" in bloom for i in range(10000))
+
+    assert bloom.false_positive_rate == pytest.approx(0.01, rel=0.3)
+    assert false_positives / 10000 < 0.03
+
+
+@pytest.mark.parametrize("kind", ["exact", "fingerprint64", "fingerprint128", "bloom"])
+def test_visited_set_dump_load(kind: str) -> None:
+    visited = create_visited_set(kind, bloom_capacity=len(URLS))
+    for url in URLS:
+        visited.add(url)
+
+    restored = load_visited(dump_visited(visited))
+    assert type(restored) is type(visited)
+    assert len(restored) == len(visited)
+    assert all(url in restored for url in URLS)
+    restored.add("https://test.url/other")
+    assert "https://test.url/other" in restored
@@ -7,12 +7,13 @@ DB: list[dict] = []
 
 class MockedDB(Database):
     """ Заглушка базы данных """
-    def __init__(self, host: str, port: int | None, database: str, username: str, password: str, queue: Queue) -> None:
-        super().__init__(host, port, database, username, password, queue)
+    def __init__(self, host: str, port: int | None, database: str, username: str, password: str, queue: Queue, **kwargs) -> None:
+        super().__init__(host, port, database, username, password, queue, **kwargs)
 
-    async def _put(self, site: SiteModel) -> None:
-        DB.append({
-            "url": site.url,
-            "html": site.html,
-            "title": site.title,
-        })
+    async def _put_batch(self, sites: list[SiteModel]) -> None:
+        for site in sites:
+            DB.append({
+                "url": site.url,
+                "html": site.html,
+                "title": site.title,
+            })
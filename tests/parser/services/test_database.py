@@ -0,0 +1,158 @@
+import asyncio
+import pytest
+from pathlib import Path
+
+from models import SiteModel
+from models import WriterStatsModel
+from modules import SpillQueue
+from modules.html_codec import decompress
+from tests.parser.services.mocked_db import DB
+from tests.parser.services.mocked_db import MockedDB
+
+
+def make_db(queue: SpillQueue, batch_size: int, flush_interval_ms: int = 50) -> MockedDB:
+    return MockedDB(
+        host="localhost",
+        port=None,
+        database="",
+        username="",
+        password="",
+        queue=queue,
+        batch_size=batch_size,
+        flush_interval_ms=flush_interval_ms,
+    )
+
+
+@pytest.mark.asyncio
+async def test_next_batch_limited_by_size(tmp_path: Path) -> None:
+    queue: SpillQueue = SpillQueue(maxsize=10, spill_dir=str(tmp_path))
+    database: MockedDB = make_db(queue=queue, batch_size=2)
+    for i in range(5):
+        queue.put_nowait(SiteModel(html="", url=f"https://test.url/{i}", title=""))
+
+    for expected_size in (2, 2, 1):  # Неполная пачка отдаётся по истечении flush_interval
+        await database._next_batch()
+        assert len(database._batch) == expected_size
+        database._batch = []
+
+
+@pytest.mark.asyncio
+async def test_listener_writes_all_sites(tmp_path: Path) -> None:
+    DB.clear()
+    queue: SpillQueue = SpillQueue(maxsize=10, spill_dir=str(tmp_path))
+    database: MockedDB = make_db(queue=queue, batch_size=3)
+    listener: asyncio.Task = asyncio.create_task(database.start_listener())
+    for i in range(7):
+        await queue.put(SiteModel(html="", url=f"https://test.url/{i}", title=""))
+
+    while len(DB) < 7:
+        await asyncio.sleep(0.01)
+    database.close()
+    listener.cancel()
+
+    assert database.stats.rows == 7
+    assert database.stats.batches >= 3
+
+
+@pytest.mark.asyncio
+async def test_close_persists_unwritten_sites(tmp_path: Path) -> None:
+    DB.clear()
+    queue: SpillQueue = SpillQueue(maxsize=10, spill_dir=str(tmp_path))
+    database: MockedDB = make_db(queue=queue, batch_size=3)
+    for i in range(4):
+        queue.put_nowait(SiteModel(html="", url=f"https://test.url/{i}", title=""))
+    database.close()
+    assert not DB
+
+    # Новый запуск дочитывает сохранённые страницы
+    restarted_queue: SpillQueue = SpillQueue(maxsize=10, spill_dir=str(tmp_path))
+    restarted: MockedDB = make_db(queue=restarted_queue, batch_size=3)
+    listener: asyncio.Task = asyncio.create_task(restarted.start_listener())
+    while len(DB) < 4:
+        await asyncio.sleep(0.01)
+    restarted.close()
+    listener.cancel()
+    assert not list(tmp_path.glob("segment-*.jsonl"))
+
+
+@pytest.mark.asyncio
+async def test_close_persists_filling_batch(tmp_path: Path) -> None:
+    queue: SpillQueue = SpillQueue(maxsize=10, spill_dir=str(tmp_path))
+    database: MockedDB = make_db(queue=queue, batch_size=10, flush_interval_ms=10_000)
+    for i in range(3):
+        queue.put_nowait(SiteModel(html="", url=f"https://test.url/{i}", title=""))
+    filling: asyncio.Task = asyncio.create_task(database._next_batch())
+    await asyncio.sleep(0.01)
+    database.close()
+    filling.cancel()
+
+    assert SpillQueue(maxsize=10, spill_dir=str(tmp_path)).qsize() == 3
+
+
+class UnavailableDB(MockedDB):
+    """ БД недоступна: запись не выполняется """
+    RETRY_DELAY_SEC: float = 0
+
+    async def _put_batch(self, sites: list[SiteModel]) -> None:
+        raise ConnectionRefusedError
+
+
+@pytest.mark.asyncio
+async def test_failed_write_keeps_sites(tmp_path: Path) -> None:
+    queue: SpillQueue = SpillQueue(maxsize=1, spill_dir=str(tmp_path))
+    for i in range(3):
+        queue.put_nowait(SiteModel(html="", url=f"https://test.url/{i}", title=""))
+    database: UnavailableDB = UnavailableDB(
+        host="localhost", port=None, database="", username="", password="", queue=queue, batch_size=2,
+    )
+    listener: asyncio.Task = asyncio.create_task(database.start_listener())
+    while database.stats.errors < 3:
+        await asyncio.sleep(0.01)
+    database.close()
+    listener.cancel()
+
+    urls: set[str] = set()
+    restarted: SpillQueue = SpillQueue(maxsize=10, spill_dir=str(tmp_path))
+    while not restarted.empty():
+        urls.add(restarted.get_nowait().url)
+    assert urls == {f"https://test.url/{i}" for i in range(3)}
+    assert database.stats.rows == 0
+    assert database.stats.failed_rows >= 3
+
+
+@pytest.mark.parametrize("codec", ["gzip", "zstd"])
+def test_encode_compresses_html(tmp_path: Path, codec: str) -> None:
+    queue: SpillQueue = SpillQueue(maxsize=10, spill_dir=str(tmp_path))
+    database: MockedDB = make_db(queue=queue, batch_size=10)
+    database._html_codec = codec
+    html: str = "<html><body>" + "<p>Страница</p>" * 1000 + "</body></html>"
+
+    site: SiteModel = SiteModel(html=html, url="u", title="t", content_hash="hash")
+    content_hash, text, html_data, html_codec, size = database._encode_contents([site])[0]
+    assert content_hash == "hash"
+    assert text is None
+    assert html_codec == codec
+    assert size == len(html.encode())
+    assert decompress(html_data, codec).decode() == html
+    assert len(html_data) < size
+
+
+def test_site_records_reference_content(tmp_path: Path) -> None:
+    queue: SpillQueue = SpillQueue(maxsize=10, spill_dir=str(tmp_path))
+    database: MockedDB = make_db(queue=queue, batch_size=10)
+    site: SiteModel = SiteModel(html="<html></html>", url="u", title="t", content_hash="hash", refresh=True)
+
+    url, text, title, html_data, html_codec, *_state, refresh = database._site_records([site])[0]
+    assert (url, title, refresh) == ("u", "t", True)
+    assert text is None and html_data is None and html_codec is None
+    assert "hash" in _state
+
+
+def test_content_stats_dedup_ratio() -> None:
+    stats: WriterStatsModel = WriterStatsModel()
+    stats.record_contents(written=3, deduplicated=1, html_bytes=400, stored_bytes=120)
+    stats.record_contents(written=0, deduplicated=4, html_bytes=400, stored_bytes=0)
+
+    assert (stats.content_rows, stats.deduplicated_rows) == (3, 5)
+    assert stats.dedup_ratio == 0.625
+    assert (stats.html_bytes, stats.stored_bytes) == (800, 120)
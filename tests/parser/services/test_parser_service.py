@@ -0,0 +1,140 @@
+import pytest
+import asyncio
+from pathlib import Path
+from aiohttp import ClientConnectionError
+from aioresponses import aioresponses
+from aioresponses import CallbackResult
+
+
+from services.http_service import HttpService
+from services.parser_service import ParserService
+from modules import Parser
+from modules import SpillQueue
+from modules.parser import Frontier
+
+START_URL: str = "https://test.url/"
+
+
+def make_service(tmp_path: Path) -> ParserService:
+    return ParserService(
+        queue=SpillQueue(maxsize=10, spill_dir=str(tmp_path)),
+        limit_concurrent_processes=2,
+        http=HttpService(limit=10, limit_per_host=2, dns_cache_ttl_sec=10, keepalive_timeout_sec=10),
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("response", [{"status": 404}, {"exception": ClientConnectionError()}])
+async def test_unavailable_start_url_is_released(tmp_path: Path, response: dict) -> None:
+    service: ParserService = make_service(tmp_path)
+    with aioresponses() as mocked:
+        mocked.get(START_URL, **response)
+        assert not await service.parse_site(
+            start_url=START_URL,
+            max_depth=1,
+            max_concurrent=1,
+            default_timeout_sec=1,
+        )
+
+    assert not service.is_url_processing(START_URL)
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_queued_crawls_start_by_priority(tmp_path: Path) -> None:
+    service: ParserService = ParserService(
+        queue=SpillQueue(maxsize=10, spill_dir=str(tmp_path)),
+        limit_concurrent_processes=1,
+        http=HttpService(limit=10, limit_per_host=2, dns_cache_ttl_sec=10, keepalive_timeout_sec=10),
+        job_queue_size=2,
+        fetch_slots=4,
+    )
+    release: asyncio.Event = asyncio.Event()
+    started: list[str] = []
+
+    async def slow(url, **kwargs) -> CallbackResult:
+        await release.wait()
+        return CallbackResult(content_type="text/html", body="<html></html>")
+
+    def page(url, **kwargs) -> CallbackResult:
+        started.append(str(url))
+        return CallbackResult(content_type="text/html", body="<html></html>")
+
+    options: dict = {"max_depth": 1, "max_concurrent": 1, "default_timeout_sec": 5}
+    with aioresponses() as mocked:
+        # Проверка доступности - сразу, загрузка страницы - до release
+        mocked.get(START_URL, body="<html></html>", content_type="text/html")
+        mocked.get(START_URL, callback=slow)
+        mocked.get("https://low.url/", callback=page, repeat=True)
+        mocked.get("https://high.url/", callback=page, repeat=True)
+        assert await service.parse_site(start_url=START_URL, **options)
+        assert service.is_busy()
+        assert service.enqueue(start_url="https://low.url/", priority=0, **options) == 1
+        assert service.enqueue(start_url="https://high.url/", priority=5, weight=3, **options) == 1
+        assert service.enqueue(start_url="https://full.url/", **options) is None
+        assert [(job.start_url, job.position) for job in service.queued()] == [
+            ("https://high.url/", 1), ("https://low.url/", 2),
+        ]
+
+        await asyncio.sleep(0.05)
+        assert service._status_store[START_URL].state().fetch_slots == 1
+        release.set()
+        while service.has_queued() or service._status_store:
+            await asyncio.sleep(0.01)
+
+    # Проверка доступности и загрузка стартовой страницы каждого обхода
+    assert started == ["https://high.url/"] * 2 + ["https://low.url/"] * 2
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_crawl_releases_place_for_queued(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    service: ParserService = ParserService(
+        queue=SpillQueue(maxsize=10, spill_dir=str(tmp_path)),
+        limit_concurrent_processes=1,
+        http=HttpService(limit=10, limit_per_host=2, dns_cache_ttl_sec=10, keepalive_timeout_sec=10),
+    )
+    get = Frontier.get
+    failures: list[int] = [1]
+    release: asyncio.Event = asyncio.Event()
+
+    async def failing_get(self: Frontier) -> tuple[str, int] | None:
+        # Первый запрос адреса (воркер первого обхода) - ошибка границы
+        if failures:
+            await release.wait()
+            failures.pop()
+            raise RuntimeError("Frontier is unavailable")
+        return await get(self)
+
+    monkeypatch.setattr(Frontier, "get", failing_get)
+    options: dict = {"max_depth": 1, "max_concurrent": 1, "default_timeout_sec": 5}
+    with aioresponses() as mocked:
+        mocked.get(START_URL, body="<html></html>", content_type="text/html", repeat=True)
+        mocked.get("https://queued.url/", body="<html></html>", content_type="text/html", repeat=True)
+        assert await service.parse_site(start_url=START_URL, **options)
+        assert service.enqueue(start_url="https://queued.url/", **options) == 1
+        release.set()
+        for _ in range(200):
+            if not service.has_queued() and not service._status_store:
+                break
+            await asyncio.sleep(0.01)
+
+    assert not service.is_url_processing(START_URL)
+    assert not service.has_queued()
+    assert not service.is_busy()
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_host_window_is_bounded_by_connections_per_host(tmp_path: Path) -> None:
+    service: ParserService = make_service(tmp_path)
+    parser: Parser = service._create_parser(
+        start_url=START_URL,
+        max_depth=1,
+        max_concurrent=20,
+        default_timeout_sec=5,
+        incremental=False,
+        visited=service._create_visited_set(),
+    )
+    assert parser._host_limiter._max_limit == 2
+    await service.close()